@@ -0,0 +1,75 @@
+"""
+Compare l'ancien ArrivalAnalyzer (un groupby par métrique) au moteur en un seul passage.
+
+Usage :
+    python -m benchmarks.bench_analyzer [1000000 10000000 50000000]
+"""
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.synthetic import generate_arrivals
+from src.analyzer import ArrivalAnalyzer
+
+DEFAULT_SIZES = [1_000_000, 10_000_000, 50_000_000]
+
+
+def make_arrivals(n, n_patients=None, seed=0):
+    """Génère n arrivées synthétiques réparties sur une année (voir benchmarks.synthetic)."""
+    return generate_arrivals(n, n_patients=n_patients, seed=seed)
+
+
+def legacy_metrics(df):
+    """Reproduit l'ancien comportement : copies et groupby refaits pour chaque métrique."""
+    def hourly():
+        d = df.copy()
+        d['hour'] = d['timestamp'].dt.floor('h')
+        return d.groupby('hour')['patient_id'].nunique().reset_index().rename(
+            columns={'hour': 'timestamp', 'patient_id': 'count'})
+
+    def daily():
+        d = df.copy()
+        d['day'] = d['timestamp'].dt.date
+        return d.groupby('day')['patient_id'].nunique().reset_index().rename(
+            columns={'day': 'date', 'patient_id': 'count'})
+
+    df = df.copy()
+    hourly()
+    daily()
+    hourly().sort_values('count', ascending=False).iloc[0]
+    daily().sort_values('count', ascending=False).iloc[0]
+    df['patient_id'].nunique()
+    daily()['count'].mean()
+
+
+def engine_metrics(df):
+    an = ArrivalAnalyzer(df)
+    an.hourly_counts()
+    an.daily_counts()
+    an.busiest_hour()
+    an.busiest_day()
+    an.total_patients()
+    an.average_daily()
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    print(f"{'rows':>12} {'legacy (s)':>12} {'engine (s)':>12} {'speedup':>8}")
+    for n in sizes:
+        df = make_arrivals(n)
+        t_old = timed(legacy_metrics, df)
+        t_new = timed(engine_metrics, df)
+        print(f"{n:>12} {t_old:>12.2f} {t_new:>12.2f} {t_old / t_new:>7.1f}x")
+        del df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare les formats d'export des séries agrégées : taille du fichier, temps d'écriture,
+temps de relecture en DataFrame et, quand c'est possible, temps d'ouverture par projection mémoire.
+
+Usage :
+    python -m benchmarks.bench_export [années]
+"""
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.export import FORMATS, available_formats, write_table, read_table, open_mapped
+
+DEFAULT_YEARS = 5
+
+
+def make_hourly(years, seed=0):
+    """Série horaire aléatoire couvrant le nombre d'années demandé."""
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range('2020-01-01', periods=int(years * 365 * 24), freq='h')
+    return pd.DataFrame({'timestamp': hours, 'count': rng.poisson(12, size=len(hours))})
+
+
+def bench_format(df, fmt, directory):
+    path = os.path.join(directory, f"hourly_counts{FORMATS[fmt]}")
+    t0 = time.perf_counter()
+    write_table(df, path, fmt)
+    t1 = time.perf_counter()
+    read_table(path)
+    t2 = time.perf_counter()
+    mapped = None
+    if fmt in ("npy", "arrow"):
+        open_mapped(path)
+        mapped = time.perf_counter() - t2
+    return os.path.getsize(path), t1 - t0, t2 - t1, mapped
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    years = float(argv[0]) if argv else DEFAULT_YEARS
+    df = make_hourly(years)
+    print(f"{len(df):,} lignes horaires ({years:g} ans)")
+    print(f"{'format':>10} {'taille':>12} {'écriture':>10} {'lecture':>10} {'mmap':>10}")
+    with tempfile.TemporaryDirectory() as d:
+        for fmt in available_formats():
+            size, write_s, read_s, mapped = bench_format(df, fmt, d)
+            mapped = f"{mapped * 1000:.2f} ms" if mapped is not None else "-"
+            print(f"{fmt:>10} {size / 1024:>9.0f} Ko {write_s * 1000:>7.1f} ms {read_s * 1000:>7.1f} ms {mapped:>10}")
+
+
+if __name__ == '__main__':
+    main()
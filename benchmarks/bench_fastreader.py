@@ -0,0 +1,59 @@
+"""
+Compare la lecture d'un CSV d'arrivées au format fixe : simple lecture des octets (borne disque),
+lecteur mmap de src.fastreader et lecture pandas par blocs de DataLoader.
+
+Usage :
+    python -m benchmarks.bench_fastreader [taille]   (ex. 1M, 10M)
+"""
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.synthetic import parse_size, write_arrivals_csv
+from src.data_loader import DataLoader
+from src.fastreader import read_fixed
+
+DEFAULT_SIZE = '1M'
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = parse_size(argv[0] if argv else DEFAULT_SIZE)
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'arrivals.csv')
+        write_arrivals_csv(path, n)
+        mb = os.path.getsize(path) / 1024**2
+
+        def read_bytes():
+            with open(path, 'rb') as f:
+                while f.read(16 * 1024**2):
+                    pass
+
+        loader = DataLoader(path)
+        runs = [
+            ("octets", read_bytes),
+            ("mmap", lambda: read_fixed(path)),
+            ("pandas", lambda: _pandas_table(loader)),
+        ]
+        print(f"{n:,} lignes, {mb:.1f} Mo")
+        for name, fn in runs:
+            _, seconds = _timed(fn)
+            print(f"{name:>8} : {seconds:6.2f} s  {mb / seconds:8.1f} Mo/s  {n / seconds:12,.0f} lignes/s")
+
+
+def _pandas_table(loader):
+    """Chemin pandas de DataLoader.load_table (lecteur rapide contourné)."""
+    from src.table import ArrivalTable
+    return ArrivalTable.concat([ArrivalTable.from_frame(chunk) for chunk in loader.iter_chunks(timestamp_format=None)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Chronomètre chaque étape de la chaîne d'analyse sur des journaux synthétiques de tailles croissantes
+et enregistre les résultats en JSON pour comparer deux commits.
+
+Étapes : DataLoader.load_csv, DataLoader.parse_dates, chaque méthode d'ArrivalAnalyzer,
+plot_hourly, plot_daily, generate_summary et insert_analysis.
+
+Usage :
+    python -m benchmarks.bench_stages [10k 100k 1M 10M 100M] [--out fichier.json] [--compare ancien.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.synthetic import parse_size, write_arrivals_csv
+from src import database
+from src.analyzer import ArrivalAnalyzer
+from src.data_loader import DataLoader
+from src.plotter import plot_hourly, plot_daily
+from src.report import generate_summary
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SIZES = ['10k', '100k', '1M', '10M']
+ANALYZER_METHODS = ('hourly_counts', 'daily_counts', 'busiest_hour', 'busiest_day', 'total_patients', 'average_daily')
+
+
+def _commit():
+    out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+    return out.stdout.strip() or 'inconnu'
+
+
+def run_stages(n, workdir):
+    """
+    Exécute la chaîne complète sur n lignes synthétiques.
+
+    Retourne :
+    dict : étape -> durée en secondes.
+    """
+    times = {}
+
+    def timed(stage, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        times[stage] = time.perf_counter() - t0
+        return result
+
+    csv = workdir / f'arrivals_{n}.csv'
+    timed('generate_csv', write_arrivals_csv, csv, n)
+    dl = DataLoader(csv)
+    df = timed('load_csv', dl.load_csv)
+    df = timed('parse_dates', dl.parse_dates, df)
+
+    # chaque méthode est chronométrée à son premier appel, dans l'ordre où la GUI les appelle
+    an = timed('analyzer_init', ArrivalAnalyzer, df)
+    results = {name: timed(f'analyzer.{name}', getattr(an, name)) for name in ANALYZER_METHODS}
+
+    timed('plot_hourly', plot_hourly, results['hourly_counts'], out_path=str(workdir / 'hourly.png'))
+    timed('plot_daily', plot_daily, results['daily_counts'], out_path=str(workdir / 'daily.png'))
+    (bh, bhc), (bd, bdc) = results['busiest_hour'], results['busiest_day']
+    timed('generate_summary', generate_summary, workdir / 'summary.json', results['total_patients'],
+          bh, bhc, bd, bdc, results['average_daily'])
+
+    database.DB_PATH = workdir / 'history.db'
+    database.init_db()
+    timed('insert_analysis', database.insert_analysis, csv.name, results['total_patients'], str(bh), str(bd),
+          busiest_hour_count=bhc, busiest_day_count=bdc, average_daily=results['average_daily'],
+          hourly=results['hourly_counts'], daily=results['daily_counts'])
+    database.close_connections()
+    return times
+
+
+def compare(current, previous):
+    """Affiche le rapport nouveau / ancien pour chaque étape commune."""
+    print(f"\ncomparaison avec {previous['commit']} (ratio < 1 : plus rapide)")
+    for size, stages in current['results'].items():
+        old = previous['results'].get(size)
+        if not old:
+            continue
+        ratios = [f"{stage} {t / old[stage]:.2f}" for stage, t in stages.items() if old.get(stage)]
+        print(f"{size:>10} : " + ", ".join(ratios))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('sizes', nargs='*', default=DEFAULT_SIZES, help="tailles (ex. 10k 1M 100M)")
+    parser.add_argument('--out', default=None, help="fichier JSON (par défaut benchmarks/results/stages-<commit>.json)")
+    parser.add_argument('--compare', default=None, help="JSON d'un run précédent")
+    args = parser.parse_args(argv)
+
+    report = {
+        'commit': _commit(),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'results': {},
+    }
+    with tempfile.TemporaryDirectory() as d:
+        for size in args.sizes:
+            n = parse_size(size)
+            times = run_stages(n, Path(d))
+            report['results'][str(n)] = {k: round(v, 6) for k, v in times.items()}
+            print(f"{n:>12,} lignes : " + ", ".join(f"{k} {v:.3f}s" for k, v in times.items()))
+            for f in Path(d).glob('arrivals_*.csv'):
+                f.unlink()
+
+    out = Path(args.out) if args.out else ROOT / 'benchmarks' / 'results' / f"stages-{report['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"résultats : {out}")
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text(encoding='utf-8')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Mesure le démarrage de l'interface : temps d'import de src.gui et temps jusqu'à la première
+fenêtre affichée, chacun dans un interpréteur neuf. Signale aussi les modules lourds chargés
+trop tôt. Code de sortie 1 si le budget est dépassé (garde-fou contre les régressions).
+
+Usage :
+    python -m benchmarks.bench_startup [--runs 5] [--budget-ms 300]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "PIL")
+
+IMPORT_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import src.gui
+t1 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+WINDOW_PROBE = """
+import json, time
+t0 = time.perf_counter()
+import tkinter
+from src.gui import PatientArrivalApp
+try:
+    app = PatientArrivalApp()
+except tkinter.TclError as e:
+    print(json.dumps({"error": str(e)}))
+    raise SystemExit
+app.update()
+t1 = time.perf_counter()
+app.destroy()
+print(json.dumps({"window_ms": (t1 - t0) * 1000}))
+"""
+
+
+def _probe(code):
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "échec"}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=300)
+    args = parser.parse_args(argv)
+
+    imports = [_probe(IMPORT_PROBE) for _ in range(args.runs)]
+    if "error" in imports[0]:
+        print(f"import de src.gui impossible : {imports[0]['error']}")
+        return 0
+    import_ms = min(r["import_ms"] for r in imports)
+    heavy = imports[0]["heavy"]
+    print(f"import src.gui : {import_ms:.0f} ms (meilleur de {args.runs})")
+    print(f"modules lourds chargés à l'import : {', '.join(heavy) or 'aucun'}")
+
+    windows = [_probe(WINDOW_PROBE) for _ in range(args.runs)]
+    if "error" in windows[0]:
+        print(f"première fenêtre : non mesurée ({windows[0]['error']})")
+        window_ms = None
+    else:
+        window_ms = min(r["window_ms"] for r in windows)
+        print(f"première fenêtre : {window_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+    over = heavy or (window_ms if window_ms is not None else import_ms) > args.budget_ms
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
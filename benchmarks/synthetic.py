@@ -0,0 +1,85 @@
+"""
+Générateur reproductible de journaux d'arrivées réalistes pour les benchmarks.
+
+Les arrivées suivent un profil horaire (creux la nuit, pic en fin de matinée et en soirée)
+et hebdomadaire (lundi chargé, week-end plus calme) ; une partie des visites sont des
+retours de patients déjà venus quelques jours plus tôt.
+"""
+import numpy as np
+import pandas as pd
+
+# poids relatifs des arrivées par heure de la journée (0h -> 23h)
+HOURLY_PROFILE = np.array([
+    2.0, 1.5, 1.2, 1.0, 1.0, 1.2, 2.0, 3.5, 5.0, 6.0, 6.5, 6.5,
+    6.0, 5.5, 5.5, 5.5, 5.8, 6.0, 6.2, 6.0, 5.0, 4.0, 3.0, 2.5,
+])
+# poids relatifs par jour de la semaine (lundi -> dimanche)
+WEEKDAY_PROFILE = np.array([1.2, 1.05, 1.0, 1.0, 1.05, 0.85, 0.8])
+# délai moyen (jours) avant une visite de retour
+MEAN_RETURN_DAYS = 10
+
+
+def parse_size(text):
+    """'10k', '1M', '100M' ou '2500' -> nombre de lignes."""
+    text = str(text).strip()
+    factor = {'k': 1_000, 'm': 1_000_000}.get(text[-1].lower(), 1)
+    return int(float(text[:-1] if factor > 1 else text) * factor)
+
+
+def generate_arrivals(n, n_patients=None, start='2024-01-01', days=365, repeat_rate=0.3, seed=0, sort=True):
+    """
+    Génère n arrivées.
+
+    Arguments :
+    n_patients (int, optionnel) : nombre de patients distincts possibles (par défaut n // 3).
+    repeat_rate (float) : part des visites qui sont des retours d'un patient déjà venu.
+    sort (bool) : trier par timestamp, comme un journal réel.
+
+    Retourne :
+    DataFrame : colonnes timestamp (datetime64) et patient_id (int64).
+    """
+    rng = np.random.default_rng(seed)
+    n_patients = n_patients or max(n // 3, 1)
+    n_first = n - int(n * repeat_rate)
+
+    # premières visites : jour tiré selon le jour de semaine, heure selon le profil horaire
+    start_day = np.datetime64(start, 'D')
+    day_weights = WEEKDAY_PROFILE[(np.arange(days) + (start_day.astype('int64') + 3)) % 7]
+    day = rng.choice(days, size=n_first, p=day_weights / day_weights.sum())
+    hour = rng.choice(24, size=n_first, p=HOURLY_PROFILE / HOURLY_PROFILE.sum())
+    seconds = day.astype(np.int64) * 86400 + hour * 3600 + rng.integers(0, 3600, size=n_first)
+    ids = rng.integers(0, n_patients, size=n_first)
+
+    # retours : un patient déjà venu revient quelques jours plus tard (délai géométrique en jours
+    # entiers, ce qui garde l'heure de visite et donc le profil horaire), gardé dans la période
+    n_repeat = n - n_first
+    if n_repeat:
+        base = rng.integers(0, n_first, size=n_repeat)
+        delay = rng.geometric(1 / MEAN_RETURN_DAYS, size=n_repeat).astype(np.int64) * 86400
+        seconds = np.concatenate([seconds, (seconds[base] + delay) % (days * 86400)])
+        ids = np.concatenate([ids, ids[base]])
+
+    if sort:
+        order = np.argsort(seconds, kind='stable')
+        seconds, ids = seconds[order], ids[order]
+    timestamps = start_day.astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+    return pd.DataFrame({'timestamp': timestamps.astype('datetime64[ns]'), 'patient_id': ids})
+
+
+def write_arrivals_csv(path, n, chunksize=5_000_000, **kwargs):
+    """
+    Écrit n arrivées dans un CSV par morceaux (mémoire bornée, y compris pour 100M lignes).
+
+    Chaque morceau couvre toute la période avec sa propre graine ; le fichier n'est donc trié
+    qu'à l'intérieur de chaque morceau.
+    """
+    seed = kwargs.pop('seed', 0)
+    kwargs.setdefault('n_patients', max(n // 3, 1))
+    written = 0
+    for i in range(0, n, chunksize):
+        size = min(chunksize, n - i)
+        df = generate_arrivals(size, seed=seed + i // chunksize, **kwargs)
+        df.to_csv(path, index=False, header=written == 0, mode='w' if written == 0 else 'a',
+                  date_format='%Y-%m-%d %H:%M:%S')
+        written += size
+    return written
@@ -1,41 +1,281 @@
+import math
+import numpy as np
 import pandas as pd
+from src.hll import DEFAULT_PRECISION, SketchTable, hash_ids, relative_error
+from src.instrument import span
+from src.table import ArrivalTable
+
+NS_PER_HOUR = 3_600 * 10**9
+NS_PER_DAY = 86_400 * 10**9
+ENGINES = ('numpy', 'pandas')
+# résolutions de base possibles pour la hiérarchie d'agrégats (en secondes, diviseurs de l'heure)
+ROLLUP_BASES = {'1min': 60, '5min': 300, '10min': 600, '15min': 900, '30min': 1800, 'h': 3600}
+ROLLUP_LEVELS = ('base', 'hour', 'day', 'week', 'month')
+
+
+def distinct_counts(buckets, codes, n_codes):
+    """
+    Compte les patients distincts par seau, sans tri.
+
+    Chaque paire (seau, patient) est encodée en un seul entier int64, dédoublonnée
+    par hachage (pandas.unique) puis comptée par seau avec numpy.bincount.
+
+    Arguments :
+    buckets (numpy.ndarray) : indice int64 du seau (heure, jour...) de chaque arrivée.
+    codes (numpy.ndarray) : code entier du patient (0 <= code < n_codes).
+    n_codes (int) : nombre de codes patients distincts.
+
+    Retourne :
+    tuple : (seaux non vides triés, nombre de patients distincts par seau)
+    """
+    if len(buckets) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    base = buckets.min()
+    keys = (buckets - base) * np.int64(n_codes) + codes
+    keys = pd.unique(keys)
+    counts = np.bincount(keys // n_codes)
+    present = np.flatnonzero(counts)
+    return present.astype(np.int64) + base, counts[present].astype(np.int64)
+
+
+def distinct_pairs(buckets, codes, n_codes):
+    """
+    Dédoublonne les paires (seau, patient) par encodage int64 et hachage, sans tri.
+
+    Retourne :
+    tuple : (seaux, codes patients) des paires distinctes, dans un ordre quelconque.
+    """
+    if len(buckets) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    base = buckets.min()
+    keys = pd.unique((buckets - base) * np.int64(n_codes) + codes)
+    return keys // n_codes + base, keys % n_codes
+
+
+class RollupHierarchy:
+    """
+    Hiérarchie d'agrégats base -> heure -> jour -> semaine / mois, construite en un seul passage.
+
+    Les données brutes ne sont lues qu'une fois, pour former les paires (seau, patient)
+    distinctes au niveau de base. Chaque niveau plus grossier est ensuite déduit des paires
+    du niveau plus fin (semaines et mois à partir des jours, une semaine pouvant chevaucher
+    deux mois), ce qui garde le sens « patients distincts » à toutes les granularités.
+    Les semaines commencent le lundi.
+    """
+    def __init__(self, df, timestamp_col='timestamp', id_col='patient_id', base='15min'):
+        if base not in ROLLUP_BASES:
+            raise ValueError(f"Unknown base resolution: {base}")
+        self.base = base
+        base_ns = ROLLUP_BASES[base] * 10**9
+        if isinstance(df, ArrivalTable):
+            keys, codes = df.keys_and_codes(ROLLUP_BASES[base])
+            self.n_codes = df.n_ids
+        else:
+            ns = df[timestamp_col].to_numpy(dtype='datetime64[ns]').view(np.int64)
+            codes, uniques = pd.factorize(df[id_col])
+            valid = (ns != np.iinfo(np.int64).min) & (codes >= 0)
+            keys, codes = ns[valid] // base_ns, codes[valid]
+            self.n_codes = len(uniques)
+
+        # niveau -> (niveau source, seau parent d'un seau source) ; semaines et mois partent des jours
+        parents = {
+            'hour': ('base', lambda b: b * base_ns // NS_PER_HOUR),
+            'day': ('hour', lambda b: b // 24),
+            # le 1er janvier 1970 est un jeudi : +3 jours pour aligner les semaines sur le lundi
+            'week': ('day', lambda b: (b + 3) // 7),
+            'month': ('day', lambda b: b.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)),
+        }
+        # début de chaque seau, en nanosecondes depuis 1970
+        self._starts = {
+            'base': lambda b: b * base_ns,
+            'hour': lambda b: b * NS_PER_HOUR,
+            'day': lambda b: b * NS_PER_DAY,
+            'week': lambda b: (b * 7 - 3) * NS_PER_DAY,
+            'month': lambda b: b.astype('datetime64[M]').astype('datetime64[ns]').view(np.int64),
+        }
+        self._pairs = {'base': distinct_pairs(keys, codes, self.n_codes)}
+        for level in ROLLUP_LEVELS[1:]:
+            source, parent = parents[level]
+            buckets, pcodes = self._pairs[source]
+            self._pairs[level] = distinct_pairs(parent(buckets), pcodes, self.n_codes)
+        self._counts = {}
+
+    def counts(self, level='base'):
+        """
+        Nombre de patients distincts par période au niveau demandé.
+
+        Arguments :
+        level (str) : 'base', 'hour', 'day', 'week' ou 'month'.
+
+        Retourne :
+        pandas.DataFrame : colonnes timestamp (début de période) et count, triées.
+        """
+        if level not in ROLLUP_LEVELS:
+            raise ValueError(f"Unknown level: {level}")
+        if level not in self._counts:
+            buckets, _ = self._pairs[level]
+            if len(buckets):
+                keys, counts = np.unique(buckets, return_counts=True)
+            else:
+                keys, counts = buckets, np.empty(0, dtype=np.int64)
+            self._counts[level] = pd.DataFrame({
+                'timestamp': self._starts[level](keys).view('datetime64[ns]'),
+                'count': counts.astype(np.int64),
+            })
+        return self._counts[level]
+
 
 class ArrivalAnalyzer:
     """
     Effectue une analyse statistique des données relatives à l'arrivée des patients.
+
+    Les tables horaire et journalière sont calculées une seule fois, au premier
+    besoin, puis réutilisées par toutes les métriques.
     """
-    def __init__(self, df, timestamp_col='timestamp', id_col='patient_id'):
+    def __init__(self, df, timestamp_col='timestamp', id_col='patient_id', engine='numpy'):
         """Initialisez l'analyseur avec un DataFrame.
         Arguments :
-        df (pandas.DataFrame) : DataFrame contenant les arrivées des patients."""
+        df (pandas.DataFrame ou ArrivalTable) : arrivées des patients (timestamp déjà converti).
+        Les données ne sont ni copiées ni modifiées.
+        engine (str) : 'numpy' (comptage vectorisé) ou 'pandas' (implémentation de référence)."""
         
-        self.df = df.copy()
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        self.df = df
         self.ts = timestamp_col
         self.id = id_col
+        self.engine = engine
+        # lignes écartées faute de timestamp lisible (renseigné par from_aggregator)
+        self.invalid_rows = 0
+        self._agg = None
+        self._hourly = None
+        self._daily = None
+        self._total = None
+        self._rollups = {}
+
+    @classmethod
+    def from_aggregator(cls, agg):
+        """
+        Construit un analyseur à partir d'agrégats déjà calculés (lecture par blocs).
+
+        Arguments :
+        agg (StreamingAggregator) : agrégats produits par DataLoader.stream_counts.
+        """
+        an = cls(None, agg.ts, agg.id)
+        an._agg = agg
+        an.invalid_rows = agg.invalid_rows
+        return an
+
+    @classmethod
+    def from_tables(cls, hourly, daily, total, timestamp_col='timestamp', id_col='patient_id'):
+        """
+        Construit un analyseur à partir de tables horaire/journalière déjà calculées.
+
+        Arguments :
+        hourly (pandas.DataFrame) : table (timestamp, count).
+        daily (pandas.DataFrame) : table (date, count).
+        total (int) : nombre total de patients distincts.
+        """
+        an = cls(None, timestamp_col, id_col)
+        an._hourly, an._daily, an._total = hourly, daily, int(total)
+        return an
+
+    def _aggregate(self):
+        """
+        Calcule en un seul passage les tables horaire et journalière, puis les met en cache.
+        """
+        if self._hourly is None:
+            with span("aggregate", rows=len(self.df) if self.df is not None else None):
+                if self._agg is not None:
+                    self._hourly = self._agg.hourly_counts()
+                    self._daily = self._agg.daily_counts()
+                elif self._numpy_ready():
+                    self._hourly, self._daily = self._numpy_tables()
+                else:
+                    self._hourly, self._daily = self._pandas_tables()
+
+    def _numpy_ready(self):
+        """Le chemin numpy ne traite que les timestamps naïfs datetime64 (ou une ArrivalTable)."""
+        if isinstance(self.df, ArrivalTable):
+            return self.engine == 'numpy'
+        return self.engine == 'numpy' and self.df[self.ts].dtype.kind == 'M'
+
+    def _pandas_tables(self):
+        """
+        Implémentation de référence : paires (heure, patient) distinctes comptées avec groupby.
+        """
+        df = self.df.to_frame() if isinstance(self.df, ArrivalTable) else self.df
+        ts, pid = (self.df.ts, self.df.id) if isinstance(self.df, ArrivalTable) else (self.ts, self.id)
+        pairs = pd.DataFrame({
+            'hour': df[ts].dt.floor('h').values,
+            'pid': df[pid].values,
+        }).dropna().drop_duplicates(ignore_index=True)
+        hourly = pairs.groupby('hour').size().reset_index(name='count').rename(columns={'hour': 'timestamp'})
+        days = pd.DataFrame({'date': pairs['hour'].dt.date, 'pid': pairs['pid']}).drop_duplicates()
+        daily = days.groupby('date').size().reset_index(name='count')
+        return hourly, daily
+
+    def _numpy_tables(self):
+        """
+        Chemin rapide : seaux entiers heure/jour et codes patients, comptés par distinct_counts.
+        """
+        if isinstance(self.df, ArrivalTable):
+            # codes déjà factorisés : aucune colonne n'est recopiée
+            hour_keys, codes = self.df.keys_and_codes(3600)
+            n_codes = self.df.n_ids
+        else:
+            ns = self.df[self.ts].to_numpy(dtype='datetime64[ns]').view(np.int64)
+            codes, uniques = pd.factorize(self.df[self.id])
+            valid = (ns != np.iinfo(np.int64).min) & (codes >= 0)
+            if not valid.all():
+                ns, codes = ns[valid], codes[valid]
+            hour_keys, n_codes = ns // NS_PER_HOUR, len(uniques)
+
+        hours, h_counts = distinct_counts(hour_keys, codes, n_codes)
+        days, d_counts = distinct_counts(hour_keys // 24, codes, n_codes)
+        hourly = pd.DataFrame({
+            'timestamp': (hours * NS_PER_HOUR).view('datetime64[ns]'),
+            'count': h_counts,
+        })
+        daily = pd.DataFrame({
+            'date': pd.to_datetime(days * NS_PER_DAY).date,
+            'count': d_counts,
+        })
+        return hourly, daily
+
+    def rollup(self, base='15min'):
+        """
+        Construit (une fois par résolution de base) la hiérarchie base/heure/jour/semaine/mois.
+
+        Retourne :
+        RollupHierarchy : comptes de patients distincts à chaque granularité.
+        """
+        if self.df is None:
+            raise ValueError("Rollups need the raw arrivals DataFrame")
+        if base not in self._rollups:
+            with span(f"rollup.{base}", rows=len(self.df)):
+                self._rollups[base] = RollupHierarchy(self.df, self.ts, self.id, base)
+        return self._rollups[base]
 
     def hourly_counts(self):
         """
         Calcule le nombre d'arrivées de patients par heure.
 
         Retourne :
-        pandas.DataFrame : nombre d'arrivées par heure.
+        pandas.DataFrame : nombre d'arrivées par heure (table en cache, à ne pas modifier).
         """
-        df = self.df.copy()
-        df['hour'] = df[self.ts].dt.floor('H')
-        res = df.groupby('hour')[self.id].nunique().reset_index().rename(columns={'hour':'timestamp','patient_id':'count'})
-        return res
+        self._aggregate()
+        return self._hourly
 
     def daily_counts(self):
         """
         Calcule le nombre d'arrivées de patients par Jour.
 
         Retourne :
-        pandas.DataFrame : nombre d'arrivées par jour.
+        pandas.DataFrame : nombre d'arrivées par jour (table en cache, à ne pas modifier).
         """
-        df = self.df.copy()
-        df['day'] = df[self.ts].dt.date
-        res = df.groupby('day')[self.id].nunique().reset_index().rename(columns={'day':'date','patient_id':'count'})
-        return res
+        self._aggregate()
+        return self._daily
 
     def busiest_hour(self):
         """
@@ -45,7 +285,7 @@ class ArrivalAnalyzer:
         tuple : (heure la plus fréquentée, nombre d'arrivées)
         """
         h = self.hourly_counts()
-        row = h.sort_values('count', ascending=False).iloc[0]
+        row = h.iloc[h['count'].to_numpy().argmax()]
         return row['timestamp'], int(row['count'])
 
     def busiest_day(self):
@@ -56,12 +296,315 @@ class ArrivalAnalyzer:
         tuple : (jour le plus fréquenté, nombre d'arrivées)
         """
         d = self.daily_counts()
-        row = d.sort_values('count', ascending=False).iloc[0]
+        row = d.iloc[d['count'].to_numpy().argmax()]
         return str(row['date']), int(row['count'])
 
     def total_patients(self):
-        return int(self.df[self.id].nunique())
+        if self._total is None:
+            with span("total_patients"):
+                if isinstance(self.df, ArrivalTable):
+                    self._total = self.df.distinct_patients()
+                elif self.df is not None:
+                    self._total = int(self.df[self.id].nunique())
+                else:
+                    self._total = self._agg.total_patients()
+        return self._total
 
     def average_daily(self):
         d = self.daily_counts()
         return float(d['count'].mean())
+
+
+def _sorted_unique(keys):
+    """Valeurs distinctes triées (hachage pandas puis tri, plus rapide que numpy.unique)."""
+    keys = pd.unique(keys)
+    keys.sort()
+    return keys
+
+
+class OutOfOrderError(ValueError):
+    """Des arrivées tombent dans un jour déjà réduit à ses comptes (fichier non chronologique)."""
+
+
+class StreamingAggregator:
+    """
+    Agrège les arrivées bloc par bloc, sans garder les lignes brutes en mémoire.
+
+    Les identifiants sont factorisés en codes entiers et chaque paire (heure, patient)
+    distincte tient dans un int64 (heure << 32 | code). Les paires d'un bloc sont dédoublonnées
+    contre l'ensemble trié des paires en attente, jamais contre tout l'historique.
+    Avec collapse=True, les jours antérieurs au bloc courant sont réduits à leurs comptes
+    horaires et journaliers : pour un fichier chronologique, la mémoire dépend de la taille
+    des blocs, d'un jour de paires et du nombre de patients, pas de la taille du fichier.
+    Le premier jour vu n'est jamais réduit (il peut continuer dans la partition précédente).
+    Une arrivée dans un jour déjà réduit lève OutOfOrderError : il faut alors relire sans réduction.
+    """
+    def __init__(self, timestamp_col='timestamp', id_col='patient_id', collapse=True):
+        self.ts = timestamp_col
+        self.id = id_col
+        self.collapse = collapse
+        self.rows = 0
+        # lignes dont le timestamp est vide ou illisible
+        self.invalid_rows = 0
+        self.ids = pd.Index([], dtype=object)
+        self._seen = np.zeros(0, dtype=bool)
+        self._keys = np.empty(0, dtype=np.int64)
+        self._first_day = None
+        # jours réduits : intervalles (premier, dernier) et comptes (seaux, comptes) par niveau
+        self._closed = []
+        self._hours, self._days = [], []
+
+    @classmethod
+    def from_pairs(cls, pairs, timestamp_col='timestamp', id_col='patient_id'):
+        """
+        Reconstruit un agrégateur à partir de paires (hour, pid) distinctes déjà calculées.
+        """
+        agg = cls(timestamp_col, id_col, collapse=False)
+        hours = pairs['hour'].to_numpy(dtype='datetime64[ns]').view(np.int64) // NS_PER_HOUR
+        agg._add(hours, agg._encode(pairs['pid']))
+        return agg
+
+    # ---------------------------
+    # Codes patients et paires
+    # ---------------------------
+    def _map_ids(self, uniques):
+        """Codes globaux des identifiants distincts uniques (les nouveaux sont ajoutés)."""
+        mapping = self.ids.get_indexer(uniques)
+        new = mapping < 0
+        if new.any():
+            mapping[new] = len(self.ids) + np.arange(np.count_nonzero(new))
+            self.ids = self.ids.append(pd.Index(uniques[new], dtype=object))
+            self._seen = np.append(self._seen, np.zeros(np.count_nonzero(new), dtype=bool))
+        return mapping.astype(np.int64)
+
+    def _encode(self, values):
+        """Codes globaux d'une colonne d'identifiants (-1 si absent)."""
+        codes, uniques = pd.factorize(values)
+        # -1 (patient absent) reste -1 grâce à la case ajoutée en fin de correspondance
+        return np.append(self._map_ids(pd.Index(uniques, dtype=object)), -1)[codes]
+
+    def _add(self, hours, codes):
+        """Ajoute des arrivées valides (heures depuis 1970, codes globaux)."""
+        if len(hours) == 0:
+            return
+        keys = _sorted_unique((hours << 32) | codes)
+        days = (keys >> 32) // 24
+        if self._in_closed(days).any():
+            raise OutOfOrderError("arrivals fall in an already collapsed day")
+        self._keys = _sorted_unique(np.concatenate([self._keys, keys]))
+        self._seen[codes] = True
+        first = int(days[0])
+        if self._first_day is None or first < self._first_day:
+            self._first_day = first
+        if self.collapse:
+            # les jours avant celui du bloc courant ne peuvent plus changer (fichier chronologique)
+            self._close_before(first)
+
+    def _in_closed(self, days):
+        inside = np.zeros(len(days), dtype=bool)
+        for lo, hi in self._closed:
+            inside |= (days >= lo) & (days <= hi)
+        return inside
+
+    def _close_before(self, day):
+        """Réduit à leurs comptes les jours en attente strictement entre le premier jour et day."""
+        lo = self._closed[-1][1] + 1 if self._closed else self._first_day + 1
+        if day <= lo:
+            return
+        keys = self._keys
+        a, b = np.searchsorted(keys, [(lo * 24) << 32, (day * 24) << 32])
+        if b > a:
+            closing = keys[a:b]
+            hours, codes = closing >> 32, closing & 0xFFFFFFFF
+            self._hours.append(np.unique(hours, return_counts=True))
+            self._days.append(distinct_counts(hours // 24, codes, len(self.ids)))
+            self._keys = np.concatenate([keys[:a], keys[b:]])
+        if self._closed and self._closed[-1][1] + 1 == lo:
+            self._closed[-1] = (self._closed[-1][0], day - 1)
+        else:
+            self._closed.append((lo, day - 1))
+
+    # ---------------------------
+    # Mise à jour
+    # ---------------------------
+    def update(self, chunk):
+        """
+        Ajoute un bloc (DataFrame avec timestamp déjà converti) aux agrégats.
+        """
+        ns = chunk[self.ts].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        codes = self._encode(chunk[self.id])
+        valid = (ns != np.iinfo(np.int64).min) & (codes >= 0)
+        self.rows += len(chunk)
+        self._add(ns[valid] // NS_PER_HOUR, codes[valid])
+
+    def merge(self, other):
+        """
+        Fusionne les agrégats d'un autre StreamingAggregator (autre fichier ou partition).
+
+        Les paires sont dédoublonnées : un patient vu dans deux partitions pour la même
+        heure n'est compté qu'une fois. Lève OutOfOrderError si des jours déjà réduits
+        d'un côté ont aussi des arrivées de l'autre (le dédoublonnage n'y est plus possible).
+        """
+        mapping = self._map_ids(other.ids)
+        keys = (other._keys >> 32 << 32) | mapping[other._keys & 0xFFFFFFFF]
+        other_days = [(keys >> 32) // 24] + [d for d, _ in other._days]
+        own_days = [(self._keys >> 32) // 24] + [d for d, _ in self._days]
+        if (any(self._in_closed(d).any() for d in other_days)
+                or any(other._in_closed(d).any() for d in own_days)):
+            raise OutOfOrderError("collapsed days overlap between the merged aggregates")
+        self.rows += other.rows
+        self.invalid_rows += other.invalid_rows
+        self._keys = _sorted_unique(np.concatenate([self._keys, keys]))
+        self._seen[mapping[other._seen]] = True
+        self._hours.extend(other._hours)
+        self._days.extend(other._days)
+        self._closed = sorted(self._closed + other._closed)
+        if other._first_day is not None and (self._first_day is None or other._first_day < self._first_day):
+            self._first_day = other._first_day
+        return self
+
+    # ---------------------------
+    # Résultats
+    # ---------------------------
+    def pairs(self):
+        """
+        Retourne :
+        pandas.DataFrame : paires (hour, pid) distinctes vues jusqu'ici.
+
+        Indisponible si des jours ont été réduits (utiliser collapse=False).
+        """
+        if self._closed:
+            raise ValueError("Pairs of collapsed days are no longer available (use collapse=False)")
+        return pd.DataFrame({
+            'hour': ((self._keys >> 32) * NS_PER_HOUR).view('datetime64[ns]'),
+            'pid': self.ids.to_numpy(dtype=object)[self._keys & 0xFFFFFFFF],
+        })
+
+    def hourly_counts(self):
+        """
+        Retourne :
+        pandas.DataFrame : nombre de patients distincts par heure (timestamp, count).
+        """
+        hours, counts = np.unique(self._keys >> 32, return_counts=True)
+        parts = self._hours + [(hours, counts)]
+        hours = np.concatenate([h for h, _ in parts]).astype(np.int64)
+        counts = np.concatenate([c for _, c in parts]).astype(np.int64)
+        order = np.argsort(hours, kind='stable')
+        return pd.DataFrame({
+            'timestamp': (hours[order] * NS_PER_HOUR).view('datetime64[ns]'),
+            'count': counts[order],
+        })
+
+    def daily_counts(self):
+        """
+        Retourne :
+        pandas.DataFrame : nombre de patients distincts par jour (date, count).
+        """
+        parts = self._days + [distinct_counts((self._keys >> 32) // 24, self._keys & 0xFFFFFFFF, len(self.ids))]
+        days = np.concatenate([d for d, _ in parts]).astype(np.int64)
+        counts = np.concatenate([c for _, c in parts]).astype(np.int64)
+        order = np.argsort(days, kind='stable')
+        return pd.DataFrame({
+            'date': pd.to_datetime(days[order] * NS_PER_DAY).date,
+            'count': counts[order],
+        })
+
+    def total_patients(self):
+        return int(np.count_nonzero(self._seen))
+
+
+class ApproximateArrivalAnalyzer(ArrivalAnalyzer):
+    """
+    Variante approximative de l'analyseur, fondée sur des sketches HyperLogLog.
+
+    Un sketch est gardé par heure ; les sketches journaliers et le sketch total en sont
+    déduits par fusion. La mémoire par seau est fixe (2**precision octets) et les
+    analyseurs peuvent être fusionnés entre fichiers ou sauvegardés entre exécutions.
+    """
+    def __init__(self, df=None, timestamp_col='timestamp', id_col='patient_id', precision=DEFAULT_PRECISION):
+        super().__init__(None, timestamp_col, id_col)
+        self.hours = SketchTable(precision)
+        self._days = None
+        if df is not None:
+            self.update(df)
+
+    @property
+    def precision(self):
+        return self.hours.precision
+
+    def _invalidate(self):
+        self._hourly = self._daily = self._days = self._total = None
+
+    def update(self, chunk):
+        """
+        Ajoute un bloc d'arrivées (DataFrame au timestamp déjà converti, ou ArrivalTable) aux sketches.
+        """
+        if isinstance(chunk, ArrivalTable):
+            keys, codes = chunk.keys_and_codes(3600)
+            with span("sketch.update", rows=len(chunk)):
+                # un hachage par identifiant distinct, pas par arrivée
+                self.hours.add(keys, hash_ids(chunk.ids)[codes])
+            self._invalidate()
+            return self
+        ns = chunk[self.ts].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        ids = chunk[self.id].to_numpy()
+        valid = (ns != np.iinfo(np.int64).min) & pd.notna(ids)
+        with span("sketch.update", rows=len(chunk)):
+            self.hours.add(ns[valid] // NS_PER_HOUR, hash_ids(ids[valid]))
+        self._invalidate()
+        return self
+
+    def merge(self, other):
+        """
+        Fusionne les sketches d'un autre analyseur approximatif (autre fichier, autre exécution).
+        """
+        self.hours.merge(other.hours)
+        self._invalidate()
+        return self
+
+    def save(self, path):
+        """Sauvegarde les sketches horaires dans un fichier .npz."""
+        np.savez_compressed(path, precision=self.precision, keys=self.hours.keys, registers=self.hours.registers)
+
+    @classmethod
+    def load(cls, path, timestamp_col='timestamp', id_col='patient_id'):
+        """Recharge des sketches sauvegardés avec save()."""
+        data = np.load(path)
+        an = cls(None, timestamp_col, id_col, precision=int(data['precision']))
+        an.hours.keys, an.hours.registers = data['keys'], data['registers']
+        return an
+
+    def _aggregate(self):
+        if self._hourly is None:
+            with span("aggregate"):
+                self._days = self.hours.rollup(self.hours.keys // 24)
+                self._hourly = pd.DataFrame({
+                    'timestamp': (self.hours.keys * NS_PER_HOUR).view('datetime64[ns]'),
+                    'count': np.rint(self.hours.estimates()).astype(np.int64),
+                })
+                self._daily = pd.DataFrame({
+                    'date': pd.to_datetime(self._days.keys * NS_PER_DAY).date,
+                    'count': np.rint(self._days.estimates()).astype(np.int64),
+                })
+
+    def total_patients(self):
+        if self._total is None:
+            self._aggregate()
+            total = self._days.rollup(np.zeros(len(self._days.keys), dtype=np.int64)).estimates()
+            self._total = int(np.rint(total[0])) if len(total) else 0
+        return self._total
+
+    def error_bounds(self):
+        """
+        Retourne :
+        dict : précision, erreur relative standard et intervalle à 95 % du total de patients.
+        """
+        rse = relative_error(self.precision)
+        total = self.total_patients()
+        return {
+            "mode": "hyperloglog",
+            "precision": self.precision,
+            "bytes_per_bucket": self.hours.m,
+            "relative_standard_error": rse,
+            "total_patients_95ci": [int(total * (1 - 1.96 * rse)), int(math.ceil(total * (1 + 1.96 * rse)))],
+        }
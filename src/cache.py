@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.table import ArrivalTable
+
+CACHE_DIR = Path("data/cache")
+DEFAULT_BUDGET = 4 * 1024**3
+# octets lus au début et à la fin du fichier pour l'empreinte de contenu
+SAMPLE_BYTES = 1 << 20
+
+
+def fingerprint(path):
+    """
+    Empreinte d'un fichier : chemin, taille, date de modification et hash du contenu.
+
+    Le hash porte sur le premier et le dernier Mo du fichier, pour qu'un fichier de
+    plusieurs Go n'ait pas à être relu en entier à chaque ouverture.
+    """
+    path = Path(path).resolve()
+    st = path.stat()
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        h.update(f.read(SAMPLE_BYTES))
+        if st.st_size > 2 * SAMPLE_BYTES:
+            f.seek(-SAMPLE_BYTES, os.SEEK_END)
+            h.update(f.read())
+    return {"path": str(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": h.hexdigest()}
+
+
+def _dir_size(path):
+    return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+
+
+class ParsedCache:
+    """
+    Cache disque des colonnes déjà validées et converties (timestamp, patient_id).
+
+    Les colonnes sont stockées en .npy et rechargées par projection mémoire (memmap),
+    sans relire ni reparser le CSV. Les entrées les moins récemment utilisées sont
+    supprimées dès que le cache dépasse son budget disque.
+    Les tables compactes (ArrivalTable, précision minute) ont leurs propres entrées
+    (put_table / get_table) : elles ne remplacent jamais les timestamps complets de put.
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_BUDGET):
+        self.dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def _key(self, fp, timestamp_col, id_col, timestamp_format, kind=""):
+        path_key = hashlib.sha1((fp["path"] + kind).encode()).hexdigest()[:16]
+        content = json.dumps([fp, timestamp_col, id_col, timestamp_format], sort_keys=True)
+        return path_key, f"{path_key}-{hashlib.sha1(content.encode()).hexdigest()[:16]}"
+
+    def get(self, path, timestamp_col='timestamp', id_col='patient_id', timestamp_format=None):
+        """
+        Retourne :
+        pandas.DataFrame ou None : colonnes en cache (memmap), None si absent ou périmé.
+        """
+        _, key = self._key(fingerprint(path), timestamp_col, id_col, timestamp_format)
+        entry = self.dir / key
+        meta_file = entry / "meta.json"
+        if not meta_file.exists():
+            return None
+        meta = json.loads(meta_file.read_text(encoding='utf-8'))
+        os.utime(meta_file)  # marque l'entrée comme récemment utilisée
+
+        ts = np.load(entry / "timestamp.npy", mmap_mode='r')
+        if meta["ids"] == "codes":
+            codes = np.load(entry / "codes.npy", mmap_mode='r')
+            ids = pd.Categorical.from_codes(codes, np.load(entry / "uniques.npy", allow_pickle=False))
+        else:
+            ids = np.load(entry / "ids.npy", mmap_mode='r')
+        return pd.DataFrame({timestamp_col: ts.view('datetime64[ns]'), id_col: ids}, copy=False)
+
+    def put(self, path, df, timestamp_col='timestamp', id_col='patient_id', timestamp_format=None):
+        """
+        Enregistre les colonnes timestamp/patient_id d'un DataFrame déjà validé et converti.
+
+        timestamp_format : format imposé lors du chargement (None si deviné), fait partie de la clé.
+        """
+        arrays = {"timestamp": df[timestamp_col].to_numpy(dtype='datetime64[ns]').view(np.int64)}
+        ids = df[id_col]
+        if ids.dtype.kind in 'iu':
+            arrays["ids"] = ids.to_numpy()
+            mode = "values"
+        else:
+            codes, uniques = pd.factorize(ids)
+            arrays["codes"] = codes.astype(np.int32)
+            arrays["uniques"] = np.asarray(uniques, dtype=str)
+            mode = "codes"
+        self._write(self._key(fingerprint(path), timestamp_col, id_col, timestamp_format), arrays,
+                    {"ids": mode, "rows": len(df)})
+
+    def get_table(self, path, timestamp_col='timestamp', id_col='patient_id', timestamp_format=None):
+        """
+        Retourne :
+        tuple ou None : (ArrivalTable en memmap, nombre de timestamps illisibles), None si absent ou périmé.
+        """
+        _, key = self._key(fingerprint(path), timestamp_col, id_col, timestamp_format, kind=":table")
+        entry = self.dir / key
+        meta_file = entry / "meta.json"
+        if not meta_file.exists():
+            return None
+        meta = json.loads(meta_file.read_text(encoding='utf-8'))
+        os.utime(meta_file)
+        table = ArrivalTable(np.load(entry / "minutes.npy", mmap_mode='r'), np.load(entry / "codes.npy", mmap_mode='r'),
+                             np.load(entry / "uniques.npy", allow_pickle=False), timestamp_col, id_col)
+        return table, meta["invalid"]
+
+    def put_table(self, path, table, invalid=0, timestamp_format=None):
+        """
+        Enregistre une ArrivalTable (ex. lue par src.fastreader) et son nombre de timestamps illisibles.
+        """
+        ids = table.ids if table.ids.dtype.kind in 'iu' else np.asarray(table.ids, dtype=str)
+        self._write(self._key(fingerprint(path), table.ts, table.id, timestamp_format, kind=":table"),
+                    {"minutes": table.minutes, "codes": table.codes, "uniques": ids},
+                    {"rows": len(table), "invalid": int(invalid)})
+
+    def _write(self, keys, arrays, meta):
+        """Écrit une entrée (tableaux .npy et meta.json) via un dossier temporaire, puis applique le budget."""
+        path_key, key = keys
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=self.dir, prefix=".tmp-"))
+        try:
+            for name, values in arrays.items():
+                np.save(tmp / f"{name}.npy", values)
+            (tmp / "meta.json").write_text(json.dumps(meta), encoding='utf-8')
+
+            # une seule version par fichier source : les anciennes empreintes sont supprimées
+            for old in self.dir.glob(f"{path_key}-*"):
+                shutil.rmtree(old, ignore_errors=True)
+            os.replace(tmp, self.dir / key)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._evict()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà du budget disque."""
+        entries = []
+        for entry in self.dir.iterdir():
+            meta = entry / "meta.json"
+            if entry.is_dir() and meta.exists():
+                entries.append((meta.stat().st_mtime, _dir_size(entry), entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Vide le cache."""
+        shutil.rmtree(self.dir, ignore_errors=True)
@@ -0,0 +1,215 @@
+"""
+Analyse en lot, sans interface graphique (serveur sans écran).
+
+Usage :
+    python -m src.cli data/*.csv archives/ --out data/output --workers 4 --site urgences
+
+Aucun import de tkinter ni de PIL ; pandas, matplotlib et les modules d'analyse ne sont
+importés qu'au moment de traiter les fichiers, pour que le démarrage reste rapide.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+COMBINED_SUMMARY = "combined_summary.json"
+
+
+def expand_inputs(patterns):
+    """
+    Développe les arguments en liste de fichiers CSV (motifs glob, dossiers ou fichiers).
+
+    Retourne :
+    list : chemins uniques, dans l'ordre des arguments.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, "*.csv")))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True)) or ([pattern] if os.path.exists(pattern) else [])
+        paths.extend(Path(m) for m in matches)
+    return list(dict.fromkeys(paths))
+
+
+def plan_outputs(paths, out_dir):
+    """Un sous-dossier de sortie par fichier, nommé d'après le fichier (suffixé en cas de doublon)."""
+    used, planned = set(), []
+    for path in paths:
+        name, i = path.stem, 1
+        while name in used:
+            i += 1
+            name = f"{path.stem}_{i}"
+        used.add(name)
+        planned.append(Path(out_dir) / name)
+    return planned
+
+
+def analyze_file(task):
+    """
+    Tâche exécutée dans un processus : analyse un CSV et écrit ses sorties.
+
+    Retourne :
+    dict : enregistrement pour database.insert_analyses, avec le résumé en plus.
+    """
+    if not (task.get("instrument") or task.get("profile")):
+        return _analyze_file(task)
+    from src.instrument import recording
+    from src.outputs import rewrite_summary
+    with recording(capture_dir=task["out_dir"] if task.get("profile") else None) as recorder:
+        rec = _analyze_file(task)
+    rec["summary"]["instrumentation"] = recorder.report()
+    rewrite_summary(task["out_dir"], rec["summary"])
+    return rec
+
+
+def _analyze_file(task):
+    from src.analyzer import ArrivalAnalyzer, ApproximateArrivalAnalyzer
+    from src.data_loader import DataLoader
+    from src.outputs import write_outputs
+    from src.report import build_summary
+
+    path, out_dir = Path(task["path"]), Path(task["out_dir"])
+    dl = DataLoader(path, timestamp_format=task["timestamp_format"])
+    df = dl.load_table(task["timestamp_col"], task["id_col"])
+    cls = ApproximateArrivalAnalyzer if task["approximate"] else ArrivalAnalyzer
+    analyzer = cls(df, task["timestamp_col"], task["id_col"])
+    hourly, daily = analyzer.hourly_counts(), analyzer.daily_counts()
+    bh, bhc = analyzer.busiest_hour()
+    bd, bdc = analyzer.busiest_day()
+    extra = {"file_name": path.name, "rows": len(df)}
+    if dl.invalid_rows:
+        extra["unparseable_rows"] = dl.invalid_rows
+    if task["approximate"]:
+        extra["approximation"] = analyzer.error_bounds()
+    summary = build_summary(analyzer.total_patients(), bh, bhc, bd, bdc, analyzer.average_daily(), extra=extra)
+    # déjà dans un processus du pool : pas de second pool pour les graphiques
+    write_outputs(out_dir, hourly, daily, summary, processes=False, fmt=task["format"])
+    return {
+        "file_name": path.name,
+        "total_patients": summary["total_patients"],
+        "busiest_hour": summary["busiest_hour"],
+        "busiest_day": summary["busiest_day"],
+        "busiest_hour_count": summary["busiest_hour_count"],
+        "busiest_day_count": summary["busiest_day_count"],
+        "average_daily": summary["average_daily"],
+        "hourly": hourly,
+        "daily": daily,
+        "summary": summary,
+    }
+
+
+def run_batch(paths, out_dir, workers=1, site=None, record_history=True, **options):
+    """
+    Analyse une liste de fichiers dans un pool de processus.
+
+    Chaque fichier a ses propres sorties ; combined_summary.json regroupe les résumés et les
+    échecs, et toutes les analyses réussies sont enregistrées dans une seule transaction.
+
+    Arguments :
+    workers (int) : nombre de processus (1 = sans pool).
+    options : format, timestamp_format, approximate, timestamp_col, id_col, instrument, profile.
+
+    Retourne :
+    dict : le résumé combiné.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    defaults = {"format": "csv", "timestamp_format": None, "approximate": False,
+                "timestamp_col": "timestamp", "id_col": "patient_id"}
+    tasks = [dict(defaults, **options, path=str(p), out_dir=str(d))
+             for p, d in zip(paths, plan_outputs(paths, out_dir))]
+
+    start = time.perf_counter()
+    records, failures = {}, []
+
+    def collect(task, future_result):
+        try:
+            records[task["path"]] = future_result()
+            print(f"[ok] {task['path']}", file=sys.stderr)
+        except Exception as e:
+            failures.append({"file": task["path"], "error": f"{type(e).__name__}: {e}"})
+            print(f"[échec] {task['path']} : {e}", file=sys.stderr)
+
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            collect(task, lambda task=task: analyze_file(task))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = {pool.submit(analyze_file, task): task for task in tasks}
+            for future in as_completed(futures):
+                collect(futures[future], future.result)
+
+    # ordre des arguments, quel que soit l'ordre de fin des processus
+    ordered = [records[t["path"]] for t in tasks if t["path"] in records]
+    for rec in ordered:
+        rec["site"] = site
+    if record_history and ordered:
+        from src.database import insert_analyses
+        insert_analyses(ordered)
+
+    combined = {
+        "files": len(tasks),
+        "succeeded": len(ordered),
+        "failed": failures,
+        "rows": sum(rec["summary"]["rows"] for rec in ordered),
+        # somme des totaux par fichier : un patient présent dans deux fichiers compte deux fois
+        "total_patients_sum": sum(rec["total_patients"] for rec in ordered),
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+        "summaries": [rec["summary"] for rec in ordered],
+    }
+    if site is not None:
+        combined["site"] = site
+    with open(out_dir / COMBINED_SUMMARY, "w", encoding="utf-8") as f:
+        json.dump(combined, f, indent=2)
+    return combined
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="Analyse en lot de CSV d'arrivées de patients, sans interface graphique.")
+    parser.add_argument("inputs", nargs="+", help="fichiers, dossiers ou motifs glob (ex. 'data/**/*.csv')")
+    parser.add_argument("--out", default="data/output", help="dossier de sortie (un sous-dossier par fichier)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="nombre de processus")
+    parser.add_argument("--format", default="csv", help="format des séries : csv, csv.gz, csv.zst, parquet, arrow, npy")
+    parser.add_argument("--timestamp-format", default=None, help="format strftime des timestamps (deviné sinon)")
+    parser.add_argument("--timestamp-col", default="timestamp")
+    parser.add_argument("--id-col", default="patient_id")
+    parser.add_argument("--approximate", action="store_true", help="comptage approximatif (HyperLogLog)")
+    parser.add_argument("--instrument", action="store_true", help="durées et mémoire par étape dans summary.json")
+    parser.add_argument("--profile", action="store_true", help="écrire aussi profile.pstats et tracemalloc.txt par fichier")
+    parser.add_argument("--site", default=None, help="site enregistré avec chaque analyse")
+    parser.add_argument("--db", default=None, help="base d'historique (par défaut data/analysis_history.db)")
+    parser.add_argument("--no-db", action="store_true", help="ne pas enregistrer l'historique")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    from src.export import FORMATS
+    if args.format not in FORMATS:
+        parser.error(f"format inconnu : {args.format} (choix : {', '.join(FORMATS)})")
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("aucun fichier CSV trouvé")
+    if args.db:
+        from src import database
+        database.DB_PATH = Path(args.db)
+
+    combined = run_batch(paths, args.out, workers=args.workers, site=args.site, record_history=not args.no_db,
+                         format=args.format, timestamp_format=args.timestamp_format, approximate=args.approximate,
+                         timestamp_col=args.timestamp_col, id_col=args.id_col,
+                         instrument=args.instrument, profile=args.profile)
+    print(f"{combined['succeeded']}/{combined['files']} fichiers analysés en {combined['elapsed_seconds']} s "
+          f"-> {Path(args.out) / COMBINED_SUMMARY}")
+    return 1 if combined["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,57 @@
+import io
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from src.analyzer import OutOfOrderError, StreamingAggregator
+from src.fastreader import LayoutError, read_fixed
+from src.instrument import span
+from src.table import ArrivalTable
+from src.timeparse import parse_timestamps
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_CHUNKSIZE = 500_000
+
+
+class _ByteRange(io.RawIOBase):
+    """Fichier binaire limité à l'intervalle d'octets [start, end)."""
+    def __init__(self, f, start, end):
+        f.seek(start)
+        self._f = f
+        self._left = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self._left)
+        if n <= 0:
+            return 0
+        data = self._f.read(n)
+        b[:len(data)] = data
+        self._left -= len(data)
+        return len(data)
+
 
 class DataLoader:
-    def __init__(self, path):
+    def __init__(self, path, cache=None, timestamp_format=None):
+        """
+        path : chemin du fichier CSV.
+        cache (ParsedCache, optionnel) : cache des colonnes déjà converties.
+        timestamp_format (str, optionnel) : format imposé des timestamps ; sinon deviné une fois.
+        """
         self.path = Path(path)
+        self.cache = cache
+        self.timestamp_format = timestamp_format
+        # nombre de lignes dont le timestamp est vide ou illisible (dernier chargement)
+        self.invalid_rows = 0
 
     def load_csv(self):
         """
         charger le fichier CSV dans un DataFrame
         """
-        df = pd.read_csv(self.path)
+        with span("load_csv") as s:
+            df = pd.read_csv(self.path)
+            s.set_rows(len(df))
         return df
 
     def validate(self, df, timestamp_col='timestamp', id_col='patient_id'):
@@ -22,10 +64,187 @@ class DataLoader:
             raise ValueError(f"Missing column: {id_col}")
         return True
 
-    def parse_dates(self, df, timestamp_col='timestamp'):
+    def parse_dates(self, df, timestamp_col='timestamp', timestamp_format=None):
         """
         transformer la colonne de timestamp en objets datetime
+
+        Les valeurs illisibles deviennent NaT et sont comptées dans self.invalid_rows.
+        Le format deviné est mémorisé dans self.timestamp_format.
+        """
+        fmt = timestamp_format or self.timestamp_format
+        with span("parse_dates", rows=len(df)):
+            ts, self.invalid_rows, self.timestamp_format = parse_timestamps(df[timestamp_col], fmt)
+        df = df.copy(deep=False)
+        df[timestamp_col] = ts
+        return df
+
+    def load_parsed(self, timestamp_col='timestamp', id_col='patient_id'):
         """
-        df = df.copy()
-        df[timestamp_col] = pd.to_datetime(df[timestamp_col])
+        charger, valider et convertir les colonnes timestamp/patient_id, en passant par le cache.
+
+        Si le fichier n'a pas changé depuis le dernier chargement, les colonnes sont relues
+        depuis le cache (memmap) sans reparser le CSV.
+        """
+        if self.cache is not None:
+            with span("cache.get"):
+                df = self.cache.get(self.path, timestamp_col, id_col, self.timestamp_format)
+            if df is not None:
+                self.invalid_rows = int(df[timestamp_col].isna().sum())
+                return df
+        df = self.load_csv()
+        self.validate(df, timestamp_col, id_col)
+        timestamp_format = self.timestamp_format
+        df = self.parse_dates(df[[timestamp_col, id_col]], timestamp_col)
+        if self.cache is not None:
+            with span("cache.put", rows=len(df)):
+                self.cache.put(self.path, df, timestamp_col, id_col, timestamp_format)
         return df
+
+    def load_table(self, timestamp_col='timestamp', id_col='patient_id', chunksize=DEFAULT_CHUNKSIZE,
+                   progress=None):
+        """
+        charger le fichier sous forme d'ArrivalTable compacte (8 octets par arrivée).
+
+        Les fichiers au format fixe « YYYY-MM-DD HH:MM:SS,patient_id » passent par le lecteur
+        mmap de src.fastreader ; les autres sont lus par blocs avec pandas (seule la table compacte
+        grandit, jamais un DataFrame complet). Le cache est consulté d'abord et alimenté par les
+        deux lectures : table compacte pour le lecteur mmap, colonnes complètes pour pandas.
+        progress(octets lus, octets à lire, lignes lues) est appelé après chaque bloc ; une
+        exception levée par ce callback (annulation) interrompt la lecture.
+        """
+        if self.cache is not None:
+            with span("cache.get"):
+                cached = self.cache.get_table(self.path, timestamp_col, id_col, self.timestamp_format)
+            if cached is not None:
+                table, self.invalid_rows = cached
+                return table
+            with span("cache.get"):
+                df = self.cache.get(self.path, timestamp_col, id_col, self.timestamp_format)
+            if df is not None:
+                self.invalid_rows = int(df[timestamp_col].isna().sum())
+                return ArrivalTable.from_frame(df, timestamp_col, id_col)
+        if self.timestamp_format in (None, TIMESTAMP_FORMAT):
+            try:
+                table, self.invalid_rows = read_fixed(self.path, timestamp_col, id_col, progress=progress)
+            except LayoutError:
+                pass  # autre disposition : lecture pandas générique
+            else:
+                if self.cache is not None:
+                    with span("cache.put", rows=len(table)):
+                        self.cache.put_table(self.path, table, self.invalid_rows, self.timestamp_format)
+                return table
+        tables, stamps = [], []
+        with span("load_table") as s:
+            for chunk in self.iter_chunks(chunksize, timestamp_col, id_col, self.timestamp_format,
+                                          progress=progress):
+                tables.append(ArrivalTable.from_frame(chunk, timestamp_col, id_col))
+                if self.cache is not None:
+                    stamps.append(chunk[timestamp_col].to_numpy(dtype='datetime64[ns]'))
+            table = ArrivalTable.concat(tables)
+            s.set_rows(len(table))
+        if self.cache is not None:
+            ts = np.concatenate(stamps) if stamps else np.empty(0, 'datetime64[ns]')
+            df = pd.DataFrame({timestamp_col: ts, id_col: table.to_frame()[id_col]}, copy=False)
+            with span("cache.put", rows=len(df)):
+                self.cache.put(self.path, df, timestamp_col, id_col, self.timestamp_format)
+        return table
+
+    def iter_chunks(self, chunksize=DEFAULT_CHUNKSIZE, timestamp_col='timestamp', id_col='patient_id',
+                    timestamp_format=None, byte_range=None, progress=None):
+        """
+        lire le CSV par blocs de taille bornée, en ne gardant que les colonnes utiles.
+
+        Les types sont fixés (chaînes) et le format du timestamp est unique : timestamp_format,
+        sinon self.timestamp_format, sinon deviné sur le premier bloc puis réutilisé. Chaque bloc
+        est renvoyé avec la colonne timestamp déjà convertie ; les lignes illisibles sont comptées
+        dans self.invalid_rows.
+        Si byte_range=(start, end) est donné, seules les lignes de cet intervalle sont lues
+        (start doit être un début de ligne situé après l'en-tête).
+        progress(octets lus, octets à lire, lignes lues) est appelé après chaque bloc.
+        """
+        header = pd.read_csv(self.path, nrows=0)
+        self.validate(header, timestamp_col, id_col)
+        options = dict(
+            usecols=[timestamp_col, id_col],
+            dtype={timestamp_col: str, id_col: str},
+            chunksize=chunksize,
+        )
+        # fichier ouvert ici pour connaître la position de lecture (progression)
+        handle = open(self.path, 'rb')
+        if byte_range is None:
+            start, end = 0, self.path.stat().st_size
+            source = handle
+        else:
+            start, end = byte_range
+            source = io.BufferedReader(_ByteRange(handle, start, end))
+            options.update(header=None, names=list(header.columns))
+        fmt = timestamp_format or self.timestamp_format
+        self.invalid_rows = 0
+        rows = 0
+        try:
+            with pd.read_csv(source, **options) as reader:
+                for chunk in reader:
+                    ts, invalid, fmt = parse_timestamps(chunk[timestamp_col], fmt)
+                    chunk[timestamp_col] = ts
+                    self.invalid_rows += invalid
+                    rows += len(chunk)
+                    if progress is not None:
+                        progress(min(handle.tell(), end) - start, end - start, rows)
+                    yield chunk
+        finally:
+            handle.close()
+
+    def stream_counts(self, chunksize=DEFAULT_CHUNKSIZE, timestamp_col='timestamp', id_col='patient_id',
+                      timestamp_format=None, byte_range=None, progress=None, collapse=True):
+        """
+        agréger le fichier bloc par bloc sans jamais le charger en entier.
+
+        Avec collapse=True, les jours terminés sont réduits à leurs comptes (mémoire bornée pour
+        un fichier chronologique) ; si le fichier n'est pas dans l'ordre, il est relu sans réduction.
+
+        Retourne :
+        StreamingAggregator : agrégats horaires et journaliers du fichier (ou de l'intervalle),
+        avec le nombre de lignes sans timestamp lisible dans invalid_rows.
+        """
+        with span("stream_counts") as s:
+            try:
+                agg = self._aggregate_chunks(StreamingAggregator(timestamp_col, id_col, collapse), chunksize,
+                                             timestamp_format, byte_range, progress)
+            except OutOfOrderError:
+                agg = self._aggregate_chunks(StreamingAggregator(timestamp_col, id_col, collapse=False), chunksize,
+                                             timestamp_format, byte_range, progress)
+            s.set_rows(agg.rows)
+        return agg
+
+    def _aggregate_chunks(self, agg, chunksize, timestamp_format, byte_range, progress):
+        chunks = self.iter_chunks(chunksize, agg.ts, agg.id, timestamp_format, byte_range, progress)
+        try:
+            for chunk in chunks:
+                agg.update(chunk)
+        finally:
+            chunks.close()
+        agg.invalid_rows = self.invalid_rows
+        return agg
+
+    def split_byte_ranges(self, n_parts):
+        """
+        découper le fichier (hors en-tête) en n_parts intervalles d'octets alignés sur les lignes.
+
+        Retourne :
+        list : intervalles (start, end) non vides, utilisables avec stream_counts(byte_range=...).
+        """
+        size = self.path.stat().st_size
+        with open(self.path, 'rb') as f:
+            f.readline()
+            first = f.tell()
+            bounds = [first]
+            for i in range(1, n_parts):
+                f.seek(first + (size - first) * i // n_parts)
+                f.readline()
+                pos = f.tell()
+                if pos >= size:
+                    break
+                if pos > bounds[-1]:
+                    bounds.append(pos)
+        bounds.append(size)
+        return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
@@ -1,59 +1,203 @@
 import sqlite3
+import threading
 from pathlib import Path
 from datetime import datetime
+from src.instrument import span
 
 DB_PATH = Path("data/analysis_history.db")
 
+# connexions persistantes : une par thread et par fichier de base (sqlite3 n'est pas partageable entre threads)
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+# colonnes ajoutées à la table analysis depuis la première version du schéma
+_ANALYSIS_EXTRA_COLUMNS = {
+    "busiest_hour_count": "INTEGER",
+    "busiest_day_count": "INTEGER",
+    "average_daily": "REAL",
+    "site": "TEXT",
+}
+
+
+def get_connection():
+    """
+    Retourne la connexion persistante du thread courant vers DB_PATH (mode WAL).
+    """
+    path = Path(DB_PATH)
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conns[path] = conn
+    return conn
+
+
+def close_connections():
+    """Ferme les connexions ouvertes par le thread courant."""
+    for conn in getattr(_local, "conns", {}).values():
+        conn.close()
+    _local.conns = {}
+
+
 def init_db():
     """
     Initialise la base de données SQLite.
 
-    Crée le fichier de base de données et la table d'analyse
-    s'ils n'existent pas déjà.
-    """
-    
-    """Create database and table if they don't exist"""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS analysis (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            file_name TEXT NOT NULL,
-            analysis_datetime TEXT NOT NULL,
-            total_patients INTEGER,
-            busiest_hour TEXT,
-            busiest_day TEXT
-        )
-    """)
-
-    conn.commit()
-    conn.close()
-
-
-def insert_analysis(file_name, total_patients, busiest_hour, busiest_day):
-    """Insert a new analysis record"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        INSERT INTO analysis (
-            file_name,
-            analysis_datetime,
-            total_patients,
-            busiest_hour,
-            busiest_day
-        )
-        VALUES (?, ?, ?, ?, ?)
-    """, (
-        file_name,
-        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        total_patients,
-        busiest_hour,
-        busiest_day
-    ))
-
-    conn.commit()
-    conn.close()
+    Crée le fichier de base de données, les tables et les index
+    s'ils n'existent pas déjà, et complète le schéma des anciennes bases.
+    Le travail n'est fait qu'une fois par fichier et par processus.
+    """
+    path = Path(DB_PATH).resolve()
+    with _init_lock:
+        if path in _initialized and path.exists():
+            return
+        conn = get_connection()
+        with span("db.init"), conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_name TEXT NOT NULL,
+                    analysis_datetime TEXT NOT NULL,
+                    total_patients INTEGER,
+                    busiest_hour TEXT,
+                    busiest_day TEXT
+                )
+            """)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(analysis)")}
+            for name, sql_type in _ANALYSIS_EXTRA_COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE analysis ADD COLUMN {name} {sql_type}")
+
+            # séries horaires (granularity='hour') et journalières (granularity='day') de chaque analyse
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_counts (
+                    analysis_id INTEGER NOT NULL REFERENCES analysis(id) ON DELETE CASCADE,
+                    granularity TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (analysis_id, granularity, bucket)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_file_name ON analysis(file_name)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_datetime ON analysis(analysis_datetime)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_site ON analysis(site, file_name)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_counts_bucket ON analysis_counts(granularity, bucket)")
+        _initialized.add(path)
+
+
+def _series_rows(analysis_id, hourly, daily):
+    rows = []
+    if hourly is not None and len(hourly):
+        buckets = hourly["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        rows.extend(zip([analysis_id] * len(hourly), ["hour"] * len(hourly), buckets, hourly["count"].astype(int).tolist()))
+    if daily is not None and len(daily):
+        buckets = daily["date"].astype(str)
+        rows.extend(zip([analysis_id] * len(daily), ["day"] * len(daily), buckets, daily["count"].astype(int).tolist()))
+    return rows
+
+
+def insert_analyses(records):
+    """
+    Insère plusieurs analyses dans une seule transaction.
+
+    Arguments :
+    records (list) : dictionnaires avec file_name, total_patients, busiest_hour, busiest_day
+    et, en option, site, busiest_hour_count, busiest_day_count, average_daily,
+    hourly (DataFrame timestamp/count) et daily (DataFrame date/count).
+
+    Retourne :
+    list : identifiants des analyses insérées.
+    """
+    init_db()
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_connection()
+    ids = []
+    with span("db.insert", rows=len(records)), conn:
+        for rec in records:
+            cursor = conn.execute("""
+                INSERT INTO analysis (
+                    file_name,
+                    analysis_datetime,
+                    total_patients,
+                    busiest_hour,
+                    busiest_day,
+                    busiest_hour_count,
+                    busiest_day_count,
+                    average_daily,
+                    site
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                rec["file_name"],
+                rec.get("analysis_datetime", now),
+                rec["total_patients"],
+                rec["busiest_hour"],
+                rec["busiest_day"],
+                rec.get("busiest_hour_count"),
+                rec.get("busiest_day_count"),
+                rec.get("average_daily"),
+                rec.get("site"),
+            ))
+            ids.append(cursor.lastrowid)
+            conn.executemany(
+                "INSERT INTO analysis_counts (analysis_id, granularity, bucket, count) VALUES (?, ?, ?, ?)",
+                _series_rows(cursor.lastrowid, rec.get("hourly"), rec.get("daily")))
+    return ids
+
+
+def insert_analysis(file_name, total_patients, busiest_hour, busiest_day, **extra):
+    """Insert a new analysis record (extra : champs optionnels de insert_analyses)"""
+    return insert_analyses([dict(extra, file_name=file_name, total_patients=total_patients,
+                                 busiest_hour=busiest_hour, busiest_day=busiest_day)])[0]
+
+
+def fetch_history(file_name=None, since=None, until=None, limit=None):
+    """
+    Historique des analyses, du plus ancien au plus récent.
+
+    Arguments :
+    file_name (str, optionnel) : ne garder que ce fichier.
+    since, until (str, optionnels) : bornes sur analysis_datetime ('YYYY-MM-DD HH:MM:SS').
+
+    Retourne :
+    list : un dictionnaire par analyse.
+    """
+    init_db()
+    clauses, params = [], []
+    if file_name is not None:
+        clauses.append("file_name = ?")
+        params.append(file_name)
+    if since is not None:
+        clauses.append("analysis_datetime >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("analysis_datetime <= ?")
+        params.append(until)
+    sql = "SELECT * FROM analysis"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY analysis_datetime, id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    cursor = get_connection().execute(sql, params)
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def fetch_counts(analysis_id, granularity="hour"):
+    """
+    Retourne :
+    list : couples (bucket, count) de la série horaire ou journalière d'une analyse.
+    """
+    init_db()
+    return get_connection().execute(
+        "SELECT bucket, count FROM analysis_counts WHERE analysis_id = ? AND granularity = ? ORDER BY bucket",
+        (analysis_id, granularity)).fetchall()
@@ -0,0 +1,121 @@
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# format -> extension ajoutée au nom de base (hourly_counts, daily_counts)
+FORMATS = {
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",
+    "csv.zst": ".csv.zst",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "npy": ".npy",
+}
+# dépendances optionnelles par format
+_REQUIRES = {"csv.zst": "zstandard", "parquet": "pyarrow", "arrow": "pyarrow"}
+# unité des dates dans les tableaux .npy, selon la colonne
+_NPY_UNITS = {"timestamp": "s", "date": "D"}
+
+
+def _require(fmt):
+    module = _REQUIRES.get(fmt)
+    if module and importlib.util.find_spec(module) is None:
+        raise ImportError(f"Le format {fmt} nécessite le paquet {module} (pip install {module}).")
+
+
+def available_formats():
+    """
+    Retourne :
+    list : formats utilisables dans cet environnement (dépendances optionnelles installées).
+    """
+    return [fmt for fmt, module in ((f, _REQUIRES.get(f)) for f in FORMATS)
+            if module is None or importlib.util.find_spec(module) is not None]
+
+
+def format_of(path):
+    """Déduit le format d'un fichier de son extension."""
+    name = Path(path).name
+    for fmt, ext in sorted(FORMATS.items(), key=lambda item: -len(item[1])):
+        if name.endswith(ext):
+            return fmt
+    raise ValueError(f"Format d'export inconnu : {name}")
+
+
+def to_records(df):
+    """
+    Convertit une série agrégée (timestamp/count ou date/count) en tableau structuré à disposition fixe.
+    """
+    date_col, count_col = df.columns
+    unit = _NPY_UNITS.get(date_col, "s")
+    out = np.empty(len(df), dtype=[(date_col, f"datetime64[{unit}]"), (count_col, "<i8")])
+    out[date_col] = pd.to_datetime(df[date_col]).to_numpy().astype(f"datetime64[{unit}]")
+    out[count_col] = df[count_col].to_numpy()
+    return out
+
+
+def write_table(df, path, fmt=None):
+    """
+    Écrit une série agrégée dans le format demandé (déduit de l'extension si fmt est absent).
+    """
+    fmt = fmt or format_of(path)
+    _require(fmt)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "csv.gz":
+        df.to_csv(path, index=False, compression="gzip")
+    elif fmt == "csv.zst":
+        df.to_csv(path, index=False, compression="zstd")
+    elif fmt in ("parquet", "arrow"):
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, path)
+        else:
+            with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    elif fmt == "npy":
+        # np.save ajoute .npy aux noms qui ne le portent pas : on écrit dans un fichier ouvert
+        with open(path, "wb") as f:
+            np.save(f, to_records(df))
+    else:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+
+
+def open_mapped(path):
+    """
+    Ouvre un export sans copie, par projection mémoire.
+
+    Retourne :
+    numpy.memmap (tableau structuré) pour .npy, pyarrow.Table pour .arrow.
+    Les autres formats sont compressés ou encodés et doivent être décodés : read_table.
+    """
+    fmt = format_of(path)
+    if fmt == "npy":
+        return np.load(path, mmap_mode="r")
+    if fmt == "arrow":
+        _require(fmt)
+        import pyarrow as pa
+        return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    raise ValueError(f"Le format {fmt} ne peut pas être projeté en mémoire sans décodage.")
+
+
+def read_table(path):
+    """
+    Relit un export sous forme de DataFrame (dates converties en datetime64).
+    """
+    fmt = format_of(path)
+    _require(fmt)
+    if fmt.startswith("csv"):
+        df = pd.read_csv(path)
+        df[df.columns[0]] = pd.to_datetime(df[df.columns[0]])
+        return df
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True).to_pandas()
+    if fmt == "arrow":
+        return open_mapped(path).to_pandas()
+    records = open_mapped(path)
+    return pd.DataFrame({name: records[name] for name in records.dtype.names})
@@ -0,0 +1,243 @@
+"""
+Lecture rapide des CSV d'arrivées au format fixe « YYYY-MM-DD HH:MM:SS,patient_id ».
+
+Le fichier est projeté en mémoire (mmap) et traité par blocs d'octets : les fins de ligne
+sont trouvées par un balayage numpy, les chiffres du timestamp sont lus directement à leur
+position fixe et convertis en minutes, sans créer de chaîne Python par ligne. Les identifiants
+sont factorisés sur leurs octets. Le résultat est une ArrivalTable prête pour ArrivalAnalyzer.
+
+Si le fichier ne respecte pas ce format, LayoutError est levée et DataLoader revient à pandas.
+"""
+import mmap
+
+import numpy as np
+import pandas as pd
+
+from src.instrument import span
+from src.table import ArrivalTable, MISSING_MINUTE
+
+TIMESTAMP_WIDTH = 19
+# position des séparateurs dans "YYYY-MM-DD HH:MM:SS"
+SEPARATORS = {4: b'-', 7: b'-', 10: b' ', 13: b':', 16: b':'}
+BLOCK_BYTES = 16 * 1024**2
+# années représentables en datetime64[ns] (les autres donnent NaT, comme avec pandas)
+MIN_YEAR, MAX_YEAR = 1678, 2261
+_MONTH_DAYS = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+NL, CR, COMMA, QUOTE = ord('\n'), ord('\r'), ord(','), ord('"')
+
+
+class LayoutError(ValueError):
+    """Le fichier n'a pas le format fixe attendu."""
+
+
+def _days_from_civil(y, m, d):
+    """Jours depuis le 1er janvier 1970 (calendrier grégorien, vectorisé)."""
+    y = y - (m <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * np.where(m > 2, m - 3, m + 9) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _decode_minutes(buf, starts):
+    """
+    Minutes depuis 1970 des timestamps commençant aux positions starts.
+
+    Retourne :
+    tuple : (minutes int32, nombre de timestamps impossibles, ex. 2024-02-30).
+    """
+    for offset, sep in SEPARATORS.items():
+        if not (buf[starts + offset] == sep[0]).all():
+            raise LayoutError(f"séparateur attendu '{sep.decode()}' en position {offset}")
+
+    def number(first, width):
+        value = np.zeros(len(starts), dtype=np.int32)
+        for offset in range(first, first + width):
+            digit = buf[starts + offset] - np.uint8(48)
+            if (digit > 9).any():
+                raise LayoutError(f"chiffre attendu en position {offset}")
+            value = value * 10 + digit
+        return value
+
+    year, month, day = number(0, 4), number(5, 2), number(8, 2)
+    hour, minute, second = number(11, 2), number(14, 2), number(17, 2)
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = _MONTH_DAYS[np.clip(month, 0, 12)] + (leap & (month == 2))
+    valid = ((year >= MIN_YEAR) & (year <= MAX_YEAR) & (month >= 1) & (month <= 12)
+             & (day >= 1) & (day <= month_days) & (hour < 24) & (minute < 60) & (second < 60))
+    minutes = (_days_from_civil(year, month, day) * 1440 + hour * 60 + minute).astype(np.int32)
+    minutes[~valid] = MISSING_MINUTE
+    return minutes, int(np.count_nonzero(~valid))
+
+
+def _factorize_rows(words):
+    """
+    Codes des lignes distinctes d'une matrice uint64, combinés colonne par colonne.
+
+    Retourne :
+    tuple : (codes, nombre de lignes distinctes).
+    """
+    codes, uniques = pd.factorize(words[:, 0])
+    n = len(uniques)
+    for k in range(1, words.shape[1]):
+        word_codes, word_uniques = pd.factorize(words[:, k])
+        codes, uniques = pd.factorize(codes.astype(np.int64) * len(word_uniques) + word_codes)
+        n = len(uniques)
+    return codes, n
+
+
+def _first_rows(codes, n):
+    """Indice de la première ligne de chaque code."""
+    first = np.empty(n, dtype=np.int64)
+    first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    return first
+
+
+def _id_words(buf, starts, ends):
+    """
+    Factorise les identifiants buf[starts:ends] sur leurs octets, sans chaîne Python.
+
+    Les octets sont rangés dans des mots de 8 octets (complétés par des zéros).
+
+    Retourne :
+    tuple : (codes int32, -1 pour un identifiant vide ; mots uint64 des identifiants distincts).
+    """
+    lengths = ends - starts
+    width = -(-int(lengths.max()) // 8) * 8 if len(lengths) else 0
+    if width == 0:
+        return np.full(len(starts), -1, dtype=np.int32), np.empty((0, 1), dtype=np.uint64)
+    raw = np.zeros((len(starts), width), dtype=np.uint8)
+    last = len(buf) - 1
+    for col in range(width):
+        inside = lengths > col
+        raw[inside, col] = buf[np.minimum(starts[inside] + col, last)]
+    words = raw.view(np.uint64)
+    codes, n = _factorize_rows(words)
+    unique_words = words[_first_rows(codes, n)]
+    empty = lengths == 0
+    if empty.any():
+        # identifiant vide : patient absent (-1), comme NaN côté pandas
+        e = codes[np.argmax(empty)]
+        unique_words = np.delete(unique_words, e, axis=0)
+        codes = np.where(empty, -1, codes - (codes > e))
+    return codes.astype(np.int32), unique_words
+
+
+def _decode_ids(words):
+    """Chaînes des identifiants distincts (une seule conversion par identifiant)."""
+    if len(words) == 0:
+        # tous les identifiants sont vides : aucun patient connu
+        return np.empty(0, dtype=object)
+    raw = np.ascontiguousarray(words).view(np.uint8).reshape(len(words), -1)
+    fixed = raw.view(f"S{raw.shape[1]}").ravel()
+    if (raw < 128).all():
+        # ASCII : conversion vectorisée par numpy
+        return fixed.astype(str)
+    try:
+        return np.array([b.decode('utf-8') for b in fixed], dtype=object)
+    except UnicodeDecodeError:
+        raise LayoutError("identifiant patient non UTF-8")
+
+
+def _merge_blocks(blocks, timestamp_col, id_col):
+    """
+    Assemble les blocs (minutes, codes, mots) : une factorisation globale sur les mots,
+    puis décodage des seuls identifiants distincts du fichier.
+    """
+    if not blocks:
+        return ArrivalTable.concat([])
+    width = max(w.shape[1] for _, _, w in blocks)
+    padded = [np.pad(w, ((0, 0), (0, width - w.shape[1]))) for _, _, w in blocks]
+    global_codes, n = _factorize_rows(np.concatenate(padded))
+    first = _first_rows(global_codes, n)
+    all_words = np.concatenate(padded)[first]
+    minutes = np.concatenate([m for m, _, _ in blocks])
+    codes = np.empty(len(minutes), dtype=np.int32)
+    row = offset = 0
+    for m, c, w in blocks:
+        # -1 (patient absent) reste -1 grâce à la case ajoutée en fin de correspondance
+        mapping = np.append(global_codes[offset:offset + len(w)], -1).astype(np.int32)
+        codes[row:row + len(m)] = mapping[c]
+        row += len(m)
+        offset += len(w)
+    return ArrivalTable(minutes, codes, _decode_ids(all_words), timestamp_col, id_col)
+
+
+def _parse_block(buf):
+    """
+    Lit un bloc de lignes complètes (sans en-tête).
+
+    Retourne :
+    tuple : (minutes, codes, mots des identifiants distincts, timestamps impossibles).
+    """
+    ends = np.flatnonzero(buf == NL)
+    if len(ends) == 0 or ends[-1] != len(buf) - 1:
+        ends = np.append(ends, len(buf))
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    cr = (ends > starts) & (buf[np.maximum(ends - 1, 0)] == CR)
+    ends = ends - cr
+    keep = ends > starts
+    starts, ends = starts[keep], ends[keep]
+
+    if (ends - starts < TIMESTAMP_WIDTH + 1).any() or not (buf[starts + TIMESTAMP_WIDTH] == COMMA).all():
+        raise LayoutError("ligne sans timestamp fixe suivi d'une virgule")
+    if np.count_nonzero(buf == COMMA) != len(starts) or (buf == QUOTE).any():
+        raise LayoutError("colonnes en trop ou champs entre guillemets")
+    minutes, invalid = _decode_minutes(buf, starts)
+    codes, words = _id_words(buf, starts + TIMESTAMP_WIDTH + 1, ends)
+    return minutes, codes, words, invalid
+
+
+def read_fixed(path, timestamp_col='timestamp', id_col='patient_id', block_bytes=BLOCK_BYTES, progress=None):
+    """
+    Lit un CSV au format fixe « YYYY-MM-DD HH:MM:SS,patient_id » (en-tête compris).
+
+    Arguments :
+    block_bytes (int) : taille des blocs traités ; borne la mémoire temporaire.
+    progress (callable, optionnel) : appelé après chaque bloc avec (octets lus, taille, lignes lues).
+
+    Retourne :
+    tuple : (ArrivalTable, nombre de timestamps impossibles).
+
+    Lève LayoutError si l'en-tête ou une ligne ne suit pas le format.
+    """
+    with open(path, 'rb') as f:
+        with span("fast_read") as s:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # fichier vide
+                raise LayoutError("fichier vide")
+            try:
+                data = np.frombuffer(mm, dtype=np.uint8)
+                header_end = mm.find(b'\n')
+                header = bytes(mm[:header_end if header_end >= 0 else len(mm)]).rstrip(b'\r')
+                if header != f"{timestamp_col},{id_col}".encode():
+                    raise LayoutError(f"en-tête inattendu : {header[:80]!r}")
+                blocks, invalid, rows = [], 0, 0
+                pos = header_end + 1 if header_end >= 0 else len(mm)
+                while pos < len(mm):
+                    stop = min(pos + block_bytes, len(mm))
+                    if stop < len(mm):
+                        # le bloc se termine sur une fin de ligne
+                        cut = mm.rfind(b'\n', pos, stop)
+                        stop = cut + 1 if cut >= 0 else (mm.find(b'\n', stop) + 1 or len(mm))
+                    *block, bad = _parse_block(data[pos:stop])
+                    blocks.append(block)
+                    invalid += bad
+                    rows += len(block[0])
+                    pos = stop
+                    if progress is not None:
+                        progress(pos, len(mm), rows)
+                table = _merge_blocks(blocks, timestamp_col, id_col)
+                del data
+            finally:
+                try:
+                    mm.close()
+                except BufferError:  # vue encore référencée par une exception : libérée par le GC
+                    pass
+            s.set_rows(len(table))
+    return table, invalid
@@ -1,18 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
-import threading
-import io
 import os
+import sys
+import threading
 from src.database import init_db, insert_analysis
-from PIL import Image, ImageTk
-import matplotlib
-matplotlib.use("TkAgg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from src.data_loader import DataLoader
-from src.analyzer import ArrivalAnalyzer
-from src.plotter import plot_hourly, plot_daily
-from src.report import generate_summary
+from src.jobs import JobRunner
+# pandas, numpy, matplotlib et les modules d'analyse sont importés à la première utilisation,
+# pour que la fenêtre apparaisse sans attendre leur chargement
 
 # Styling constants
 BG = "#1f2326"
@@ -25,6 +20,9 @@ BTN_FG = "#FFFFFF"
 FONT_TITLE = ("Segoe UI", 16, "bold")
 FONT_SUB = ("Segoe UI", 11)
 FONT_NORMAL = ("Segoe UI", 10)
+PREVIEW_PAGE = 100
+# part de la barre de progression (et de l'ETA) attribuée à la lecture du CSV, l'étape la plus longue
+READ_SHARE = 0.8
 
 class PatientArrivalApp(tk.Tk):
     """
@@ -44,12 +42,32 @@ class PatientArrivalApp(tk.Tk):
         self.hourly_df = None
         self.daily_df = None
         self.summary = None
+        # colonnes déjà converties, partagées entre l'aperçu et l'analyse (créé à la première analyse)
+        self._cache = None
+        # aperçu paginé : lecteur du fichier, position relative courante, résultats des threads
+        self.pager = None
+        self._preview_pos = 0.0
+        self._preview_job = None
+        # jobs en arrière-plan : les analyses sont mises en file, l'aperçu a son propre worker
+        self.jobs = JobRunner(self.after, workers=1)
+        self.preview_jobs = JobRunner(self.after, workers=1)
+        self.status_var = tk.StringVar(value="Prêt")
 
         # menu,header and body building
         self.build_menu()
         self.build_header()
         self.build_body()
 
+        # schéma de la base créé une seule fois, hors du thread Tk
+        threading.Thread(target=init_db, name="init_db", daemon=True).start()
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            from src.cache import ParsedCache
+            self._cache = ParsedCache()
+        return self._cache
+
     # Menubar
     def build_menu(self):
         menubar = tk.Menu(self)
@@ -111,20 +129,22 @@ class PatientArrivalApp(tk.Tk):
         self.content = tk.Frame(body, bg=BG)
         self.content.pack(side="left", fill="both", expand=True, padx=10, pady=10)
 
-        # Pages dictionary
+        # Pages dictionary : les cadres existent dès le départ, leur contenu est construit au premier affichage
         self.pages = {}
-        for page_name in ("home", "analyze", "plots", "results", "guide", "about"):
+        self._page_builders = {
+            "home": self.build_home,
+            "analyze": self.build_analyze,
+            "plots": self.build_plots,
+            "results": self.build_results,
+            "guide": self.build_guide,
+            "about": self.build_about,
+        }
+        self._built_pages = set()
+        for page_name in self._page_builders:
             frame = tk.Frame(self.content, bg=BG)
             frame.place(relx=0, rely=0, relwidth=1, relheight=1)
             self.pages[page_name] = frame
 
-        self.build_home(self.pages["home"])
-        self.build_analyze(self.pages["analyze"])
-        self.build_plots(self.pages["plots"])
-        self.build_results(self.pages["results"])
-        self.build_guide(self.pages["guide"])
-        self.build_about(self.pages["about"])
-
         # start on home
         self.show_page("home")
 
@@ -159,17 +179,55 @@ class PatientArrivalApp(tk.Tk):
         tk.Button(controls, text="Parcourir", command=self.action_open_csv, bg=BTN_BG, fg=BTN_FG, bd=0, cursor="hand2").pack(side="left", padx=4)
         tk.Button(controls, text="Choisir dossier sortie", command=self.action_choose_out, bg=BTN_BG, fg=BTN_FG, bd=0, cursor="hand2").pack(side="left", padx=4)
 
+        # Format du timestamp (vide = deviné automatiquement)
+        fmt_frame = tk.Frame(container, bg=BG)
+        fmt_frame.pack(fill="x", padx=6, pady=2)
+        tk.Label(fmt_frame, text="Format timestamp (optionnel, ex. %d/%m/%Y %H:%M) :", bg=BG, fg=SUB_TEXT, font=FONT_NORMAL).pack(side="left")
+        self.format_entry = tk.Entry(fmt_frame, font=FONT_NORMAL, bg="#2b2f33", fg=TEXT, width=24)
+        self.format_entry.pack(side="left", padx=6)
+        # format des séries exportées (seuls les formats dont les dépendances sont installées)
+        tk.Label(fmt_frame, text="Export :", bg=BG, fg=SUB_TEXT, font=FONT_NORMAL).pack(side="left", padx=(12, 0))
+        self.export_var = tk.StringVar(value="csv")
+        export_box = ttk.Combobox(fmt_frame, textvariable=self.export_var, values=["csv"], state="readonly", width=10)
+        # la liste complète demande d'importer src.export (numpy, pandas) : seulement à l'ouverture
+        export_box.configure(postcommand=lambda: export_box.configure(values=self._export_formats()))
+        export_box.pack(side="left", padx=6)
+
         # Action buttons
         action_frame = tk.Frame(container, bg=BG)
         action_frame.pack(fill="x", padx=6, pady=8)
         tk.Button(action_frame, text="Lancer l'analyse", command=self.start_analysis_thread, bg=ACCENT, fg="white", bd=0, padx=10, pady=6, cursor="hand2").pack(side="left")
         tk.Button(action_frame, text="Réinitialiser", command=self.reset_state, bg="#444", fg="white", bd=0, padx=10, pady=6, cursor="hand2").pack(side="left", padx=8)
+        self.incremental_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(action_frame, text="Mode incrémental (ne lire que les nouvelles lignes)", variable=self.incremental_var,
+                       command=self._on_incremental_toggled, bg=BG, fg=TEXT, selectcolor=PANEL_BG, activebackground=BG, activeforeground=TEXT).pack(side="left", padx=8)
+        self.approx_var = tk.BooleanVar(value=False)
+        self.approx_check = tk.Checkbutton(action_frame, text="Mode approximatif (HyperLogLog)", variable=self.approx_var,
+                                           bg=BG, fg=TEXT, selectcolor=PANEL_BG, activebackground=BG, activeforeground=TEXT)
+        self.approx_check.pack(side="left", padx=8)
+
+        # Mesures : durées par étape dans le résumé, et en option profil cProfile/tracemalloc
+        measure_frame = tk.Frame(container, bg=BG)
+        measure_frame.pack(fill="x", padx=6)
+        self.instrument_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(measure_frame, text="Mesurer les étapes", variable=self.instrument_var,
+                       bg=BG, fg=TEXT, selectcolor=PANEL_BG, activebackground=BG, activeforeground=TEXT).pack(side="left", padx=8)
+        self.profile_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(measure_frame, text="Profil détaillé (cProfile + tracemalloc, plus lent)", variable=self.profile_var,
+                       bg=BG, fg=TEXT, selectcolor=PANEL_BG, activebackground=BG, activeforeground=TEXT).pack(side="left", padx=8)
+
+        # Progress
+        progress_frame = tk.Frame(container, bg=BG)
+        progress_frame.pack(fill="x", padx=6, pady=2)
+        self.progress = ttk.Progressbar(progress_frame, orient="horizontal", mode="determinate", maximum=1.0)
+        self.progress.pack(side="left", fill="x", expand=True)
+        tk.Button(progress_frame, text="Annuler", command=self.cancel_analysis, bg="#444", fg="white", bd=0, padx=10, cursor="hand2").pack(side="left", padx=8)
 
         # Table preview area
         preview_frame = tk.Frame(container, bg=BG)
         preview_frame.pack(fill="both", expand=True, padx=6, pady=6)
 
-        lbl = tk.Label(preview_frame, text="Aperçu du CSV (10 premières lignes)", bg=BG, fg=TEXT, font=FONT_NORMAL)
+        lbl = tk.Label(preview_frame, text=f"Aperçu du CSV (pages de {PREVIEW_PAGE} lignes)", bg=BG, fg=TEXT, font=FONT_NORMAL)
         lbl.pack(anchor="nw")
 
         cols = ("timestamp", "patient_id")
@@ -180,22 +238,35 @@ class PatientArrivalApp(tk.Tk):
         for c in cols:
             self.tree.heading(c, text=c)
             self.tree.column(c, width=200, anchor="center")
-        vsb = ttk.Scrollbar(tree_container, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)
+        # la barre de défilement représente la position dans le fichier, pas dans la page affichée
+        self.preview_vsb = ttk.Scrollbar(tree_container, orient="vertical", command=self._on_preview_scroll)
         self.tree.pack(side="left", fill="both", expand=True)
-        vsb.pack(side="left", fill="y")
+        self.preview_vsb.pack(side="left", fill="y")
 
         # Status
-        self.status_var = tk.StringVar(value="Prêt")
         status_lbl = tk.Label(frame, textvariable=self.status_var, bg=BG, fg=SUB_TEXT, anchor="w")
         status_lbl.pack(fill="x", padx=6, pady=6)
 
     def build_plots(self, frame):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from src.plotter import new_figure, format_date_axis
         tk.Label(frame, text="Graphiques", font=("Segoe UI", 14, "bold"), bg=BG, fg=TEXT).pack(anchor="nw")
 
-        # Canvas area for plot
+        # Canvas area for plot : une seule figure intégrée, deux Axes superposés (heure / jour)
         self.plot_area = tk.Frame(frame, bg=BG)
         self.plot_area.pack(fill="both", expand=True, padx=6, pady=6)
+        self.plot_figure, self.hourly_ax = new_figure(figsize=(7.6, 4.2))
+        self.daily_ax = self.plot_figure.add_axes(self.hourly_ax.get_position(), label="daily")
+        format_date_axis(self.daily_ax)
+        self.daily_ax.set_visible(False)
+        self.daily_ax.set_navigate(False)
+        self.plot_canvas = FigureCanvasTkAgg(self.plot_figure, master=self.plot_area)
+        # barre d'outils matplotlib : déplacement et zoom
+        self.plot_toolbar = NavigationToolbar2Tk(self.plot_canvas, self.plot_area, pack_toolbar=False)
+        self.plot_toolbar.pack(side="bottom", fill="x")
+        self.plot_empty = tk.Label(self.plot_area, text="Aucun graphique généré. Lancez l'analyse d'abord.",
+                                   bg=BG, fg=SUB_TEXT, font=FONT_NORMAL)
+        self.plot_empty.pack(expand=True)
 
         # Buttons to show specific plots
         btns = tk.Frame(frame, bg=BG)
@@ -203,6 +274,10 @@ class PatientArrivalApp(tk.Tk):
         tk.Button(btns, text="Montrer patients par heure", command=lambda: self.show_plot("hourly"), bg=BTN_BG, fg=BTN_FG, bd=0, cursor="hand2").pack(side="left", padx=6)
         tk.Button(btns, text="Montrer patients par jour", command=lambda: self.show_plot("daily"), bg=BTN_BG, fg=BTN_FG, bd=0, cursor="hand2").pack(side="left", padx=6)
 
+        # une analyse terminée avant la première visite de la page
+        if self.hourly_df is not None:
+            self._update_plots()
+
     def build_results(self, frame):
         tk.Label(frame, text="Résultats", font=("Segoe UI", 14, "bold"), bg=BG, fg=TEXT).pack(anchor="nw", padx=6, pady=(6,2))
         self.results_text = tk.Text(frame, height=12, bg="#121314", fg=TEXT, insertbackground=TEXT, font=FONT_NORMAL)
@@ -224,6 +299,7 @@ class PatientArrivalApp(tk.Tk):
             Le logiciel génère :
                 - hourly_counts.csv
                 - daily_counts.csv
+                  (ou .csv.gz, .csv.zst, .parquet, .arrow, .npy selon le format d'export choisi)
                 - hourly.png
                 - daily.png
                 - summary.json
@@ -247,7 +323,14 @@ class PatientArrivalApp(tk.Tk):
         tk.Label(frame, text=about, font=FONT_NORMAL, bg=BG, fg=SUB_TEXT, justify="left").pack(anchor="nw", padx=6, pady=10)
 
     # Page switching
+    def ensure_page(self, page_name):
+        """Construit le contenu de la page s'il ne l'a pas encore été."""
+        if page_name not in self._built_pages:
+            self._built_pages.add(page_name)
+            self._page_builders[page_name](self.pages[page_name])
+
     def show_page(self, page_name):
+        self.ensure_page(page_name)
         for name, frame in self.pages.items():
             if name == page_name:
                 frame.lift()
@@ -256,6 +339,7 @@ class PatientArrivalApp(tk.Tk):
     def action_open_csv(self):
         p = filedialog.askopenfilename(filetypes=[("CSV files","*.csv"), ("All files","*.*")])
         if p:
+            self.show_page("analyze")
             self.csv_path = Path(p)
             # update entry if exists
             try:
@@ -273,21 +357,70 @@ class PatientArrivalApp(tk.Tk):
             messagebox.showinfo("Dossier sortie", f"Dossier de sortie : {self.out_dir}")
 
     def preview_csv(self, path):
-        try:
-            dl = DataLoader(path)
-            df = dl.load_csv()
-            dl.validate(df)
-            df = dl.parse_dates(df)
-            self.current_df = df
-            # update treeview
-            for r in self.tree.get_children():
-                self.tree.delete(r)
-            preview = df.head(10)
-            for _, row in preview.iterrows():
-                self.tree.insert("", "end", values=(str(row.get("timestamp")), str(row.get("patient_id"))))
-            self.status_var.set(f"Fichier chargé : {os.path.basename(path)} ({len(df)} lignes)")
-        except Exception as e:
-            messagebox.showerror("Erreur lors du chargement", str(e))
+        """
+        Affiche la première page du CSV, lue dans un thread : le fichier n'est jamais chargé en entier.
+        """
+        self.current_df = None
+        self.pager = None
+        self.status_var.set(f"Lecture de l'aperçu : {os.path.basename(path)}...")
+
+        def work():
+            from src.preview import CsvPager
+            pager = CsvPager(path, page_size=PREVIEW_PAGE)
+            pager.estimate_rows()
+            return pager, pager.head(), 0.0
+        self._start_preview_job(work)
+
+    def _start_preview_job(self, work):
+        """Exécute work() hors du thread Tk ; une nouvelle demande annule la précédente."""
+        if self._preview_job is not None:
+            self._preview_job.cancel()
+        self._preview_job = self.preview_jobs.submit(
+            lambda job: work(), name="preview",
+            on_done=self._show_preview,
+            on_error=lambda e: messagebox.showerror("Erreur lors du chargement", str(e)))
+
+    def _show_preview(self, result):
+        self.pager, rows, self._preview_pos = result
+        for r in self.tree.get_children():
+            self.tree.delete(r)
+        for row in rows:
+            self.tree.insert("", "end", values=row)
+        est = max(self.pager.estimate_rows(), 1)
+        self.preview_vsb.set(self._preview_pos, min(1.0, self._preview_pos + PREVIEW_PAGE / est))
+        self.status_var.set(f"Fichier : {self.pager.path.name} (≈{est} lignes)")
+
+    def _on_preview_scroll(self, *args):
+        """Défilement virtuel : charge la page correspondant à la position demandée."""
+        pager = self.pager
+        if pager is None:
+            return
+        step = 1.0 / max(pager.estimate_rows(), 1)
+        if args[0] == "moveto":
+            pos = float(args[1])
+        else:
+            rows = PREVIEW_PAGE if args[2] == "pages" else 1
+            pos = self._preview_pos + int(args[1]) * rows * step
+        pos = min(max(pos, 0.0), 1.0)
+        self._start_preview_job(lambda: (pager, pager.page_at(pos), pos))
+
+    def _on_incremental_toggled(self):
+        """L'état incrémental garde des paires exactes : le mode approximatif n'y a pas de sens."""
+        if self.incremental_var.get():
+            self.approx_var.set(False)
+            self.approx_check.configure(state="disabled")
+        else:
+            self.approx_check.configure(state="normal")
+
+    def _export_formats(self):
+        from src.export import available_formats
+        return available_formats()
+
+    def _loader(self, path):
+        """DataLoader partageant le cache de l'application et le format saisi (s'il y en a un)."""
+        from src.data_loader import DataLoader
+        fmt = self.format_entry.get().strip() or None
+        return DataLoader(path, cache=self.cache, timestamp_format=fmt)
 
     def reset_state(self):
         self.csv_entry.delete(0, tk.END)
@@ -297,85 +430,173 @@ class PatientArrivalApp(tk.Tk):
         self.hourly_df = None
         self.daily_df = None
         self.summary = None
+        if "plots" in self._built_pages and not self.plot_empty.winfo_ismapped():
+            self.plot_canvas.get_tk_widget().pack_forget()
+            self.plot_empty.pack(expand=True)
         self.status_var.set("Réinitialisé")
 
     def start_analysis_thread(self):
         """
-        Lancez l'analyse dans un thread séparé afin de préserver la réactivité de l'interface graphique.
+        Met l'analyse en file dans le JobRunner afin de préserver la réactivité de l'interface graphique.
+
+        Les paramètres sont lus ici, dans le thread Tk ; le worker ne touche jamais aux widgets.
+        """
+        if not self.csv_entry.get():
+            messagebox.showerror("Erreur", "Aucun fichier CSV sélectionné.")
+            return
+        csv = Path(self.csv_entry.get())
+        if not csv.exists():
+            messagebox.showerror("Erreur", "Fichier CSV inexistant.")
+            return
+        params = {
+            "csv": csv,
+            "out_dir": self.out_dir or Path("data/output"),
+            "incremental": self.incremental_var.get(),
+            "approximate": self.approx_var.get(),
+            "timestamp_format": self.format_entry.get().strip() or None,
+            "export_format": self.export_var.get(),
+            "instrument": self.instrument_var.get(),
+            "profile": self.profile_var.get(),
+        }
+        self.jobs.submit(lambda job: self.run_analysis(job, params), name=csv.name,
+                         on_done=self._analysis_done, on_error=self._analysis_failed,
+                         on_progress=self._analysis_progress, on_cancel=self._analysis_cancelled)
+        waiting = self.jobs.active - 1
+        self.status_var.set(f"Analyse de {csv.name} en file" + (f" ({waiting} avant elle)" if waiting else "") + "...")
+
+    def cancel_analysis(self):
+        self.jobs.cancel_all()
+
+    def run_analysis(self, job, params):
+        """
+        Exécute l'analyse dans un worker (aucun accès à Tk) et retourne les résultats.
+
+        job.progress() signale l'étape en cours ; job.check() interrompt l'analyse si elle est annulée.
+        Avec l'instrumentation, les mesures par étape sont ajoutées à summary.json ; le mode profil
+        écrit aussi profile.pstats et tracemalloc.txt dans le dossier de sortie.
         """
-        t = threading.Thread(target=self.run_analysis, daemon=True)
-        t.start()
-
-    def run_analysis(self):
-        try:
-            # Validate current path
-            if self.csv_entry.get():
-                csv = Path(self.csv_entry.get())
+        if not (params["instrument"] or params["profile"]):
+            return self._run_stages(job, params)
+        from src.instrument import recording
+        from src.outputs import rewrite_summary
+        with recording(capture_dir=params["out_dir"] if params["profile"] else None) as recorder:
+            result = self._run_stages(job, params)
+        result["summary"]["instrumentation"] = recorder.report()
+        rewrite_summary(result["out_dir"], result["summary"])
+        return result
+
+    def _run_stages(self, job, params):
+        from src.analyzer import ArrivalAnalyzer, ApproximateArrivalAnalyzer
+        from src.data_loader import DataLoader
+        from src.incremental import IncrementalAnalysis
+        from src.outputs import write_outputs
+        from src.report import build_summary
+
+        csv, out_dir = params["csv"], params["out_dir"]
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        def reading(read, size, rows):
+            # appelé après chaque bloc : l'ETA suit les octets lus, et l'annulation est vérifiée
+            job.progress("Lecture du CSV", READ_SHARE * read / max(size, 1), 1.0, rows=rows)
+
+        def stage(name, index, rows):
+            job.progress(name, READ_SHARE + (1 - READ_SHARE) * index / 4, 1.0, rows=rows)
+
+        job.progress("Lecture du CSV", 0, 1.0)
+        if params["incremental"]:
+            # seules les lignes ajoutées depuis la dernière analyse sont lues
+            inc = IncrementalAnalysis(csv, timestamp_format=params["timestamp_format"])
+            analyzer = inc.run(progress=reading)
+            df = None
+            invalid_rows = analyzer.invalid_rows
+            rows = inc.new_rows
+        else:
+            dl = DataLoader(csv, cache=self.cache, timestamp_format=params["timestamp_format"])
+            # table compacte partagée telle quelle par l'analyseur et self.current_df (aucune copie)
+            df = dl.load_table(progress=reading)
+            invalid_rows = dl.invalid_rows
+            rows = len(df)
+            if params["approximate"]:
+                analyzer = ApproximateArrivalAnalyzer(df)
             else:
-                messagebox.showerror("Erreur", "Aucun fichier CSV sélectionné.")
-                return
-
-            if not csv.exists():
-                messagebox.showerror("Erreur", "Fichier CSV inexistant.")
-                return
-
-            out_dir = self.out_dir or Path("data/output")
-            out_dir.mkdir(parents=True, exist_ok=True)
-
-            self.status_var.set("Analyse en cours...")
-            dl = DataLoader(csv)
-            df = dl.load_csv()
-            dl.validate(df)
-            df = dl.parse_dates(df)
-            analyzer = ArrivalAnalyzer(df)
-            hourly = analyzer.hourly_counts()
-            daily = analyzer.daily_counts()
-
-            # Save outputs
-            hourly.to_csv(out_dir / "hourly_counts.csv", index=False)
-            daily.to_csv(out_dir / "daily_counts.csv", index=False)
-
-            # Generate plots (these functions save PNG files)
-            # We call the plot functions with explicit output file names
-            plot_hourly(hourly, out_path=str(out_dir / "hourly.png"))
-            plot_daily(daily, out_path=str(out_dir / "daily.png"))
-
-            # summary
-            bh, bhc = analyzer.busiest_hour()
-            bd, bdc = analyzer.busiest_day()
-            total = analyzer.total_patients()
-            avg = analyzer.average_daily()
-
-            summary = generate_summary(out_dir / "summary.json", total, bh, bhc, bd, bdc, avg)
-
-            # update state
-            self.current_df = df
-            self.hourly_df = hourly
-            self.daily_df = daily
-            self.summary = summary
-
-            # update results display
-            self._update_results_display(summary)
-            self.status_var.set("Analyse terminée.")
-            messagebox.showinfo("Succès", f"Analyse terminée. Résultats dans : {out_dir}")
-
-            # switch to results page
-            self.show_page("results")
-            # Initialiser la base (crée si n'existe pas)
-            init_db()
-
-            # Enregistrer l'analyse
-            insert_analysis(
-                file_name=csv.name,
-                total_patients=total,
-                busiest_hour=str(bh),
-                busiest_day=str(bd)
-            )
-        except Exception as e:
-            self.status_var.set("Erreur")
-            messagebox.showerror("Erreur pendant l'analyse", str(e))
+                analyzer = ArrivalAnalyzer(df)
+
+        stage("Agrégation", 0, rows)
+        hourly = analyzer.hourly_counts()
+        daily = analyzer.daily_counts()
+
+        # summary
+        stage("Résumé", 1, rows)
+        bh, bhc = analyzer.busiest_hour()
+        bd, bdc = analyzer.busiest_day()
+        total = analyzer.total_patients()
+        avg = analyzer.average_daily()
+
+        extra = {}
+        if invalid_rows:
+            extra["unparseable_rows"] = invalid_rows
+        if isinstance(analyzer, ApproximateArrivalAnalyzer):
+            extra["approximation"] = analyzer.error_bounds()
+        summary = build_summary(total, bh, bhc, bd, bdc, avg, extra=extra)
+
+        # CSV, graphiques et résumé écrits en parallèle (écritures atomiques, artefacts inchangés ignorés)
+        stage("Écriture des sorties", 2, rows)
+        write_outputs(out_dir, hourly, daily, summary, fmt=params["export_format"])
+
+        # Enregistrer l'analyse (init_db est lancé au démarrage ; insert_analysis recrée la base si elle a disparu)
+        stage("Historique", 3, rows)
+        insert_analysis(
+            file_name=csv.name,
+            total_patients=total,
+            busiest_hour=str(bh),
+            busiest_day=str(bd),
+            busiest_hour_count=bhc,
+            busiest_day_count=bdc,
+            average_daily=avg,
+            hourly=hourly,
+            daily=daily
+        )
+        return {"df": df, "hourly": hourly, "daily": daily, "summary": summary, "out_dir": out_dir}
+
+    def _analysis_progress(self, p):
+        if p["fraction"] is not None:
+            self.progress["value"] = p["fraction"]
+        text = p["stage"]
+        if p["rows"]:
+            text += f" — {p['rows']} lignes"
+        if p["eta"] is not None:
+            text += f" — reste ≈ {p['eta']:.0f} s"
+        self.status_var.set(text)
+
+    def _analysis_done(self, result):
+        # update state
+        self.current_df = result["df"]
+        self.hourly_df = result["hourly"]
+        self.daily_df = result["daily"]
+        self.summary = result["summary"]
+        self.progress["value"] = 1.0
+        if "plots" in self._built_pages:
+            self._update_plots()
+
+        # update results display
+        self._update_results_display(self.summary)
+        self.status_var.set("Analyse terminée.")
+        # switch to results page
+        self.show_page("results")
+        if not self.jobs.active:
+            messagebox.showinfo("Succès", f"Analyse terminée. Résultats dans : {result['out_dir']}")
+
+    def _analysis_failed(self, error):
+        self.progress["value"] = 0
+        self.status_var.set("Erreur")
+        messagebox.showerror("Erreur pendant l'analyse", str(error))
+
+    def _analysis_cancelled(self):
+        self.progress["value"] = 0
+        self.status_var.set("Analyse annulée.")
 
     def _update_results_display(self, summary):
+        self.ensure_page("results")
         txt = self.results_text
         txt.configure(state="normal")
         txt.delete("1.0", "end")
@@ -385,42 +606,57 @@ class PatientArrivalApp(tk.Tk):
             f"Busiest day: {summary.get('busiest_day')} (count = {summary.get('busiest_day_count')})",
             f"Average daily arrivals: {summary.get('average_daily'):.2f}"
         ]
+        if summary.get('unparseable_rows'):
+            lines.append(f"Lignes ignorées (timestamp illisible) : {summary['unparseable_rows']}")
+        approx = summary.get('approximation')
+        if approx:
+            lo, hi = approx['total_patients_95ci']
+            lines.append(f"Mode approximatif (HyperLogLog, p={approx['precision']}) : "
+                         f"erreur relative ±{100 * approx['relative_standard_error']:.1f} %, total entre {lo} et {hi} (95 %)")
+        instr = summary.get('instrumentation')
+        if instr:
+            peak = (f", mémoire max. du processus {instr['rss_high_water_mb']} Mo"
+                    if instr.get('rss_high_water_mb') is not None else "")
+            lines.append("")
+            lines.append(f"Mesures : {instr['total_seconds']:.3f} s au total{peak}")
+            for st in instr['stages']:
+                rows = f" — {st['rows']} lignes" if st.get('rows') is not None else ""
+                lines.append(f"{'    ' * (st['depth'] + 1)}{st['stage']} : {st['seconds'] * 1000:.1f} ms{rows}")
         txt.insert("1.0", "\n".join(lines))
         txt.configure(state="disabled")
 
-    def show_plot(self, which):
-        # clear plot area
-        for w in self.plot_area.winfo_children():
-            w.destroy()
+    def _update_plots(self):
+        """Remplace les données des courbes intégrées (les figures et Axes sont conservés)."""
+        from src.plotter import draw_hourly, draw_daily
+        draw_hourly(self.hourly_ax, self.hourly_df)
+        draw_daily(self.daily_ax, self.daily_df)
+        # les nouvelles données deviennent la vue « accueil » de la barre d'outils
+        self.plot_toolbar.update()
+        if self.plot_empty.winfo_ismapped():
+            self.plot_empty.pack_forget()
+            self.plot_canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.plot_canvas.draw_idle()
 
-        if which == "hourly":
-            png = self.out_dir / "hourly.png"
-        else:
-            png = self.out_dir / "daily.png"
-
-        if png.exists():
-                try:
-                    img = Image.open(png)
-                    img = img.resize((760, 420), Image.LANCZOS)
-                    photo = ImageTk.PhotoImage(img)
-                    lbl = tk.Label(self.plot_area, image=photo, bg=BG)
-                    lbl.image = photo
-                    lbl.pack(expand=True)
-                    return
-                except Exception:
-                    # afficher message d'erreur en cas de problème
-                    lbl = tk.Label(self.plot_area, text=f"Le fichier {png.name} existe mais n'a pas pu être affiché.\nOuvre-le dans le dossier de sortie.",
-                                bg=BG, fg=SUB_TEXT, font=FONT_NORMAL, justify="center")
-                    lbl.pack(expand=True)
-        else:
-            lbl = tk.Label(self.plot_area, text="Aucun graphique généré. Lancez l'analyse d'abord.",
-                           bg=BG, fg=SUB_TEXT, font=FONT_NORMAL)
-            lbl.pack(expand=True)
+    def show_plot(self, which):
+        """Affiche la vue demandée depuis les données en mémoire, sans lire de fichier."""
+        if self.hourly_df is None:
+            return
+        hourly = which == "hourly"
+        self.hourly_ax.set_visible(hourly)
+        self.hourly_ax.set_navigate(hourly)
+        self.daily_ax.set_visible(not hourly)
+        self.daily_ax.set_navigate(not hourly)
+        self.plot_canvas.draw_idle()
 
 # Run app
 def main():
     app = PatientArrivalApp()
     app.mainloop()
+    # demande l'arrêt des jobs en cours pour ne pas bloquer la sortie
+    app.jobs.shutdown()
+    app.preview_jobs.shutdown()
+    if "src.outputs" in sys.modules:
+        sys.modules["src.outputs"].shutdown_render_pool()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PRECISION = 12
+
+
+def hash_ids(values):
+    """
+    Calcule un hash 64 bits stable de chaque identifiant patient.
+
+    Les identifiants sont hachés sous forme de chaîne, pour que 12 et "12" donnent
+    le même hash d'un fichier ou d'une exécution à l'autre.
+    """
+    return pd.util.hash_array(pd.Series(values).astype(str).to_numpy(dtype=object))
+
+
+def leading_zeros(x):
+    """Nombre de zéros de tête de chaque uint64 non nul (vectorisé)."""
+    x = x.astype(np.uint64, copy=True)
+    lz = np.zeros(len(x), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        empty = (x >> np.uint64(64 - shift)) == 0
+        lz[empty] += shift
+        x[empty] <<= np.uint64(shift)
+    return lz
+
+
+def register_updates(hashes, precision):
+    """
+    Retourne :
+    tuple : (indice de registre, rang du premier bit à 1) pour chaque hash.
+    """
+    p = np.uint64(precision)
+    idx = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+    # bit sentinelle pour borner le rang à 64 - p + 1
+    w = (hashes << p) | (np.uint64(1) << (p - np.uint64(1)))
+    return idx, leading_zeros(w) + 1
+
+
+def relative_error(precision):
+    """Erreur relative standard d'un sketch HyperLogLog de précision donnée."""
+    return 1.04 / math.sqrt(1 << precision)
+
+
+def estimate(registers):
+    """
+    Estime la cardinalité de chaque ligne d'une matrice de registres (n_sketches, m).
+    """
+    registers = np.atleast_2d(registers)
+    m = registers.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.exp2(-registers.astype(np.float64)).sum(axis=1)
+    zeros = (registers == 0).sum(axis=1)
+    small = (raw <= 2.5 * m) & (zeros > 0)
+    # correction petites cardinalités (linear counting)
+    raw[small] = m * np.log(m / zeros[small])
+    return raw
+
+
+class SketchTable:
+    """
+    Ensemble de sketches HyperLogLog indexés par seau (heure, jour...).
+
+    Chaque seau occupe 2**precision octets, quel que soit le nombre de patients.
+    """
+    def __init__(self, precision=DEFAULT_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"Invalid precision: {precision}")
+        self.precision = precision
+        self.m = 1 << precision
+        self.keys = np.empty(0, dtype=np.int64)
+        self.registers = np.zeros((0, self.m), dtype=np.uint8)
+
+    def _rows(self, keys):
+        """Indices des lignes pour les clés données, en ajoutant les clés manquantes."""
+        merged = np.union1d(self.keys, keys)
+        if len(merged) != len(self.keys):
+            registers = np.zeros((len(merged), self.m), dtype=np.uint8)
+            registers[np.searchsorted(merged, self.keys)] = self.registers
+            self.keys, self.registers = merged, registers
+        return np.searchsorted(self.keys, keys)
+
+    def add(self, buckets, hashes):
+        """Ajoute des hashes d'identifiants, chacun dans son seau."""
+        if len(buckets) == 0:
+            return
+        rows = self._rows(np.asarray(buckets, dtype=np.int64))
+        idx, rho = register_updates(hashes, self.precision)
+        np.maximum.at(self.registers, (rows, idx), rho)
+
+    def merge(self, other):
+        """Fusionne (union) les sketches d'une autre table de même précision."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precisions")
+        if len(other.keys):
+            rows = self._rows(other.keys)
+            self.registers[rows] = np.maximum(self.registers[rows], other.registers)
+        return self
+
+    def rollup(self, parent_keys):
+        """
+        Regroupe les seaux ayant la même clé parente (ex. heure -> jour).
+
+        parent_keys doit être croissant, dans l'ordre de self.keys.
+        """
+        table = SketchTable(self.precision)
+        if len(self.keys):
+            table.keys, starts = np.unique(parent_keys, return_index=True)
+            table.registers = np.maximum.reduceat(self.registers, starts, axis=0)
+        return table
+
+    def estimates(self):
+        """Cardinalité estimée de chaque seau."""
+        if not len(self.keys):
+            return np.empty(0)
+        return estimate(self.registers)
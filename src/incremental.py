@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer import ArrivalAnalyzer, StreamingAggregator
+from src.data_loader import DataLoader, DEFAULT_CHUNKSIZE
+from src.hll import hash_ids
+from src.report import generate_summary
+
+STATE_DIR = Path("data/state")
+# taille du début de fichier utilisée pour vérifier qu'il n'a pas été réécrit
+HEAD_BYTES = 65536
+
+
+def _save_pickle(obj, path):
+    """Écrit un pickle pandas de façon atomique (fichier temporaire puis renommage)."""
+    tmp = path.with_name(path.name + '.tmp')
+    obj.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def _save_array(values, path):
+    """Écrit un tableau .npy de façon atomique (fichier temporaire puis renommage)."""
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.save(f, values)
+    os.replace(tmp, path)
+
+
+class IncrementalAnalysis:
+    """
+    Analyse incrémentale d'un CSV d'arrivées auquel on ajoute des lignes en fin de fichier.
+
+    L'état persisté contient l'offset d'octets déjà lu, les tables horaire et journalière,
+    les paires (heure, patient) distinctes rangées par mois et les patients vus (hashs 64 bits
+    triés dans patients.npy, fusionnés à chaque ajout). Une nouvelle exécution ne lit que les
+    octets ajoutés et ne relit ni ne réécrit que les mois qui reçoivent des lignes.
+    Si le fichier a été tronqué ou réécrit, l'état est reconstruit depuis le début.
+
+    Arguments :
+    timestamp_format (str, optionnel) : format imposé des timestamps ; sinon deviné à chaque lecture.
+    """
+    def __init__(self, csv_path, state_dir=STATE_DIR, timestamp_col='timestamp', id_col='patient_id',
+                 chunksize=DEFAULT_CHUNKSIZE, timestamp_format=None):
+        self.path = Path(csv_path)
+        key = hashlib.sha1(str(self.path.resolve()).encode()).hexdigest()[:16]
+        self.dir = Path(state_dir) / key
+        self.ts = timestamp_col
+        self.id = id_col
+        self.chunksize = chunksize
+        self.timestamp_format = timestamp_format
+        self.new_rows = 0
+        # lignes ajoutées écartées faute de timestamp lisible (dernière exécution)
+        self.invalid_rows = 0
+
+    # ---------------------------
+    # État persisté
+    # ---------------------------
+    def _head_hash(self, offset):
+        with open(self.path, 'rb') as f:
+            return hashlib.sha1(f.read(min(offset, HEAD_BYTES))).hexdigest()
+
+    def _load_state(self):
+        state_file = self.dir / 'state.json'
+        if not state_file.exists():
+            return None
+        state = json.loads(state_file.read_text(encoding='utf-8'))
+        if (state.get('columns') != [self.ts, self.id]
+                or not (self.dir / 'patients.npy').exists()
+                or self.path.stat().st_size < state['offset']
+                or self._head_hash(state['offset']) != state['head_hash']):
+            return None
+        return state
+
+    def _reset(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+        (self.dir / 'pairs').mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'rb') as f:
+            f.readline()
+            offset = f.tell()
+        self.hourly = pd.DataFrame({'timestamp': pd.Series(dtype='datetime64[ns]'), 'count': pd.Series(dtype='int64')})
+        self.daily = pd.DataFrame({'date': pd.Series(dtype=object), 'count': pd.Series(dtype='int64')})
+        self.patients = np.empty(0, dtype=np.int64)
+        self._patients_changed = True
+        return {'offset': offset, 'rows': 0, 'invalid_rows': 0}
+
+    def _load_tables(self):
+        self.hourly = pd.read_pickle(self.dir / 'hourly.pkl')
+        self.daily = pd.read_pickle(self.dir / 'daily.pkl')
+        self.patients = np.load(self.dir / 'patients.npy', mmap_mode='r')
+        self._patients_changed = False
+
+    def _save(self, state):
+        _save_pickle(self.hourly, self.dir / 'hourly.pkl')
+        _save_pickle(self.daily, self.dir / 'daily.pkl')
+        if self._patients_changed:
+            _save_array(self.patients, self.dir / 'patients.npy')
+        state.update(columns=[self.ts, self.id], head_hash=self._head_hash(state['offset']))
+        tmp = self.dir / 'state.json.tmp'
+        tmp.write_text(json.dumps(state, indent=2), encoding='utf-8')
+        os.replace(tmp, self.dir / 'state.json')
+
+    def _complete_end(self):
+        """Position juste après la dernière ligne complète (une ligne en cours d'écriture est ignorée)."""
+        size = self.path.stat().st_size
+        with open(self.path, 'rb') as f:
+            pos = size
+            while pos > 0:
+                start = max(0, pos - HEAD_BYTES)
+                f.seek(start)
+                i = f.read(pos - start).rfind(b'\n')
+                if i >= 0:
+                    return start + i + 1
+                pos = start
+        return 0
+
+    # ---------------------------
+    # Mise à jour
+    # ---------------------------
+    def _apply(self, new_pairs):
+        """Fusionne les nouvelles paires : seuls les mois qui en reçoivent sont relus, réécrits et recomptés."""
+        pair_dir = self.dir / 'pairs'
+        parts = []
+        for month, part in new_pairs.groupby(new_pairs['hour'].dt.to_period('M')):
+            path = pair_dir / f'{month}.pkl'
+            if path.exists():
+                part = pd.concat([pd.read_pickle(path), part], ignore_index=True).drop_duplicates()
+            part = part.reset_index(drop=True)
+            _save_pickle(part, path)
+            parts.append(part)
+        months = new_pairs['hour'].dt.to_period('M').unique()
+
+        agg = StreamingAggregator.from_pairs(pd.concat(parts, ignore_index=True), self.ts, self.id)
+        kept = self.hourly[~self.hourly['timestamp'].dt.to_period('M').isin(months)]
+        self.hourly = pd.concat([kept, agg.hourly_counts()], ignore_index=True).sort_values('timestamp', ignore_index=True)
+        kept = self.daily[~pd.to_datetime(self.daily['date']).dt.to_period('M').isin(months)]
+        self.daily = pd.concat([kept, agg.daily_counts()], ignore_index=True).sort_values('date', ignore_index=True)
+
+        # patients : hashs 64 bits triés, les nouveaux sont insérés à leur place
+        hashes = np.unique(hash_ids(new_pairs['pid'].unique()).view(np.int64))
+        pos = np.searchsorted(self.patients, hashes)
+        seen = pos < len(self.patients)
+        seen[seen] = self.patients[pos[seen]] == hashes[seen]
+        if not seen.all():
+            self.patients = np.insert(self.patients, pos[~seen], hashes[~seen])
+            self._patients_changed = True
+
+    def run(self, progress=None):
+        """
+        Lit uniquement les lignes ajoutées depuis la dernière exécution et met l'état à jour.
+
+        Arguments :
+        progress (callable, optionnel) : appelé après chaque bloc lu, voir DataLoader.iter_chunks.
+
+        Retourne :
+        ArrivalAnalyzer : analyseur construit sur l'historique complet ; son attribut invalid_rows
+        cumule les lignes écartées depuis le début du fichier.
+        """
+        state = self._load_state()
+        if state is None:
+            state = self._reset()
+        else:
+            self._load_tables()
+
+        end = self._complete_end()
+        self.new_rows = self.invalid_rows = 0
+        if end > state['offset']:
+            agg = DataLoader(self.path, timestamp_format=self.timestamp_format).stream_counts(
+                self.chunksize, self.ts, self.id, byte_range=(state['offset'], end), progress=progress,
+                collapse=False)
+            if agg.rows and agg.invalid_rows == agg.rows:
+                # état inchangé : une nouvelle exécution avec le bon format relira ces lignes
+                raise ValueError(f"No parseable timestamp in {agg.rows} new rows "
+                                 f"(timestamp_format={self.timestamp_format!r})")
+            new_pairs = agg.pairs()
+            if len(new_pairs):
+                self._apply(new_pairs)
+            self.new_rows, self.invalid_rows = agg.rows, agg.invalid_rows
+            state['offset'] = end
+            state['rows'] += agg.rows
+            state['invalid_rows'] = state.get('invalid_rows', 0) + agg.invalid_rows
+        self._save(state)
+        an = ArrivalAnalyzer.from_tables(self.hourly, self.daily, len(self.patients), self.ts, self.id)
+        an.invalid_rows = state.get('invalid_rows', 0)
+        return an
+
+    def refresh_outputs(self, out_dir):
+        """
+        Exécute run() puis réécrit hourly_counts.csv, daily_counts.csv et summary.json.
+
+        Retourne :
+        dict : le résumé écrit dans summary.json.
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        an = self.run()
+        an.hourly_counts().to_csv(out_dir / "hourly_counts.csv", index=False)
+        an.daily_counts().to_csv(out_dir / "daily_counts.csv", index=False)
+        bh, bhc = an.busiest_hour()
+        bd, bdc = an.busiest_day()
+        return generate_summary(out_dir / "summary.json", an.total_patients(), bh, bhc, bd, bdc, an.average_daily())
@@ -0,0 +1,193 @@
+import contextvars
+import cProfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# enregistreur actif pour le contexte courant (None = instrumentation désactivée)
+_recorder = contextvars.ContextVar("instrument_recorder", default=None)
+# span englobant, pour la profondeur et la mémoire de pointe des spans imbriqués
+_parent = contextvars.ContextVar("instrument_parent", default=None)
+TRACEMALLOC_TOP = 30
+
+
+def _rss_high_water_mb():
+    """
+    Plus haut niveau de mémoire résidente atteint par le processus depuis son démarrage (Mo),
+    ou None si la plateforme ne le fournit pas. Cette valeur ne redescend jamais.
+    """
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class _NullSpan:
+    """Span renvoyé quand l'instrumentation est désactivée : ne fait rien."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_rows(self, rows):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    Mesure d'une étape : durée, lignes traitées et mémoire de pointe.
+
+    traced_peak_mb (sous tracemalloc) est le pic propre au span. rss_high_water_mb est le plus
+    haut niveau du processus à la sortie du span, et rss_growth_mb la hausse de ce niveau pendant
+    le span (0 si l'étape est restée sous un pic antérieur).
+    """
+    def __init__(self, recorder, name, rows):
+        self.recorder = recorder
+        self.name = name
+        self.rows = rows
+        self.parent = None
+        self.depth = 0
+        self.traced_peak = 0
+
+    def set_rows(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        self.parent = _parent.get()
+        self.depth = self.parent.depth + 1 if self.parent is not None else 0
+        if tracemalloc.is_tracing():
+            # le pic atteint depuis le dernier reset appartient aux spans englobants
+            peak = tracemalloc.get_traced_memory()[1]
+            outer = self.parent
+            while outer is not None:
+                outer.traced_peak = max(outer.traced_peak, peak)
+                outer = outer.parent
+            tracemalloc.reset_peak()
+        self._rss_start = _rss_high_water_mb()
+        self._token = _parent.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        _parent.reset(self._token)
+        entry = {"stage": self.name, "seconds": round(seconds, 6), "depth": self.depth}
+        if self.rows is not None:
+            entry["rows"] = int(self.rows)
+            if seconds > 0:
+                entry["rows_per_second"] = round(self.rows / seconds)
+        if tracemalloc.is_tracing():
+            self.traced_peak = max(self.traced_peak, tracemalloc.get_traced_memory()[1])
+            entry["traced_peak_mb"] = round(self.traced_peak / 1024**2, 1)
+        rss = _rss_high_water_mb()
+        entry["rss_high_water_mb"] = rss
+        if rss is not None:
+            entry["rss_growth_mb"] = round(rss - self._rss_start, 1)
+        self.recorder.add(entry)
+        return False
+
+
+class Recorder:
+    """Collecte les spans d'une analyse (utilisable depuis plusieurs threads)."""
+    def __init__(self):
+        self.entries = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def add(self, entry):
+        with self._lock:
+            self.entries.append(entry)
+
+    def report(self):
+        """
+        Retourne :
+        dict : section "instrumentation" du résumé (étapes dans l'ordre de fin).
+        """
+        with self._lock:
+            stages = list(self.entries)
+        return {
+            "total_seconds": round(time.perf_counter() - self._start, 6),
+            "rss_high_water_mb": _rss_high_water_mb(),
+            "stages": stages,
+        }
+
+
+def span(name, rows=None):
+    """
+    Mesure une étape : with span("parse_dates", rows=len(df)) as s: ...
+
+    Sans enregistreur actif, retourne un objet inerte partagé (coût quasi nul).
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        return _NULL_SPAN
+    return Span(recorder, name, rows)
+
+
+def record(name, seconds, rows=None):
+    """Ajoute une durée mesurée ailleurs (ex. tâche d'un pool de processus)."""
+    recorder = _recorder.get()
+    if recorder is not None:
+        parent = _parent.get()
+        entry = {"stage": name, "seconds": round(seconds, 6), "depth": parent.depth + 1 if parent is not None else 0}
+        if rows is not None:
+            entry["rows"] = int(rows)
+        recorder.add(entry)
+
+
+def active():
+    """True si une mesure est en cours dans ce contexte."""
+    return _recorder.get() is not None
+
+
+def bind(fn):
+    """Enveloppe fn pour qu'elle s'exécute dans le contexte courant (threads d'un pool)."""
+    ctx = contextvars.copy_context()
+    # une copie par appel : un même Context ne peut pas être actif dans deux threads à la fois
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+
+@contextmanager
+def recording(capture_dir=None):
+    """
+    Active l'instrumentation pour le bloc et retourne le Recorder.
+
+    Arguments :
+    capture_dir (optionnel) : active aussi cProfile (thread courant) et tracemalloc, et écrit
+    profile.pstats et tracemalloc.txt dans ce dossier à la fin du bloc.
+    """
+    recorder = Recorder()
+    token = _recorder.set(recorder)
+    profiler = None
+    started_tracing = False
+    if capture_dir is not None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+        if profiler is not None:
+            profiler.disable()
+            capture_dir = Path(capture_dir)
+            capture_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(capture_dir / "profile.pstats")
+            top = tracemalloc.take_snapshot().statistics("lineno")[:TRACEMALLOC_TOP]
+            (capture_dir / "tracemalloc.txt").write_text("\n".join(str(s) for s in top) + "\n", encoding="utf-8")
+            if started_tracing:
+                tracemalloc.stop()
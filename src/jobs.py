@@ -0,0 +1,157 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# intervalle de scrutation de la file d'événements (~60 images/s)
+POLL_MS = 16
+# intervalle minimal entre deux événements de progression d'un même job
+PROGRESS_INTERVAL = 0.05
+# nombre maximal d'événements traités par scrutation, pour ne pas bloquer l'interface
+MAX_EVENTS_PER_POLL = 50
+
+
+class JobCancelled(Exception):
+    """Levée dans un job quand son annulation a été demandée."""
+
+
+class Job:
+    """
+    Tâche exécutée par un JobRunner.
+
+    La fonction du job reçoit cet objet : elle signale son avancement avec progress()
+    et appelle check() régulièrement pour s'arrêter proprement si le job est annulé.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, runner, fn, name, on_done, on_error, on_progress, on_cancel):
+        self.id = next(self._ids)
+        self.name = name
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.started = None
+        self._runner = runner
+        self._cancel = threading.Event()
+        self._last_progress = 0.0
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Demande l'annulation (prise en compte au prochain check())."""
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+
+    def progress(self, stage, done=None, total=None, rows=None):
+        """
+        Signale l'avancement : étape courante, fraction done/total et lignes lues.
+
+        L'ETA est estimée à partir du temps écoulé et de la fraction effectuée.
+        """
+        self.check()
+        now = time.perf_counter()
+        if done is not None and total and done < total and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        fraction = done / total if done is not None and total else None
+        eta = None
+        if fraction:
+            eta = (now - self.started) * (1 - fraction) / fraction
+        self._runner._post("progress", self, {"stage": stage, "fraction": fraction, "rows": rows, "eta": eta})
+
+
+class JobRunner:
+    """
+    Pool de threads exécutant des jobs, dont les résultats reviennent au thread Tk.
+
+    Les workers n'appellent jamais Tk : ils déposent des événements dans une file,
+    que poll() vide depuis le thread Tk grâce à la fonction schedule (ex. root.after).
+    Tous les callbacks (on_done, on_error, on_progress, on_cancel) s'exécutent donc
+    dans le thread Tk.
+    """
+    def __init__(self, schedule, workers=1, poll_ms=POLL_MS):
+        self._schedule = schedule
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._events = queue.Queue()
+        self._jobs = set()
+        self._polling = False
+        self.poll_ms = poll_ms
+
+    @property
+    def active(self):
+        """Jobs en attente ou en cours."""
+        return len(self._jobs)
+
+    def submit(self, fn, name="", on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        """
+        Ajoute un job à la file. fn(job) s'exécute dans un worker ; sa valeur de retour
+        est passée à on_done(result).
+
+        Retourne :
+        Job : le job créé (pour pouvoir l'annuler).
+        """
+        job = Job(self, fn, name, on_done, on_error, on_progress, on_cancel)
+        self._jobs.add(job)
+        self._pool.submit(self._run, job)
+        self._ensure_polling()
+        return job
+
+    def cancel_all(self):
+        for job in list(self._jobs):
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _post(self, kind, job, payload=None):
+        self._events.put((kind, job, payload))
+
+    def _run(self, job):
+        if job.cancelled:
+            self._post("cancelled", job)
+            return
+        job.started = time.perf_counter()
+        try:
+            result = job.fn(job)
+        except JobCancelled:
+            self._post("cancelled", job)
+        except Exception as e:
+            self._post("error", job, e)
+        else:
+            self._post("cancelled" if job.cancelled else "done", job, result)
+
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self._schedule(self.poll_ms, self.poll)
+
+    def poll(self):
+        """Traite les événements en attente (à appeler depuis le thread Tk)."""
+        for _ in range(MAX_EVENTS_PER_POLL):
+            try:
+                kind, job, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind != "progress":
+                self._jobs.discard(job)
+            callback = {"progress": job.on_progress, "done": job.on_done,
+                        "error": job.on_error, "cancelled": job.on_cancel}[kind]
+            if callback is None:
+                continue
+            if kind == "cancelled":
+                callback()
+            else:
+                callback(payload)
+        if self._jobs or not self._events.empty():
+            self._schedule(self.poll_ms, self.poll)
+        else:
+            self._polling = False
@@ -0,0 +1,139 @@
+import csv
+import io
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.timeparse import parse_timestamps
+
+DEFAULT_WINDOW = 3600
+
+
+def _to_seconds(ts):
+    if isinstance(ts, (int, float, np.integer, np.floating)):
+        return float(ts)
+    return pd.Timestamp(ts).value / 1e9
+
+
+class LiveArrivalCounter:
+    """
+    Compteur temps réel des arrivées, alimenté événement par événement.
+
+    Il maintient une fenêtre glissante (ex. « patients des 60 dernières minutes ») et des
+    fenêtres fixes horaires pour la journée en cours (« heure la plus chargée aujourd'hui »).
+    Chaque événement coûte O(1) amorti ; la mémoire est bornée par le nombre d'arrivées
+    dans la fenêtre et par le nombre de patients de la journée.
+    Les événements doivent arriver à peu près dans l'ordre chronologique.
+    """
+    def __init__(self, window_seconds=DEFAULT_WINDOW):
+        self.window = window_seconds
+        self.now = None
+        self.events = 0
+        self._recent = deque()       # (ts, patient) dans la fenêtre glissante
+        self._in_window = {}         # patient -> nombre d'arrivées dans la fenêtre
+        self._day = None
+        self._hours = {}             # heure (index depuis 1970) -> patients distincts
+        self._today = set()
+
+    def ingest(self, ts, patient_id):
+        """Ajoute une arrivée (ts : secondes depuis 1970, datetime ou chaîne)."""
+        ts = _to_seconds(ts)
+        self.events += 1
+        if self.now is None or ts > self.now:
+            self.now = ts
+
+        day = int(ts // 86400)
+        if self._day is None or day > self._day:
+            self._day = day
+            self._hours = {}
+            self._today = set()
+        if day == self._day:
+            hour = int(ts // 3600)
+            patients = self._hours.get(hour)
+            if patients is None:
+                patients = self._hours[hour] = set()
+            patients.add(patient_id)
+            self._today.add(patient_id)
+
+        if ts > self.now - self.window:
+            self._recent.append((ts, patient_id))
+            self._in_window[patient_id] = self._in_window.get(patient_id, 0) + 1
+        self._expire()
+
+    def ingest_many(self, timestamps, patient_ids):
+        """Ajoute un petit lot d'arrivées (timestamps datetime64, datetime ou secondes)."""
+        ts = np.asarray(timestamps)
+        if ts.dtype.kind == 'M':
+            ts = ts.astype('datetime64[ns]').view(np.int64) / 1e9
+        for t, pid in zip(ts.tolist(), patient_ids):
+            self.ingest(t, pid)
+
+    def _expire(self):
+        limit = self.now - self.window
+        recent, in_window = self._recent, self._in_window
+        while recent and recent[0][0] <= limit:
+            _, pid = recent.popleft()
+            n = in_window[pid] - 1
+            if n:
+                in_window[pid] = n
+            else:
+                del in_window[pid]
+
+    def summary(self):
+        """
+        Retourne :
+        dict : métriques courantes (fenêtre glissante et journée en cours).
+        """
+        busiest, busiest_count = None, 0
+        for hour, patients in self._hours.items():
+            if len(patients) > busiest_count:
+                busiest, busiest_count = hour, len(patients)
+        return {
+            "now": str(pd.Timestamp(self.now, unit='s')) if self.now is not None else None,
+            "window_minutes": self.window / 60,
+            "patients_in_window": len(self._in_window),
+            "arrivals_in_window": len(self._recent),
+            "patients_today": len(self._today),
+            "busiest_hour_today": str(pd.Timestamp(busiest * 3600, unit='s')) if busiest is not None else None,
+            "busiest_hour_today_count": busiest_count,
+        }
+
+
+def tail_csv(path, poll_interval=0.5, idle_timeout=None, timestamp_col='timestamp', id_col='patient_id'):
+    """
+    Suit un CSV en cours d'écriture (comme « tail -f ») et produit des lots d'arrivées.
+
+    Seules les lignes complètes sont lues ; une ligne en cours d'écriture attend le prochain passage.
+
+    Arguments :
+    idle_timeout (float, optionnel) : arrêt après ce délai sans nouvelle ligne.
+
+    Retourne :
+    générateur : tuples (timestamps datetime64[ns], identifiants patients).
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+        ts_idx, id_idx = header.index(timestamp_col), header.index(id_col)
+        pending = b''
+        last_data = time.monotonic()
+        while True:
+            data = f.read()
+            if data:
+                last_data = time.monotonic()
+                pending += data
+                cut = pending.rfind(b'\n') + 1
+                complete, pending = pending[:cut], pending[cut:]
+                rows = [r for r in csv.reader(io.StringIO(complete.decode('utf-8'))) if r]
+                if rows:
+                    ts, _, _ = parse_timestamps([r[ts_idx] for r in rows])
+                    valid = ~np.isnat(ts)
+                    ids = [r[id_idx] for r, ok in zip(rows, valid) if ok]
+                    yield ts[valid], ids
+            elif idle_timeout is not None and time.monotonic() - last_data > idle_timeout:
+                return
+            else:
+                time.sleep(poll_interval)
@@ -0,0 +1,192 @@
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+
+from src.export import FORMATS, write_table
+from src.instrument import bind, record, span
+from src.plotter import plot_hourly, plot_daily
+
+MANIFEST_NAME = ".outputs.json"
+IO_THREADS = 4
+# à incrémenter quand le rendu des graphiques change, pour régénérer les PNG existants
+RENDER_VERSION = 1
+
+_render_pool = None
+_pool_lock = threading.Lock()
+
+
+def atomic_write(path, write):
+    """
+    Écrit un fichier via un fichier temporaire du même dossier puis os.replace.
+
+    Un lecteur voit l'ancien contenu ou le nouveau, jamais un fichier à moitié écrit.
+    Le fichier temporaire garde l'extension finale (to_csv et savefig en déduisent le format).
+
+    Arguments :
+    path : fichier final.
+    write (callable) : write(tmp_path) produit le contenu.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".tmp-{os.getpid()}-{threading.get_ident()}-{path.name}")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def content_hash(*parts):
+    """Empreinte des entrées d'un artefact (DataFrames hachés par pandas, le reste en JSON)."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            h.update(",".join(map(str, part.columns)).encode())
+            h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def write_series(df, fmt, path):
+    with span(f"write.{fmt}", rows=len(df)):
+        atomic_write(path, lambda tmp: write_table(df, tmp, fmt))
+
+
+def write_json(data, path):
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+    atomic_write(path, write)
+
+
+def render_plot(kind, df, path):
+    """
+    Tâche exécutée dans le pool de processus : rendu matplotlib d'un graphique.
+
+    Retourne :
+    float : durée du rendu (les spans d'un autre processus ne remontent pas).
+    """
+    start = time.perf_counter()
+    plot = plot_hourly if kind == "hourly" else plot_daily
+    atomic_write(path, lambda tmp: plot(df, out_path=str(tmp)))
+    return time.perf_counter() - start
+
+
+def _get_render_pool():
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is None:
+            # spawn : l'appelant (interface Tk) a des threads et des verrous actifs, qu'un fork
+            # recopierait dans un état incohérent (blocage possible des processus enfants)
+            _render_pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+        return _render_pool
+
+
+def shutdown_render_pool():
+    """Arrête le pool de processus de rendu (il est recréé au besoin)."""
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(cancel_futures=True)
+            _render_pool = None
+
+
+atexit.register(shutdown_render_pool)
+
+
+def _read_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_outputs(out_dir, hourly, daily, summary, processes=None, fmt="csv"):
+    """
+    Écrit hourly_counts.csv, daily_counts.csv, hourly.png, daily.png et summary.json en parallèle.
+
+    Les séries et le JSON passent par un pool de threads, les graphiques par un pool de processus :
+    la durée totale se rapproche de celle de l'artefact le plus lent. Chaque écriture est atomique.
+    Un artefact dont les entrées n'ont pas changé depuis la dernière écriture (empreinte dans
+    .outputs.json) n'est pas réécrit.
+
+    Arguments :
+    processes (bool, optionnel) : rendu des graphiques dans des processus
+    (par défaut : seulement s'il y a plusieurs coeurs).
+    fmt (str) : format des séries horaires et journalières (voir export.FORMATS).
+
+    Retourne :
+    dict : nom du fichier -> "written" ou "skipped".
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = _read_manifest(manifest_path)
+    ext = FORMATS[fmt]
+    if processes is None:
+        processes = (os.cpu_count() or 1) > 1
+
+    # les graphiques (les plus lents) sont soumis en premier
+    artefacts = [
+        ("hourly.png", content_hash("png", RENDER_VERSION, hourly), render_plot, ("hourly", hourly), True),
+        ("daily.png", content_hash("png", RENDER_VERSION, daily), render_plot, ("daily", daily), True),
+        (f"hourly_counts{ext}", content_hash(fmt, hourly), write_series, (hourly, fmt), False),
+        (f"daily_counts{ext}", content_hash(fmt, daily), write_series, (daily, fmt), False),
+        ("summary.json", content_hash("json", summary), write_json, (summary,), False),
+    ]
+    status = {}
+    render_pool = _get_render_pool() if processes else None
+    with span("write_outputs"), ThreadPoolExecutor(max_workers=IO_THREADS) as io_pool:
+        futures, in_process = {}, []
+        for name, digest, fn, args, cpu_bound in artefacts:
+            path = out_dir / name
+            if manifest.get(name) == digest and path.exists():
+                status[name] = "skipped"
+                continue
+            if cpu_bound and render_pool is not None:
+                future = render_pool.submit(fn, *args, str(path))
+                in_process.append(future)
+            else:
+                # les threads héritent du contexte d'instrumentation courant
+                future = io_pool.submit(bind(fn), *args, str(path))
+            futures[future] = (name, digest)
+        wait(futures)
+        for future in in_process:
+            if future.exception() is None:
+                record(f"render.{futures[future][0]}", future.result())
+
+    error = None
+    for future, (name, digest) in futures.items():
+        if future.exception() is None:
+            manifest[name] = digest
+            status[name] = "written"
+        elif error is None:
+            error = future.exception()
+    # le manifeste garde les artefacts réussis, même si un autre a échoué
+    write_json(manifest, manifest_path)
+    if error is not None:
+        raise error
+    return status
+
+
+def rewrite_summary(out_dir, summary):
+    """
+    Réécrit summary.json après coup (ex. avec la section "instrumentation") et retire son
+    empreinte du manifeste : le prochain write_outputs le réécrira.
+    """
+    out_dir = Path(out_dir)
+    write_json(summary, out_dir / "summary.json")
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = _read_manifest(manifest_path)
+    if manifest.pop("summary.json", None) is not None:
+        write_json(manifest, manifest_path)
@@ -1,36 +1,159 @@
-import matplotlib.pyplot as plt
-import pandas as pd
+import threading
 from pathlib import Path
 
+import matplotlib.dates as mdates
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.instrument import span
+
+FIGSIZE = (10, 4)
+DPI = 100
+
+# figures Agg réutilisées d'un rendu à l'autre (une par graphique), sans passer par pyplot
+_figures = {}
+_lock = threading.Lock()
+
+
+def _date_nums(values):
+    """Convertit une colonne de dates en nombres matplotlib, sans boucle Python."""
+    return mdates.date2num(np.asarray(pd.to_datetime(values), dtype='datetime64[ns]'))
+
+
+def decimate_minmax(x, y, n_bins):
+    """
+    Réduit une série dense en gardant le minimum et le maximum de chaque tranche.
+
+    Le tracé reste visuellement identique (pics et creux conservés) à la largeur
+    de sortie, avec au plus 2 * n_bins points.
+
+    Retourne :
+    tuple : (x, y) décimés.
+    """
+    n = len(y)
+    if n <= 2 * n_bins:
+        return x, y
+    size = -(-n // n_bins)
+    padded = np.empty(size * n_bins, dtype=y.dtype)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    blocks = padded.reshape(n_bins, size)
+    offsets = np.arange(n_bins) * size
+    idx = np.concatenate([offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1)])
+    idx = np.unique(np.minimum(idx, n - 1))
+    return x[idx], y[idx]
+
+
+def format_date_axis(ax):
+    """Graduations de dates automatiques et compactes sur l'axe x."""
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+
+def new_figure(figsize=FIGSIZE, dpi=DPI):
+    """Retourne une Figure avec un seul Axes, sans toucher à l'état global de pyplot."""
+    fig = Figure(figsize=figsize, dpi=dpi)
+    ax = fig.add_subplot()
+    fig.subplots_adjust(left=0.08, right=0.98, top=0.9, bottom=0.15)
+    format_date_axis(ax)
+    return fig, ax
+
+
+def _artist(items, gid):
+    for item in items:
+        if item.get_gid() == gid:
+            return item
+    return None
+
+
+def _pixel_width(ax):
+    return max(int(ax.bbox.width), 1)
+
+
+def _set_thinned(line, x, y, width):
+    x, y = decimate_minmax(x, y, width)
+    line.set_data(x, y)
+    # les marqueurs ne restent lisibles que sur les séries courtes
+    line.set_marker('o' if len(x) <= 200 else '')
+
+
+def _thin_to_view(ax):
+    """
+    Re-décime la courbe horaire sur l'intervalle visible (zoom, déplacement) : la série
+    complète est conservée, seuls les points tracés dépendent de la vue.
+    """
+    line = _artist(ax.lines, 'hourly')
+    if line is None or getattr(line, 'full_data', None) is None:
+        return
+    x, y = line.full_data
+    lo, hi = ax.get_xlim()
+    # un point de part et d'autre de la vue, pour que la courbe atteigne les bords
+    start = max(int(np.searchsorted(x, lo, 'left')) - 1, 0)
+    stop = int(np.searchsorted(x, hi, 'right')) + 1
+    _set_thinned(line, x[start:stop], y[start:stop], _pixel_width(ax))
+
+
+def draw_hourly(ax, hourly_df):
+    """Trace (ou met à jour) la courbe des arrivées horaires dans ax."""
+    x = _date_nums(hourly_df['timestamp'])
+    y = hourly_df['count'].to_numpy(dtype=float)
+    line = _artist(ax.lines, 'hourly')
+    if line is None:
+        line, = ax.plot([], [], linewidth=1, gid='hourly')
+        ax.set_xlabel('Hour')
+        ax.set_ylabel('Patients')
+        ax.set_title('Patients per Hour')
+        ax.callbacks.connect('xlim_changed', _thin_to_view)
+    line.full_data = (x, y)
+    _set_thinned(line, x, y, _pixel_width(ax))
+    ax.relim()
+    ax.autoscale_view()
+    _thin_to_view(ax)
+
+
+def draw_daily(ax, daily_df):
+    """Trace (ou met à jour) l'histogramme des arrivées quotidiennes dans ax."""
+    x = _date_nums(daily_df['date'])
+    y = daily_df['count'].to_numpy(dtype=float)
+    # une marche par jour : bords [j - 0.5, j + 0.5] en unités de jours matplotlib
+    edges = np.append(x - 0.5, x[-1] + 0.5) if len(x) else np.array([0.0])
+    steps = _artist(ax.patches, 'daily')
+    if steps is None:
+        steps = ax.stairs(y, edges, fill=True, baseline=0, gid='daily')
+        ax.set_xlabel('Day')
+        ax.set_ylabel('Patients')
+        ax.set_title('Patients per Day')
+    else:
+        steps.set_data(y, edges, baseline=0)
+    ax.relim()
+    ax.autoscale_view()
+
+
+def _render(name, draw, df, out_path):
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        if name not in _figures:
+            fig, ax = new_figure()
+            FigureCanvasAgg(fig)
+            _figures[name] = (fig, ax)
+        fig, ax = _figures[name]
+        with span(f"plot.{name}", rows=len(df)):
+            draw(ax, df)
+            fig.savefig(out_path)
+
+
 def plot_hourly(hourly_df, out_path='docs/graphs/hourly.png'):
     """
     cree un graphique des arrivées horaires et l'enregistre sous forme de fichier PNG.
     """
-    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
-    hourly_df = hourly_df.copy()
-    hourly_df['timestamp'] = pd.to_datetime(hourly_df['timestamp'])
-    plt.figure(figsize=(10,4))
-    plt.plot(hourly_df['timestamp'], hourly_df['count'], marker='o', linewidth=1)
-    plt.xlabel('Hour')
-    plt.ylabel('Patients')
-    plt.title('Patients per Hour')
-    plt.tight_layout()
-    plt.savefig(out_path)
-    plt.close()
+    _render('hourly', draw_hourly, hourly_df, out_path)
+
 
 def plot_daily(daily_df, out_path='docs/graphs/daily.png'):
     """
     cree un graphique des arrivées quotidiennes et l'enregistre sous forme de fichier PNG.
     """
-    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
-    daily_df = daily_df.copy()
-    daily_df['date'] = pd.to_datetime(daily_df['date'])
-    plt.figure(figsize=(10,4))
-    plt.bar(daily_df['date'].dt.strftime('%Y-%m-%d'), daily_df['count'])
-    plt.xlabel('Day')
-    plt.ylabel('Patients')
-    plt.title('Patients per Day')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.savefig(out_path)
-    plt.close()
+    _render('daily', draw_daily, daily_df, out_path)
@@ -0,0 +1,100 @@
+import csv
+import io
+from pathlib import Path
+
+PAGE_SIZE = 100
+# taille de l'échantillon utilisé pour estimer la longueur moyenne d'une ligne
+SAMPLE_BYTES = 64 * 1024
+
+
+class CsvPager:
+    """
+    Lecture paresseuse d'un CSV pour l'aperçu : seules quelques lignes sont lues à la fois.
+
+    Les pages sont repérées par une position relative dans le fichier (0.0 à 1.0) :
+    on se place à l'octet correspondant puis on lit les lignes suivantes. La mémoire
+    utilisée ne dépend pas de la taille du fichier.
+    """
+    def __init__(self, path, columns=('timestamp', 'patient_id'), page_size=PAGE_SIZE):
+        self.path = Path(path)
+        self.page_size = page_size
+        self.size = self.path.stat().st_size
+        with open(self.path, 'rb') as f:
+            header_line = f.readline()
+            self.data_start = f.tell()
+        self.header = next(csv.reader([header_line.decode('utf-8-sig')]), [])
+        missing = [c for c in columns if c not in self.header]
+        if missing:
+            raise ValueError(f"Missing column: {missing[0]}")
+        self._idx = [self.header.index(c) for c in columns]
+        self._estimate = None
+
+    def _rows(self, f, n):
+        lines = []
+        for _ in range(n):
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line.decode('utf-8', errors='replace'))
+        rows = []
+        for fields in csv.reader(io.StringIO(''.join(lines))):
+            if fields:
+                rows.append(tuple(fields[i] if i < len(fields) else '' for i in self._idx))
+        return rows
+
+    def head(self, n=None):
+        """Premières lignes de données du fichier."""
+        with open(self.path, 'rb') as f:
+            f.seek(self.data_start)
+            return self._rows(f, n or self.page_size)
+
+    def estimate_rows(self):
+        """Estimation du nombre de lignes à partir de la longueur moyenne des premières lignes."""
+        if self._estimate is None:
+            self._estimate = self._count_estimate()
+        return self._estimate
+
+    def _count_estimate(self):
+        with open(self.path, 'rb') as f:
+            f.seek(self.data_start)
+            sample = f.read(SAMPLE_BYTES)
+        n = sample.count(b'\n')
+        if n == 0 or len(sample) >= self.size - self.data_start:
+            return n + (1 if sample and not sample.endswith(b'\n') else 0)
+        return int((self.size - self.data_start) * n / len(sample))
+
+    def tail(self):
+        """Dernières lignes de données du fichier (lecture à rebours par blocs)."""
+        block = 8192
+        with open(self.path, 'rb') as f:
+            pos, data = self.size, b''
+            while pos > self.data_start and data.count(b'\n') <= self.page_size:
+                start = max(self.data_start, pos - block)
+                f.seek(start)
+                data = f.read(pos - start) + data
+                pos = start
+            lines = data.splitlines(keepends=True)
+            if pos > self.data_start:
+                lines = lines[1:]  # première ligne potentiellement tronquée
+            return self._rows(io.BytesIO(b''.join(lines[-self.page_size:])), self.page_size)
+
+    def page_at(self, fraction):
+        """
+        Lignes commençant à la position relative fraction (0.0 = début, 1.0 = fin) du fichier.
+
+        Retourne :
+        list : au plus page_size tuples (timestamp, patient_id) sous forme de chaînes.
+        """
+        fraction = min(max(fraction, 0.0), 1.0)
+        pos = self.data_start + int(fraction * (self.size - self.data_start))
+        with open(self.path, 'rb') as f:
+            if pos > self.data_start:
+                # se recaler sur le début de la ligne suivante
+                f.seek(pos - 1)
+                f.readline()
+            else:
+                f.seek(self.data_start)
+            rows = self._rows(f, self.page_size)
+        if len(rows) < self.page_size and pos > self.data_start:
+            return self.tail()
+        return rows
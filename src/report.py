@@ -1,9 +1,11 @@
 import json
 from pathlib import Path
+from src.instrument import span
 
-def generate_summary(out_json_path, total_patients, busiest_hour, busiest_hour_count, busiest_day, busiest_day_count, average_daily):
+def build_summary(total_patients, busiest_hour, busiest_hour_count, busiest_day, busiest_day_count, average_daily, extra=None):
     """
-    cree un résumé des analyses et l'enregistre sous forme de fichier JSON.
+    Retourne :
+    dict : le résumé des analyses, prêt à être écrit en JSON.
     """
     summary = {
         "total_patients": total_patients,
@@ -13,7 +15,20 @@ def generate_summary(out_json_path, total_patients, busiest_hour, busiest_hour_c
         "busiest_day_count": int(busiest_day_count),
         "average_daily": float(average_daily)
     }
-    Path(out_json_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(out_json_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2)
+    if extra:
+        summary.update(extra)
+    return summary
+
+
+def generate_summary(out_json_path, total_patients, busiest_hour, busiest_hour_count, busiest_day, busiest_day_count, average_daily, extra=None):
+    """
+    cree un résumé des analyses et l'enregistre sous forme de fichier JSON.
+
+    extra (dict, optionnel) : sections supplémentaires ajoutées au résumé (ex. "approximation").
+    """
+    summary = build_summary(total_patients, busiest_hour, busiest_hour_count, busiest_day, busiest_day_count, average_daily, extra)
+    with span("summary.write"):
+        Path(out_json_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(out_json_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
     return summary
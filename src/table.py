@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+NS_PER_MINUTE = 60 * 10**9
+# minute manquante (timestamp vide ou illisible)
+MISSING_MINUTE = np.iinfo(np.int32).min
+
+
+class ArrivalTable:
+    """
+    Arrivées en mémoire compacte : 8 octets par arrivée.
+
+    - minutes : int32, minutes depuis le 1er janvier 1970 (MISSING_MINUTE si illisible) ;
+    - codes : int32, indice du patient dans ids (-1 si absent) ;
+    - ids : table des identifiants distincts.
+
+    La précision est la minute, ce qui suffit à tous les seaux d'analyse (1 min et plus).
+    Les colonnes ne sont jamais copiées par l'analyseur ni par l'interface.
+    """
+    def __init__(self, minutes, codes, ids, timestamp_col='timestamp', id_col='patient_id'):
+        self.minutes = np.asarray(minutes, dtype=np.int32)
+        self.codes = np.asarray(codes, dtype=np.int32)
+        self.ids = np.asarray(ids)
+        self.ts = timestamp_col
+        self.id = id_col
+
+    @classmethod
+    def from_arrays(cls, ns, ids, timestamp_col='timestamp', id_col='patient_id'):
+        """
+        Construit la table à partir de timestamps en nanosecondes (int64 ou datetime64) et d'identifiants.
+        """
+        ns = np.asarray(ns)
+        if ns.dtype.kind == 'M':
+            ns = ns.astype('datetime64[ns]').view(np.int64)
+        minutes = (ns // NS_PER_MINUTE).astype(np.int32)
+        minutes[ns == np.iinfo(np.int64).min] = MISSING_MINUTE
+        if isinstance(ids, pd.Categorical) or getattr(ids, 'dtype', None) == 'category':
+            cat = pd.Categorical(ids)
+            codes, uniques = cat.codes, np.asarray(cat.categories)
+        else:
+            if not isinstance(ids, (pd.Series, pd.Index, pd.api.extensions.ExtensionArray)):
+                ids = np.asarray(ids)
+            codes, uniques = pd.factorize(ids)
+        return cls(minutes, codes, uniques, timestamp_col, id_col)
+
+    @classmethod
+    def from_frame(cls, df, timestamp_col='timestamp', id_col='patient_id'):
+        """Construit la table à partir d'un DataFrame dont le timestamp est déjà converti."""
+        return cls.from_arrays(df[timestamp_col].to_numpy(dtype='datetime64[ns]'), df[id_col],
+                               timestamp_col, id_col)
+
+    @classmethod
+    def concat(cls, tables):
+        """
+        Assemble plusieurs tables (ex. blocs d'un même fichier) avec une table d'identifiants commune.
+        """
+        if not tables:
+            return cls(np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0))
+        first = tables[0]
+        global_codes, uniques = pd.factorize(np.concatenate([t.ids for t in tables]))
+        minutes = np.empty(sum(len(t) for t in tables), dtype=np.int32)
+        codes = np.empty(len(minutes), dtype=np.int32)
+        row = offset = 0
+        for t in tables:
+            n = len(t)
+            minutes[row:row + n] = t.minutes
+            # -1 (patient absent) reste -1 grâce à la case ajoutée en fin de correspondance
+            mapping = np.append(global_codes[offset:offset + len(t.ids)], -1).astype(np.int32)
+            codes[row:row + n] = mapping[t.codes]
+            row += n
+            offset += len(t.ids)
+        return cls(minutes, codes, uniques, first.ts, first.id)
+
+    def __len__(self):
+        return len(self.minutes)
+
+    @property
+    def nbytes(self):
+        """Mémoire occupée par les colonnes et la table des identifiants (hors objets Python référencés)."""
+        return self.minutes.nbytes + self.codes.nbytes + self.ids.nbytes
+
+    @property
+    def n_ids(self):
+        return len(self.ids)
+
+    def valid(self):
+        """Masque des arrivées dont le timestamp et le patient sont connus."""
+        return (self.minutes != MISSING_MINUTE) & (self.codes >= 0)
+
+    def keys_and_codes(self, seconds):
+        """
+        Seaux de `seconds` secondes (multiple de 60) et codes patients des arrivées valides.
+
+        Retourne :
+        tuple : (clés de seau int64 depuis 1970, codes int32).
+        """
+        minutes, codes = self.minutes, self.codes
+        valid = self.valid()
+        if not valid.all():
+            minutes, codes = minutes[valid], codes[valid]
+        return minutes.astype(np.int64) // (seconds // 60), codes
+
+    def distinct_patients(self):
+        """Nombre de patients distincts (timestamp lisible ou non, comme DataFrame.nunique)."""
+        codes = self.codes[self.codes >= 0]
+        return int(np.count_nonzero(np.bincount(codes, minlength=self.n_ids)))
+
+    def timestamps(self):
+        """Timestamps datetime64[ns] (calculés à la demande, NaT pour les minutes manquantes)."""
+        ns = self.minutes.astype(np.int64) * NS_PER_MINUTE
+        ns[self.minutes == MISSING_MINUTE] = np.iinfo(np.int64).min
+        return ns.view('datetime64[ns]')
+
+    def to_frame(self):
+        """DataFrame équivalent (identifiants en Categorical, sans dupliquer les chaînes)."""
+        ids = pd.Categorical.from_codes(self.codes, self.ids) if self.n_ids else pd.Categorical([None] * len(self))
+        return pd.DataFrame({self.ts: self.timestamps(), self.id: ids})
@@ -0,0 +1,70 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+ISO_FORMAT = "%Y-%m-%d %H:%M:%S"
+ISO_T_FORMAT = "%Y-%m-%dT%H:%M:%S"
+ISO_FORMATS = (ISO_FORMAT, ISO_T_FORMAT, "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d")
+SAMPLE_SIZE = 1000
+NAT = np.iinfo(np.int64).min
+
+def infer_format(values, sample_size=SAMPLE_SIZE):
+    """
+    Devine une seule fois le format des timestamps à partir d'un échantillon.
+
+    Le format deviné sur la première valeur (mois en premier puis jour en premier)
+    est vérifié sur tout l'échantillon ; celui qui échoue le moins est retenu.
+
+    Retourne :
+    str ou None : format strftime, None si aucun format n'a pu être deviné.
+    """
+    values = pd.Series(values)
+    sample = values.iloc[:4 * sample_size].dropna().head(sample_size).astype(str)
+    if sample.empty:
+        return None
+    best, best_failures = None, len(sample) + 1
+    for dayfirst in (False, True):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            fmt = guess_datetime_format(sample.iloc[0], dayfirst=dayfirst)
+        if fmt is None or fmt == best:
+            continue
+        failures = int(pd.to_datetime(sample, format=fmt, errors='coerce').isna().sum())
+        if failures < best_failures:
+            best, best_failures = fmt, failures
+    return best
+
+
+def parse_timestamps(values, fmt=None, sample_size=SAMPLE_SIZE):
+    """
+    Convertit une colonne de timestamps texte avec un format unique, deviné ou imposé.
+
+    Les formats ISO à largeur fixe passent directement par le parseur ISO compilé de pandas.
+    Pour les autres formats (strptime, lent), chaque chaîne distincte n'est convertie qu'une
+    fois : les journaux d'arrivées répètent souvent les mêmes minutes. Les valeurs illisibles
+    deviennent NaT au lieu de faire échouer tout le fichier.
+
+    Arguments :
+    values : séquence de chaînes.
+    fmt (str, optionnel) : format imposé ; sinon deviné sur un échantillon.
+
+    Retourne :
+    tuple : (numpy.ndarray datetime64[ns], nombre de lignes sans timestamp valide, format utilisé)
+    """
+    values = pd.Series(values)
+    if values.dtype.kind == 'M':
+        ts = values.to_numpy(dtype='datetime64[ns]')
+        return ts, int(np.isnat(ts).sum()), fmt
+    fmt = fmt or infer_format(values, sample_size)
+
+    if fmt in ISO_FORMATS:
+        ts = pd.to_datetime(values, format=fmt, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    else:
+        codes, uniques = pd.factorize(values)
+        parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=fmt or 'mixed', errors='coerce')
+        ns = parsed.to_numpy(dtype='datetime64[ns]').view(np.int64).take(codes)
+        ns[codes < 0] = NAT
+        ts = ns.view('datetime64[ns]')
+    return ts, int(np.isnat(ts).sum()), fmt
@@ -0,0 +1,91 @@
+import pandas as pd
+
+from src.database import get_connection, init_db
+
+# expression SQL donnant la période de chaque seau stocké ('YYYY-MM-DD HH:MM:SS' ou 'YYYY-MM-DD')
+_PERIODS = {
+    "hour": "c.bucket",
+    "day": "c.bucket",
+    # semaines commençant le lundi
+    "week": "date(c.bucket, '-6 days', 'weekday 1')",
+    "month": "substr(c.bucket, 1, 7)",
+}
+# au-delà du jour, la somme des patients distincts par jour n'est plus un nombre de patients
+# distincts (un patient venu deux jours compte deux fois) : c'est un nombre de patients-jours
+_METRICS = {"hour": "count", "day": "count", "week": "patient_days", "month": "patient_days"}
+
+
+def _select(granularity, start, end, site, file_name, latest_only):
+    """
+    Construit la requête d'agrégation sur analysis_counts.
+
+    Les niveaux heure utilisent les séries horaires stockées ; les niveaux jour, semaine
+    et mois partent des séries journalières (patients distincts par jour), sommées
+    au-delà du jour : la colonne s'appelle alors patient_days (voir _METRICS).
+    """
+    if granularity not in _PERIODS:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    source = "hour" if granularity == "hour" else "day"
+    clauses, params = ["c.granularity = ?"], [source]
+    if start is not None:
+        clauses.append("c.bucket >= ?")
+        params.append(str(start))
+    if end is not None:
+        clauses.append("c.bucket < ?")
+        params.append(str(end))
+    if site is not None:
+        clauses.append("a.site = ?")
+        params.append(site)
+    if file_name is not None:
+        clauses.append("a.file_name = ?")
+        params.append(file_name)
+    if latest_only:
+        # un fichier analysé plusieurs fois n'est compté qu'une fois (dernière analyse)
+        clauses.append("a.id IN (SELECT MAX(id) FROM analysis GROUP BY site, file_name)")
+    sql = f"""
+        SELECT {_PERIODS[granularity]} AS period, SUM(c.count) AS {_METRICS[granularity]}
+        FROM analysis_counts c JOIN analysis a ON a.id = c.analysis_id
+        WHERE {" AND ".join(clauses)}
+        GROUP BY period
+    """
+    return sql, params
+
+
+def query_series(granularity="day", start=None, end=None, site=None, file_name=None, latest_only=True):
+    """
+    Série agrégée sur une plage de temps, à partir des comptes déjà stockés (sans relire les CSV).
+
+    Arguments :
+    granularity (str) : 'hour', 'day', 'week' ou 'month'.
+    start, end (str, optionnels) : bornes [start, end) au format 'YYYY-MM-DD[ HH:MM:SS]'.
+    site, file_name (str, optionnels) : filtres de dimension.
+    latest_only (bool) : ne garder que la dernière analyse de chaque fichier.
+
+    Retourne :
+    pandas.DataFrame : colonnes period et count (heure, jour : patients distincts de la période)
+    ou patient_days (semaine, mois : somme des patients distincts de chaque jour, un patient
+    venu plusieurs jours est compté chaque jour), triées par période.
+    """
+    init_db()
+    sql, params = _select(granularity, start, end, site, file_name, latest_only)
+    return pd.read_sql_query(sql + " ORDER BY period", get_connection(), params=params)
+
+
+def top_periods(k=10, granularity="hour", start=None, end=None, site=None, file_name=None, latest_only=True):
+    """
+    Les k périodes les plus chargées sur une plage de temps.
+
+    Retourne :
+    pandas.DataFrame : colonnes period et count ou patient_days (comme query_series),
+    triées par valeur décroissante.
+    """
+    init_db()
+    sql, params = _select(granularity, start, end, site, file_name, latest_only)
+    sql += f" ORDER BY {_METRICS[granularity]} DESC, period LIMIT ?"
+    return pd.read_sql_query(sql, get_connection(), params=params + [int(k)])
+
+
+def list_sites():
+    """Sites présents dans l'historique."""
+    init_db()
+    return [r[0] for r in get_connection().execute("SELECT DISTINCT site FROM analysis WHERE site IS NOT NULL ORDER BY site")]
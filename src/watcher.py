@@ -0,0 +1,298 @@
+"""
+Surveillance d'un dossier de dépôt : chaque nouveau CSV d'arrivées est analysé automatiquement.
+
+Usage :
+    python -m src.watcher data/incoming --out data/output --workers 2 --site urgences
+
+Une boucle asyncio scrute le dossier ; un fichier n'est pris qu'une fois sa taille et sa date
+de modification stables (écriture terminée). Les fichiers prêts passent par une file bornée vers
+un pool d'exécuteurs de taille fixe : quand le pool est occupé, la file se remplit puis le scan
+attend, si bien qu'un dépôt de milliers de fichiers est traité sans tout charger en mémoire.
+L'historique est enregistré par lots (database.insert_analyses) et les fichiers déjà traités
+sont mémorisés dans le dossier de sortie, pour ne pas les réanalyser au redémarrage.
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from src.cli import analyze_file
+
+SEEN_FILE = ".watcher_seen.json"
+POLL_INTERVAL = 2.0
+# durée pendant laquelle taille et date de modification doivent rester identiques
+SETTLE_SECONDS = 2.0
+QUEUE_SIZE = 64
+BATCH_SIZE = 50
+BATCH_SECONDS = 5.0
+
+
+def file_key(path, stat):
+    """Identité d'une version de fichier : un fichier réécrit est analysé de nouveau."""
+    return f"{Path(path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class DirectoryWatcher:
+    """
+    Analyse les CSV déposés dans un dossier, au fil de l'eau.
+
+    Arguments :
+    directory : dossier surveillé (non récursif).
+    out_dir : dossier de sortie (un sous-dossier par fichier, plus le registre des fichiers vus).
+    workers (int) : analyses simultanées (processus si > 1, sinon un thread).
+    record_history (bool) : enregistrer les analyses dans la base d'historique.
+    options : format, timestamp_format, approximate, timestamp_col, id_col (comme run_batch).
+    """
+    def __init__(self, directory, out_dir, pattern="*.csv", workers=1, site=None, record_history=True,
+                 poll_interval=POLL_INTERVAL, settle_seconds=SETTLE_SECONDS, queue_size=QUEUE_SIZE,
+                 batch_size=BATCH_SIZE, batch_seconds=BATCH_SECONDS, **options):
+        self.directory = Path(directory)
+        self.out_dir = Path(out_dir)
+        self.pattern = pattern
+        self.workers = max(1, workers)
+        self.site = site
+        self.record_history = record_history
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.options = dict({"format": "csv", "timestamp_format": None, "approximate": False,
+                             "timestamp_col": "timestamp", "id_col": "patient_id"}, **options)
+        self.seen = self._load_seen()
+        self._names = {entry["out_dir"] for entry in self.seen.values()}
+        # fichier -> (taille, mtime_ns, instant du dernier changement) tant qu'il n'est pas stable
+        self._pending = {}
+        self._in_flight = set()
+        self._records, self._done = [], {}
+        # lots en cours d'enregistrement (ni dans _done ni encore dans seen)
+        self._flushing = {}
+        self.analyzed = self.failed = 0
+
+    # ---------------------------
+    # Registre des fichiers vus
+    # ---------------------------
+    def _load_seen(self):
+        path = self.out_dir / SEEN_FILE
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _save_seen(self):
+        from src.outputs import write_json
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        write_json(self.seen, self.out_dir / SEEN_FILE)
+
+    def _output_name(self, path):
+        """Sous-dossier de sortie, nommé d'après le fichier (suffixé s'il est déjà pris)."""
+        name, i = path.stem, 1
+        while name in self._names:
+            i += 1
+            name = f"{path.stem}_{i}"
+        self._names.add(name)
+        return name
+
+    # ---------------------------
+    # Détection des fichiers prêts
+    # ---------------------------
+    def scan(self, now=None):
+        """
+        Un passage sur le dossier.
+
+        Retourne :
+        list : (chemin, clé) des fichiers nouveaux dont l'écriture est terminée.
+        """
+        now = time.monotonic() if now is None else now
+        ready, present = [], set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or not fnmatch.fnmatch(entry.name, self.pattern):
+                    continue
+                stat = entry.stat()
+                key = file_key(entry.path, stat)
+                present.add(entry.path)
+                if self._known(key) or stat.st_size == 0:
+                    self._pending.pop(entry.path, None)
+                    continue
+                previous = self._pending.get(entry.path)
+                if previous is None or previous[:2] != (stat.st_size, stat.st_mtime_ns):
+                    self._pending[entry.path] = (stat.st_size, stat.st_mtime_ns, now)
+                elif now - previous[2] >= self.settle_seconds:
+                    del self._pending[entry.path]
+                    ready.append((Path(entry.path), key))
+        # fichiers supprimés ou renommés avant d'être stables
+        for path in set(self._pending) - present:
+            del self._pending[path]
+        return sorted(ready)
+
+    def _known(self, key):
+        """True si cette version du fichier est déjà traitée, en file ou en cours d'analyse."""
+        return key in self.seen or key in self._in_flight or key in self._done or key in self._flushing
+
+    def idle(self):
+        """True si aucun fichier n'est en attente de stabilité, en file ou en cours d'analyse."""
+        return not self._pending and not self._in_flight
+
+    # ---------------------------
+    # Boucle asyncio
+    # ---------------------------
+    async def run(self, stop=None, once=False):
+        """
+        Surveille le dossier jusqu'à stop.set() (ou, avec once=True, jusqu'à ce que les
+        fichiers présents au démarrage soient traités), puis vide la file et l'historique.
+
+        Retourne :
+        dict : nombre de fichiers analysés et en échec.
+        """
+        stop = stop or asyncio.Event()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        pool_cls = ProcessPoolExecutor if self.workers > 1 else ThreadPoolExecutor
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        with pool_cls(max_workers=self.workers) as pool:
+            consumers = [asyncio.create_task(self._consume(queue, pool)) for _ in range(self.workers)]
+            flusher = asyncio.create_task(self._flush_periodically(stop))
+            try:
+                while not stop.is_set():
+                    for item in self.scan():
+                        self._in_flight.add(item[1])
+                        # file pleine : le scan attend qu'un exécuteur se libère
+                        await queue.put(item)
+                    if once and self.idle():
+                        break
+                    try:
+                        await asyncio.wait_for(stop.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                await queue.join()
+            finally:
+                for task in consumers:
+                    task.cancel()
+                flusher.cancel()
+                await asyncio.gather(*consumers, flusher, return_exceptions=True)
+                await self.flush()
+        return {"analyzed": self.analyzed, "failed": self.failed}
+
+    async def _consume(self, queue, pool):
+        loop = asyncio.get_running_loop()
+        while True:
+            path, key = await queue.get()
+            out_name = self._output_name(path)
+            task = dict(self.options, path=str(path), out_dir=str(self.out_dir / out_name))
+            try:
+                rec = await loop.run_in_executor(pool, analyze_file, task)
+                rec["site"] = self.site
+                self._records.append(rec)
+                self._done[key] = {"file": str(path), "out_dir": out_name, "status": "ok"}
+                self.analyzed += 1
+                print(f"[ok] {path}", file=sys.stderr)
+            except Exception as e:
+                # un fichier illisible n'est pas retenté tant qu'il n'est pas modifié
+                self._done[key] = {"file": str(path), "out_dir": out_name, "status": "failed",
+                                   "error": f"{type(e).__name__}: {e}"}
+                self.failed += 1
+                print(f"[échec] {path} : {e}", file=sys.stderr)
+            finally:
+                self._in_flight.discard(key)
+                queue.task_done()
+            if len(self._records) >= self.batch_size:
+                try:
+                    await self.flush()
+                except Exception as e:
+                    print(f"[historique] {e} (nouvel essai au prochain lot)", file=sys.stderr)
+
+    async def _flush_periodically(self, stop):
+        while not stop.is_set():
+            await asyncio.sleep(self.batch_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[historique] {e} (nouvel essai au prochain lot)", file=sys.stderr)
+
+    async def flush(self):
+        """
+        Enregistre le lot d'analyses dans l'historique (une transaction), puis marque les
+        fichiers comme vus : un arrêt brutal entre les deux fait au pire réanalyser le lot.
+        """
+        records, done = self._records, self._done
+        if not records and not done:
+            return
+        self._records, self._done = [], {}
+        self._flushing.update(done)
+        try:
+            if self.record_history and records:
+                from src.database import insert_analyses
+                await asyncio.to_thread(insert_analyses, records)
+        except BaseException:
+            # le lot est remis en attente pour la prochaine tentative
+            self._records[:0] = records
+            self._done.update(done)
+            raise
+        finally:
+            for key in done:
+                self._flushing.pop(key, None)
+        self.seen.update(done)
+        await asyncio.to_thread(self._save_seen)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.watcher",
+                                     description="Analyse automatiquement les CSV d'arrivées déposés dans un dossier.")
+    parser.add_argument("directory", help="dossier surveillé")
+    parser.add_argument("--out", default="data/output", help="dossier de sortie (un sous-dossier par fichier)")
+    parser.add_argument("--pattern", default="*.csv", help="motif des fichiers à analyser")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="analyses simultanées")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL, help="intervalle de scan (s)")
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS,
+                        help="durée sans changement avant de considérer un fichier complet (s)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="fichiers prêts en attente au maximum")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="analyses par transaction d'historique")
+    parser.add_argument("--format", default="csv", help="format des séries : csv, csv.gz, csv.zst, parquet, arrow, npy")
+    parser.add_argument("--timestamp-format", default=None, help="format strftime des timestamps (deviné sinon)")
+    parser.add_argument("--site", default=None, help="site enregistré avec chaque analyse")
+    parser.add_argument("--db", default=None, help="base d'historique (par défaut data/analysis_history.db)")
+    parser.add_argument("--no-db", action="store_true", help="ne pas enregistrer l'historique")
+    parser.add_argument("--once", action="store_true", help="traiter les fichiers présents puis s'arrêter")
+    return parser
+
+
+async def _main(args):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, AttributeError):  # Windows
+            pass
+    watcher = DirectoryWatcher(args.directory, args.out, pattern=args.pattern, workers=args.workers,
+                               site=args.site, record_history=not args.no_db, poll_interval=args.poll,
+                               settle_seconds=args.settle, queue_size=args.queue_size,
+                               batch_size=args.batch_size, format=args.format,
+                               timestamp_format=args.timestamp_format)
+    print(f"surveillance de {args.directory} (Ctrl+C pour arrêter)", file=sys.stderr)
+    return await watcher.run(stop, once=args.once)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    from src.export import FORMATS
+    if args.format not in FORMATS:
+        parser.error(f"format inconnu : {args.format} (choix : {', '.join(FORMATS)})")
+    if not os.path.isdir(args.directory):
+        parser.error(f"dossier introuvable : {args.directory}")
+    if args.db:
+        from src import database
+        database.DB_PATH = Path(args.db)
+    counts = asyncio.run(_main(args))
+    print(f"{counts['analyzed']} fichiers analysés, {counts['failed']} en échec")
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
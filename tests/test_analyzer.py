@@ -20,3 +20,56 @@ def test_hourly_daily_counts():
     bd, bdc = an.busiest_day()
     assert isinstance(bhc, int)
     assert isinstance(bdc, int)
+
+def test_metrics_reuse_cached_tables():
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(['2024-01-01 10:05:00','2024-01-01 10:40:00','2024-01-01 10:50:00','2024-01-02 11:00:00']),
+        'patient_id': [1,2,2,3]
+    })
+    an = ArrivalAnalyzer(df)
+    assert an.df is df
+    assert an.hourly_counts() is an.hourly_counts()
+    assert an.busiest_hour() == (pd.Timestamp('2024-01-01 10:00:00'), 2)
+    assert an.busiest_day() == ('2024-01-01', 2)
+    assert an.total_patients() == 3
+    assert an.average_daily() == 1.5
+
+def test_numpy_engine_matches_pandas_reference():
+    import numpy as np
+    rng = np.random.default_rng(1)
+    n = 5000
+    ts = pd.Series(pd.to_datetime('2024-01-01') + pd.to_timedelta(rng.integers(0, 10 * 86400, n), unit='s'))
+    ids = pd.Series(rng.integers(0, 300, n).astype(object))
+    ts[::97] = pd.NaT
+    ids[::89] = None
+    df = pd.DataFrame({'timestamp': ts, 'patient_id': ids})
+    fast = ArrivalAnalyzer(df, engine='numpy')
+    ref = ArrivalAnalyzer(df, engine='pandas')
+    pd.testing.assert_frame_equal(fast.hourly_counts(), ref.hourly_counts())
+    pd.testing.assert_frame_equal(fast.daily_counts(), ref.daily_counts())
+    assert fast.busiest_hour() == ref.busiest_hour()
+    assert fast.busiest_day() == ref.busiest_day()
+
+def test_rollup_hierarchy_matches_direct_counts():
+    import numpy as np
+    rng = np.random.default_rng(3)
+    n = 4000
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime('2024-01-20') + pd.to_timedelta(rng.integers(0, 40 * 86400, n), unit='s'),
+        'patient_id': rng.integers(0, 500, n),
+    })
+    an = ArrivalAnalyzer(df)
+    r = an.rollup('15min')
+    assert r.counts('hour').equals(an.hourly_counts())
+    assert r.counts('day')['count'].tolist() == an.daily_counts()['count'].tolist()
+
+    keys = {
+        'base': df['timestamp'].dt.floor('15min'),
+        'week': df['timestamp'].dt.to_period('W-SUN').dt.start_time,
+        'month': df['timestamp'].dt.to_period('M').dt.start_time,
+    }
+    for level, key in keys.items():
+        ref = df.groupby(key)['patient_id'].nunique()
+        got = r.counts(level)
+        assert got['timestamp'].tolist() == list(ref.index)
+        assert got['count'].tolist() == ref.tolist()
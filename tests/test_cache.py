@@ -0,0 +1,48 @@
+from src.cache import ParsedCache
+from src.data_loader import DataLoader
+import os
+import pandas as pd
+
+
+def test_cache_hit_and_invalidation(tmp_path):
+    p = tmp_path / 's.csv'
+    pd.DataFrame({'timestamp': ['2024-01-01 10:00:00', '2024-01-01 11:30:00'],
+                  'patient_id': ['a', 'b']}).to_csv(p, index=False)
+    cache = ParsedCache(tmp_path / 'cache')
+    first = DataLoader(p, cache=cache).load_parsed()
+    cached = cache.get(p)
+    assert cached is not None
+    assert cached['timestamp'].tolist() == first['timestamp'].tolist()
+    assert cached['patient_id'].astype(str).tolist() == ['a', 'b']
+
+    with open(p, 'a') as f:
+        f.write('2024-01-02 09:00:00,c\n')
+    assert cache.get(p) is None
+    assert len(DataLoader(p, cache=cache).load_parsed()) == 3
+    assert len(list((tmp_path / 'cache').iterdir())) == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ParsedCache(tmp_path / 'cache', max_bytes=1)
+    paths = []
+    for i in range(2):
+        p = tmp_path / f'{i}.csv'
+        pd.DataFrame({'timestamp': ['2024-01-01 10:00:00'], 'patient_id': [i]}).to_csv(p, index=False)
+        DataLoader(p, cache=cache).load_parsed()
+        paths.append(p)
+    assert cache.get(paths[0]) is None
+    assert len(os.listdir(tmp_path / 'cache')) <= 1
+
+
+def test_fixed_layout_table_is_cached(tmp_path):
+    p = tmp_path / 'f.csv'
+    p.write_text('timestamp,patient_id\n2024-01-01 10:00:00,a\n2024-02-30 11:30:00,b\n2024-01-01 10:59:00,a\n')
+    cache = ParsedCache(tmp_path / 'cache')
+    first = DataLoader(p, cache=cache).load_table()
+    table, invalid = cache.get_table(p)
+    assert invalid == 1 and table.minutes.tolist() == first.minutes.tolist()
+    # la table compacte (à la minute) ne sert pas de colonnes complètes à load_parsed
+    assert cache.get(p) is None
+
+    loader = DataLoader(p, cache=cache)
+    assert loader.load_table().codes.tolist() == first.codes.tolist() and loader.invalid_rows == 1
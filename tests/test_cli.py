@@ -0,0 +1,36 @@
+from src import cli, database
+import json
+import subprocess
+import sys
+import pandas as pd
+
+
+def _write(path, rows):
+    pd.DataFrame(rows, columns=['timestamp', 'patient_id']).to_csv(path, index=False)
+
+
+def test_batch_writes_per_file_outputs_and_one_history_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "h.db")
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    _write(inputs / 'a.csv', [('2024-01-01 10:05:00', 'p1'), ('2024-01-01 10:10:00', 'p2')])
+    _write(inputs / 'b.csv', [('2024-01-02 08:00:00', 'p3')])
+    (inputs / 'broken.csv').write_text("autre,colonne\n1,2\n")
+
+    out = tmp_path / "out"
+    code = cli.main([str(inputs), '--out', str(out), '--workers', '2', '--site', 'nord'])
+    assert code == 1  # broken.csv a échoué, les autres sont traités
+    assert (out / 'a' / 'hourly_counts.csv').exists()
+    assert (out / 'b' / 'daily.png').exists()
+
+    combined = json.loads((out / cli.COMBINED_SUMMARY).read_text())
+    assert combined['succeeded'] == 2 and len(combined['failed']) == 1
+    assert [s['file_name'] for s in combined['summaries']] == ['a.csv', 'b.csv']
+    history = database.fetch_history()
+    assert [(h['file_name'], h['site']) for h in history] == [('a.csv', 'nord'), ('b.csv', 'nord')]
+
+
+def test_cli_import_is_light():
+    code = "import sys, src.cli; print(any(m in sys.modules for m in ('tkinter', 'PIL', 'pandas', 'matplotlib')))"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'False'
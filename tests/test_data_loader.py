@@ -1,5 +1,7 @@
 from src.data_loader import DataLoader
+from src.jobs import JobCancelled
 import pandas as pd
+import pytest
 
 def test_load_and_validate(tmp_path):
     p = tmp_path / 's.csv'
@@ -11,3 +13,75 @@ def test_load_and_validate(tmp_path):
     assert dl.validate(df2) is True
     df3 = dl.parse_dates(df2)
     assert df3['timestamp'].dtype.kind in ('M',)
+
+def test_stream_counts_matches_full_load(tmp_path):
+    p = tmp_path / 's.csv'
+    df = pd.DataFrame({
+        'timestamp': ['2024-01-01 10:00:00', '2024-01-01 10:30:00', '2024-01-01 11:05:00',
+                      '2024-01-02 09:00:00', '2024-01-02 09:10:00'],
+        'patient_id': [1, 1, 2, 1, 3],
+        'extra': ['a', 'b', 'c', 'd', 'e'],
+    })
+    df.to_csv(p, index=False)
+    dl = DataLoader(p)
+    agg = dl.stream_counts(chunksize=2)
+    assert agg.rows == 5
+    assert agg.hourly_counts()['count'].tolist() == [1, 1, 2]
+    assert agg.daily_counts()['count'].tolist() == [2, 2]
+    assert agg.total_patients() == 3
+
+def test_load_table_reports_progress_and_can_be_interrupted(tmp_path):
+    iso, fr = tmp_path / 'iso.csv', tmp_path / 'fr.csv'
+    pd.DataFrame({'timestamp': ['2024-01-01 10:00:00'] * 50, 'patient_id': range(50)}).to_csv(iso, index=False)
+    pd.DataFrame({'timestamp': ['13/01/2024 10:00'] * 50, 'patient_id': range(50)}).to_csv(fr, index=False)
+    for p in (iso, fr):
+        calls = []
+        table = DataLoader(p).load_table(chunksize=20, progress=lambda *a: calls.append(a))
+        assert len(table) == 50
+        assert calls[-1] == (p.stat().st_size, p.stat().st_size, 50)
+
+    def cancel(read, size, rows):
+        raise JobCancelled("lecture")
+
+    for p in (iso, fr):
+        with pytest.raises(JobCancelled):
+            DataLoader(p).load_table(chunksize=20, progress=cancel)
+
+def test_stream_counts_memory_does_not_grow_with_file(tmp_path):
+    import tracemalloc
+    import numpy as np
+
+    def peak(days):
+        # fichier chronologique : une arrivée toutes les 6 minutes, parmi 300 patients
+        p = tmp_path / f'{days}.csv'
+        minutes = np.arange(days * 240) * 6
+        ts = pd.to_datetime('2024-01-01') + pd.to_timedelta(minutes, unit='min')
+        pd.DataFrame({'timestamp': ts.strftime('%Y-%m-%d %H:%M:%S'),
+                      'patient_id': np.arange(len(ts)) * 7 % 300}).to_csv(p, index=False)
+        tracemalloc.start()
+        agg = DataLoader(p).stream_counts(chunksize=2000)
+        used = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert agg.rows == days * 240
+        return used, agg
+
+    # 4 fois plus de lignes : la mémoire ne suit que les comptes par heure (pas les paires)
+    small, _ = peak(200)
+    large, agg = peak(800)
+    assert large < 1.5 * small
+    assert len(agg.daily_counts()) == 800
+    assert agg.total_patients() == 300
+
+def test_stream_counts_rereads_out_of_order_file(tmp_path):
+    from src.analyzer import ArrivalAnalyzer
+    p = tmp_path / 'late.csv'
+    rows = [(f'2024-01-{day:02d} {h:02d}:00:00', f'p{day * h % 7}') for day in range(1, 15) for h in range(24)]
+    # arrivée saisie en retard, dans un jour déjà terminé
+    rows.insert(300, ('2024-01-03 05:00:00', 'retard'))
+    pd.DataFrame(rows, columns=['timestamp', 'patient_id']).to_csv(p, index=False)
+    ref = ArrivalAnalyzer(DataLoader(p).parse_dates(DataLoader(p).load_csv()), engine='pandas')
+    agg = DataLoader(p).stream_counts(chunksize=40)
+    assert not agg.collapse
+    assert agg.hourly_counts().equals(ref.hourly_counts())
+    assert agg.daily_counts().equals(ref.daily_counts())
+    assert agg.total_patients() == 8
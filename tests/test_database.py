@@ -0,0 +1,41 @@
+from src import database
+from src.analyzer import ArrivalAnalyzer
+import sqlite3
+import pandas as pd
+
+
+def test_batched_insert_with_series_and_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "h.db")
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(['2024-01-01 10:21:00', '2024-01-01 10:40:00', '2024-01-02 11:00:00']),
+        'patient_id': [1, 2, 3]
+    })
+    an = ArrivalAnalyzer(df)
+    records = [dict(file_name=f"f{i}.csv", total_patients=3, busiest_hour="2024-01-01 10:00:00",
+                    busiest_day="2024-01-01", hourly=an.hourly_counts(), daily=an.daily_counts())
+               for i in range(3)]
+    ids = database.insert_analyses(records)
+    assert len(ids) == 3
+
+    history = database.fetch_history(file_name="f1.csv")
+    assert [h["id"] for h in history] == [ids[1]]
+    assert database.fetch_counts(ids[1], "hour") == [("2024-01-01 10:00:00", 2), ("2024-01-02 11:00:00", 1)]
+    assert database.fetch_counts(ids[1], "day") == [("2024-01-01", 2), ("2024-01-02", 1)]
+    indexes = {r[1] for r in database.get_connection().execute("PRAGMA index_list(analysis)")}
+    assert {"idx_analysis_file_name", "idx_analysis_datetime"} <= indexes
+
+
+def test_init_db_upgrades_old_schema(tmp_path, monkeypatch):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE analysis (id INTEGER PRIMARY KEY AUTOINCREMENT, file_name TEXT NOT NULL,
+                    analysis_datetime TEXT NOT NULL, total_patients INTEGER, busiest_hour TEXT, busiest_day TEXT)""")
+    conn.execute("INSERT INTO analysis (file_name, analysis_datetime, total_patients) VALUES ('a.csv', '2024-01-01 00:00:00', 5)")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(database, "DB_PATH", path)
+
+    database.insert_analysis("b.csv", 7, "2024-01-01 10:00:00", "2024-01-01", average_daily=3.5)
+    history = database.fetch_history()
+    assert [h["file_name"] for h in history] == ["a.csv", "b.csv"]
+    assert history[1]["average_daily"] == 3.5
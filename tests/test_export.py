@@ -0,0 +1,28 @@
+from src.analyzer import ArrivalAnalyzer
+from src.export import write_table, read_table, open_mapped, available_formats, FORMATS
+import numpy as np
+import pandas as pd
+
+
+def test_export_round_trip_and_mapped_npy(tmp_path):
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(['2024-01-01 10:21:00', '2024-01-01 10:40:00', '2024-01-02 11:00:00']),
+        'patient_id': [1, 2, 3]
+    })
+    an = ArrivalAnalyzer(df)
+    hourly, daily = an.hourly_counts(), an.daily_counts()
+
+    assert {"csv", "csv.gz", "npy"} <= set(available_formats())
+    for fmt in available_formats():
+        path = tmp_path / f"hourly{FORMATS[fmt]}"
+        write_table(hourly, path, fmt)
+        back = read_table(path)
+        assert list(back['count']) == [2, 1]
+        assert list(back['timestamp']) == list(hourly['timestamp'])
+
+    path = tmp_path / "daily.npy"
+    write_table(daily, path)
+    mapped = open_mapped(path)
+    assert isinstance(mapped, np.memmap)
+    assert mapped['date'].tolist() == [d for d in daily['date']]
+    assert mapped['count'].tolist() == [2, 1]
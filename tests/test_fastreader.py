@@ -0,0 +1,54 @@
+from src.analyzer import ArrivalAnalyzer
+from src.data_loader import DataLoader
+from src.fastreader import LayoutError, read_fixed
+import pytest
+
+LINES = [
+    '2024-01-01 10:00:00,a1',
+    '2024-01-01 10:59:59,b2',
+    '2024-01-01 11:05:00,a1',
+    '2024-02-29 09:00:00,',
+    '2024-02-30 09:00:00,c3',
+    '2024-02-29 23:59:00,patient-très-long-42',
+    '2024-03-01 00:00:00,b2',
+]
+
+
+def _write(path, lines, newline='\n', header='timestamp,patient_id'):
+    path.write_bytes((newline.join([header] + lines)).encode('utf-8'))
+    return path
+
+
+def test_read_fixed_matches_pandas(tmp_path):
+    for newline in ('\n', '\r\n'):
+        p = _write(tmp_path / 'a.csv', LINES, newline)
+        for block_bytes in (1 << 20, 48):
+            table, invalid = read_fixed(p, block_bytes=block_bytes)
+            assert invalid == 1
+            dl = DataLoader(p)
+            ref = ArrivalAnalyzer(dl.load_parsed())
+            assert dl.invalid_rows == invalid
+            an = ArrivalAnalyzer(table)
+            assert an.hourly_counts().equals(ref.hourly_counts())
+            assert an.daily_counts().equals(ref.daily_counts())
+            assert an.total_patients() == ref.total_patients() == 4
+    assert 'patient-très-long-42' in set(table.ids)
+
+
+def test_other_layouts_fall_back_to_pandas(tmp_path):
+    with pytest.raises(LayoutError):
+        read_fixed(_write(tmp_path / 'h.csv', LINES[:2], header='patient_id,timestamp'))
+    odd = _write(tmp_path / 'odd.csv', ['2024-01-01 10:00,a1', '2024-01-01 11:00,"b,2"'])
+    with pytest.raises(LayoutError):
+        read_fixed(odd)
+    table = DataLoader(odd).load_table()
+    assert len(table) == 2
+    assert ArrivalAnalyzer(table).total_patients() == 2
+
+
+def test_file_without_any_patient_id(tmp_path):
+    p = _write(tmp_path / 'e.csv', ['2024-01-01 10:00:00,', '2024-01-01 11:00:00,'])
+    table, invalid = read_fixed(p)
+    assert (len(table), table.n_ids, invalid) == (2, 0, 0)
+    an = ArrivalAnalyzer(table)
+    assert an.total_patients() == 0 and an.hourly_counts().empty
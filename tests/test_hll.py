@@ -0,0 +1,32 @@
+from src.analyzer import ApproximateArrivalAnalyzer, ArrivalAnalyzer
+from src.hll import leading_zeros, relative_error
+import numpy as np
+import pandas as pd
+
+
+def test_leading_zeros_matches_bit_length():
+    x = np.array([1, 2, 3, 2**40 + 5, 2**63, 2**64 - 1], dtype=np.uint64)
+    assert leading_zeros(x).tolist() == [64 - int(v).bit_length() for v in x]
+
+
+def test_approximate_counts_within_error_and_mergeable(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 60000
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime('2024-03-01') + pd.to_timedelta(rng.integers(0, 3 * 86400, n), unit='s'),
+        'patient_id': rng.integers(0, 40000, n),
+    })
+    exact = ArrivalAnalyzer(df)
+    a = ApproximateArrivalAnalyzer(df.iloc[:n // 2], precision=12)
+    b = ApproximateArrivalAnalyzer(df.iloc[n // 2:], precision=12)
+    b.save(tmp_path / 'b.npz')
+    approx = a.merge(ApproximateArrivalAnalyzer.load(tmp_path / 'b.npz'))
+
+    rse = relative_error(12)
+    assert abs(approx.total_patients() - exact.total_patients()) < 4 * rse * exact.total_patients()
+    h = approx.hourly_counts().merge(exact.hourly_counts(), on='timestamp')
+    assert len(h) == len(exact.hourly_counts())
+    assert (abs(h['count_x'] - h['count_y']) <= np.maximum(2, 4 * rse * h['count_y'])).all()
+    assert approx.daily_counts()['date'].tolist() == exact.daily_counts()['date'].tolist()
+    lo, hi = approx.error_bounds()['total_patients_95ci']
+    assert lo <= approx.total_patients() <= hi
@@ -0,0 +1,80 @@
+from src.analyzer import ArrivalAnalyzer
+from src.data_loader import DataLoader
+from src.incremental import IncrementalAnalysis
+import json
+import pytest
+
+
+def test_incremental_reads_only_appended_rows(tmp_path):
+    p = tmp_path / 'arrivals.csv'
+    p.write_text("timestamp,patient_id\n"
+                 "2024-01-31 23:10:00,a\n"
+                 "2024-02-01 10:00:00,b\n")
+    inc = IncrementalAnalysis(p, state_dir=tmp_path / 'state')
+    an = inc.run()
+    assert inc.new_rows == 2
+    assert an.total_patients() == 2
+
+    # ajout en fin de fichier, dont une ligne incomplète (écriture en cours)
+    with open(p, 'a') as f:
+        f.write("2024-02-01 10:30:00,a\n2024-02-02 08:00:00,c\n2024-02-02 09")
+    inc = IncrementalAnalysis(p, state_dir=tmp_path / 'state')
+    summary = inc.refresh_outputs(tmp_path / 'out')
+    assert inc.new_rows == 2
+
+    full = ArrivalAnalyzer(DataLoader(p).parse_dates(DataLoader(p).load_csv().iloc[:4]))
+    an = ArrivalAnalyzer.from_tables(inc.hourly, inc.daily, len(inc.patients))
+    assert an.hourly_counts()['count'].tolist() == full.hourly_counts()['count'].tolist()
+    assert an.daily_counts()['count'].tolist() == full.daily_counts()['count'].tolist()
+    assert summary['total_patients'] == 3
+    assert json.loads((tmp_path / 'out' / 'summary.json').read_text())['busiest_day'] == '2024-02-01'
+
+
+def test_incremental_uses_timestamp_format_and_counts_invalid_rows(tmp_path):
+    p = tmp_path / 'fr.csv'
+    p.write_text("timestamp,patient_id\n"
+                 "13/01/2024 10:00,a\n"
+                 "pas une date,b\n")
+    with pytest.raises(ValueError):
+        IncrementalAnalysis(p, state_dir=tmp_path / 'state', timestamp_format='%Y-%m-%d %H:%M:%S').run()
+
+    inc = IncrementalAnalysis(p, state_dir=tmp_path / 'state', timestamp_format='%d/%m/%Y %H:%M')
+    an = inc.run()
+    assert (inc.new_rows, inc.invalid_rows) == (2, 1)
+    assert an.total_patients() == 1 and an.invalid_rows == 1
+
+    with open(p, 'a') as f:
+        f.write("14/01/2024 08:00,c\n")
+    inc = IncrementalAnalysis(p, state_dir=tmp_path / 'state', timestamp_format='%d/%m/%Y %H:%M')
+    an = inc.run()
+    assert (inc.new_rows, inc.invalid_rows) == (1, 0)
+    assert an.daily_counts()['count'].tolist() == [1, 1] and an.invalid_rows == 1
+
+
+def test_incremental_rewrites_only_touched_months(tmp_path):
+    p = tmp_path / 'arrivals.csv'
+    p.write_text("timestamp,patient_id\n"
+                 "2024-01-10 10:00:00,a\n"
+                 "2024-02-01 10:00:00,b\n")
+    IncrementalAnalysis(p, state_dir=tmp_path / 'state').run()
+    state = next((tmp_path / 'state').iterdir())
+    inode = lambda name: (state / name).stat().st_ino
+
+    # patient déjà vu, en février : janvier et les patients ne sont pas réécrits
+    jan, patients = inode('pairs/2024-01.pkl'), inode('patients.npy')
+    with open(p, 'a') as f:
+        f.write("2024-02-01 11:00:00,a\n")
+    IncrementalAnalysis(p, state_dir=tmp_path / 'state').run()
+    assert (inode('pairs/2024-01.pkl'), inode('patients.npy')) == (jan, patients)
+
+    # ligne tardive en janvier : février reste tel quel, le nouveau patient est inséré
+    feb = inode('pairs/2024-02.pkl')
+    with open(p, 'a') as f:
+        f.write("2024-01-10 10:30:00,c\n")
+    inc = IncrementalAnalysis(p, state_dir=tmp_path / 'state')
+    an = inc.run()
+    assert inode('pairs/2024-02.pkl') == feb
+    full = ArrivalAnalyzer(DataLoader(p).load_parsed())
+    assert an.hourly_counts().values.tolist() == full.hourly_counts().values.tolist()
+    assert an.daily_counts().values.tolist() == full.daily_counts().values.tolist()
+    assert an.total_patients() == 3 and list(inc.patients) == sorted(inc.patients)
@@ -0,0 +1,27 @@
+from src import instrument
+from src.analyzer import ArrivalAnalyzer
+from src.data_loader import DataLoader
+import pandas as pd
+
+
+def test_spans_recorded_only_while_recording(tmp_path):
+    p = tmp_path / 'a.csv'
+    pd.DataFrame({'timestamp': ['2024-01-01 10:05:00', '2024-01-01 11:00:00', 'illisible'],
+                  'patient_id': [1, 2, 3]}).to_csv(p, index=False)
+
+    assert instrument.span("hors mesure") is instrument.span("autre")  # objet inerte partagé
+    with instrument.recording(capture_dir=tmp_path / 'profil') as rec:
+        with instrument.span("analyse"):
+            df = DataLoader(p).load_parsed()
+            ArrivalAnalyzer(df).hourly_counts()
+    report = rec.report()
+    stages = {s['stage']: s for s in report['stages']}
+    assert {'load_csv', 'parse_dates', 'aggregate', 'analyse'} <= set(stages)
+    assert stages['load_csv']['rows'] == 3 and stages['load_csv']['depth'] == 1
+    assert stages['analyse']['traced_peak_mb'] >= stages['aggregate']['traced_peak_mb']
+    assert stages['analyse']['rss_growth_mb'] >= stages['aggregate']['rss_growth_mb'] >= 0
+    assert (tmp_path / 'profil' / 'profile.pstats').stat().st_size > 0
+    assert (tmp_path / 'profil' / 'tracemalloc.txt').exists()
+
+    ArrivalAnalyzer(df).hourly_counts()
+    assert len(rec.report()['stages']) == len(report['stages'])
@@ -0,0 +1,62 @@
+from src.jobs import JobRunner
+import threading
+import time
+
+
+class FakeScheduler:
+    """Remplace Tk.after : les callbacks sont exécutés à la demande dans le thread du test."""
+    def __init__(self):
+        self.pending = []
+
+    def __call__(self, ms, callback):
+        self.pending.append(callback)
+
+    def run_until(self, predicate, timeout=5):
+        deadline = time.time() + timeout
+        while not predicate() and time.time() < deadline:
+            callbacks, self.pending = self.pending, []
+            for cb in callbacks:
+                cb()
+            time.sleep(0.005)
+
+
+def test_jobs_report_progress_and_results_on_polling_thread():
+    sched = FakeScheduler()
+    runner = JobRunner(sched, workers=1)
+    events, results = [], []
+    main = threading.get_ident()
+
+    def work(job):
+        for i in range(3):
+            job.progress("lecture", done=i + 1, total=3, rows=(i + 1) * 10)
+        return 42
+
+    runner.submit(work, on_progress=lambda p: events.append((p["stage"], threading.get_ident())),
+                  on_done=lambda r: results.append((r, threading.get_ident())))
+    sched.run_until(lambda: results)
+    assert results == [(42, main)]
+    assert events and all(t == main for _, t in events)
+    assert runner.active == 0
+
+
+def test_queued_job_can_be_cancelled_cooperatively():
+    sched = FakeScheduler()
+    runner = JobRunner(sched, workers=1)
+    started = threading.Event()
+    outcome = []
+
+    def long_job(job):
+        started.set()
+        while True:
+            job.check()
+            time.sleep(0.001)
+
+    first = runner.submit(long_job, on_cancel=lambda: outcome.append('first cancelled'))
+    second = runner.submit(lambda job: 'never', on_done=outcome.append,
+                           on_cancel=lambda: outcome.append('second cancelled'))
+    started.wait(2)
+    assert runner.active == 2
+    second.cancel()
+    first.cancel()
+    sched.run_until(lambda: len(outcome) == 2)
+    assert sorted(outcome) == ['first cancelled', 'second cancelled']
@@ -0,0 +1,46 @@
+from src.live import LiveArrivalCounter, tail_csv
+import threading
+import time
+
+
+def test_sliding_and_tumbling_windows():
+    c = LiveArrivalCounter(window_seconds=3600)
+    c.ingest('2024-01-01 09:10:00', 'a')
+    c.ingest('2024-01-01 09:20:00', 'b')
+    c.ingest('2024-01-01 09:50:00', 'a')
+    c.ingest('2024-01-01 10:15:00', 'c')
+    s = c.summary()
+    assert s['patients_in_window'] == 3
+    assert s['busiest_hour_today'] == '2024-01-01 09:00:00'
+    assert s['busiest_hour_today_count'] == 2
+
+    c.ingest('2024-01-01 10:40:00', 'd')
+    s = c.summary()
+    assert s['arrivals_in_window'] == 3  # 09:10 et 09:20 sont sorties de la fenêtre
+    assert s['patients_in_window'] == 3
+
+    c.ingest('2024-01-02 00:05:00', 'e')
+    s = c.summary()
+    assert s['patients_today'] == 1
+    assert s['patients_in_window'] == 1
+
+
+def test_tail_feeds_counter_from_growing_file(tmp_path):
+    p = tmp_path / 'live.csv'
+    p.write_text("timestamp,patient_id\n2024-01-01 08:00:00,a\n")
+
+    def writer():
+        with open(p, 'a') as f:
+            time.sleep(0.05)
+            f.write("2024-01-01 08:10:00,b\n2024-01-01 08:2")
+            f.flush()
+            time.sleep(0.05)
+            f.write("0:00,c\n")
+    t = threading.Thread(target=writer)
+    t.start()
+    c = LiveArrivalCounter()
+    for ts, ids in tail_csv(p, poll_interval=0.01, idle_timeout=0.3):
+        c.ingest_many(ts, ids)
+    t.join()
+    assert c.events == 3
+    assert c.summary()['patients_in_window'] == 3
@@ -0,0 +1,27 @@
+from src.analyzer import ArrivalAnalyzer
+from src.outputs import write_outputs, shutdown_render_pool
+from src.report import build_summary
+import json
+import pandas as pd
+
+
+def test_outputs_written_atomically_then_skipped_when_unchanged(tmp_path):
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(['2024-01-01 10:21:00', '2024-01-01 10:40:00', '2024-01-02 11:00:00']),
+        'patient_id': [1, 2, 3]
+    })
+    an = ArrivalAnalyzer(df)
+    hourly, daily = an.hourly_counts(), an.daily_counts()
+    summary = build_summary(3, '2024-01-01 10:00:00', 2, '2024-01-01', 2, 1.5)
+
+    status = write_outputs(tmp_path, hourly, daily, summary, processes=True)
+    shutdown_render_pool()
+    assert set(status.values()) == {"written"}
+    assert json.loads((tmp_path / "summary.json").read_text())["total_patients"] == 3
+    assert (tmp_path / "hourly.png").read_bytes()[:4] == b'\x89PNG'
+    assert not list(tmp_path.glob(".tmp-*"))
+
+    summary["total_patients"] = 4
+    status = write_outputs(tmp_path, hourly, daily, summary, processes=False)
+    assert status["summary.json"] == "written"
+    assert status["hourly.png"] == status["daily_counts.csv"] == "skipped"
@@ -0,0 +1,48 @@
+from src.analyzer import ArrivalAnalyzer
+from src.data_loader import DataLoader
+from src.parallel import analyze_parallel
+import pandas as pd
+import pytest
+
+
+def _write(path, rows):
+    pd.DataFrame(rows, columns=['timestamp', 'patient_id']).to_csv(path, index=False)
+
+
+def test_parallel_merge_counts_shared_patients_once(tmp_path):
+    a, b = tmp_path / 'a.csv', tmp_path / 'b.csv'
+    _write(a, [('2024-01-01 10:05:00', 'p1'), ('2024-01-01 10:10:00', 'p2'), ('2024-01-02 08:00:00', 'p3')])
+    _write(b, [('2024-01-01 10:45:00', 'p1'), ('2024-01-01 11:00:00', 'p4')])
+
+    an = analyze_parallel([a, b], workers=2)
+    assert an.hourly_counts()['count'].tolist() == [2, 1, 1]
+    assert an.daily_counts()['count'].tolist() == [3, 1]
+    assert an.total_patients() == 4
+
+
+def test_byte_range_partitions_match_single_file(tmp_path):
+    p = tmp_path / 'big.csv'
+    rows = [(f'2024-01-01 {h:02d}:{m:02d}:00', f'p{(h * 7 + m) % 11}') for h in range(24) for m in range(0, 60, 5)]
+    _write(p, rows)
+    assert len(DataLoader(p).split_byte_ranges(5)) == 5
+
+    an = analyze_parallel([p], workers=1, parts_per_file=5, chunksize=7)
+    ref = ArrivalAnalyzer(DataLoader(p).parse_dates(DataLoader(p).load_csv()))
+    assert an.hourly_counts()['count'].tolist() == ref.hourly_counts()['count'].tolist()
+    assert an.total_patients() == ref.total_patients()
+
+
+def test_non_iso_file_is_not_silently_dropped(tmp_path):
+    p = tmp_path / 'fr.csv'
+    _write(p, [('13/01/2024 10:00', 'p1'), ('13/01/2024 10:20', 'p2'), ('14/01/2024 08:00', 'p1'), ('??', 'p3')])
+    agg = DataLoader(p).stream_counts(chunksize=2)
+    assert (agg.rows, agg.invalid_rows) == (4, 1)
+
+    an = analyze_parallel([p], workers=1, parts_per_file=2)
+    assert an.total_patients() == 2 and an.invalid_rows == 1
+    assert an.hourly_counts()['count'].tolist() == [2, 1]
+
+    an = analyze_parallel([p], workers=1, timestamp_format='%d/%m/%Y %H:%M')
+    assert an.daily_counts()['count'].tolist() == [2, 1]
+    with pytest.raises(ValueError, match='No parseable timestamp'):
+        analyze_parallel([p], workers=1, timestamp_format='%Y-%m-%d %H:%M:%S')
@@ -0,0 +1,46 @@
+from src.plotter import decimate_minmax, plot_hourly, plot_daily, _figures
+import numpy as np
+import pandas as pd
+
+
+def test_minmax_decimation_keeps_extremes():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 50)
+    y[1234] = 5.0
+    y[8765] = -5.0
+    dx, dy = decimate_minmax(x, y, 100)
+    assert len(dx) <= 200
+    assert dy.max() == 5.0 and dy.min() == -5.0
+    assert np.all(np.diff(dx) > 0)
+
+
+def test_plots_reuse_figures_and_write_png(tmp_path):
+    hours = pd.date_range('2020-01-01', periods=5 * 365 * 24, freq='h')
+    hourly = pd.DataFrame({'timestamp': hours, 'count': np.arange(len(hours)) % 17})
+    daily = hourly.groupby(hourly['timestamp'].dt.date)['count'].sum().reset_index()
+    daily.columns = ['date', 'count']
+
+    for i in range(2):
+        plot_hourly(hourly, out_path=str(tmp_path / f'hourly{i}.png'))
+        plot_daily(daily, out_path=str(tmp_path / f'daily{i}.png'))
+    assert (tmp_path / 'hourly1.png').read_bytes()[:4] == b'\x89PNG'
+    assert (tmp_path / 'daily1.png').stat().st_size > 0
+    fig, ax = _figures['hourly']
+    assert len(ax.lines) == 1
+    assert len(_figures['daily'][1].patches) == 1
+
+
+def test_hourly_curve_is_rethinned_when_zooming():
+    from src.plotter import new_figure, draw_hourly
+    hours = pd.date_range('2020-01-01', periods=50_000, freq='h')
+    counts = np.arange(len(hours)) % 17
+    fig, ax = new_figure()
+    draw_hourly(ax, pd.DataFrame({'timestamp': hours, 'count': counts}))
+    line = ax.lines[0]
+    assert len(line.get_xdata()) <= 2 * int(ax.bbox.width)
+
+    # zoom sur 300 heures : toutes les valeurs de la fenêtre sont de nouveau tracées
+    x = line.full_data[0]
+    ax.set_xlim(x[1000], x[1299])
+    assert len(line.get_xdata()) >= 300
+    assert set(line.get_ydata()) == set(range(17))
@@ -0,0 +1,31 @@
+from src.preview import CsvPager
+import pytest
+
+
+def _write(path, n):
+    with open(path, 'w') as f:
+        f.write("timestamp,patient_id,site\n")
+        for i in range(n):
+            f.write(f"2024-01-01 {i % 24:02d}:00:00,p{i},A\n")
+
+
+def test_pager_reads_pages_without_loading_file(tmp_path):
+    p = tmp_path / 'big.csv'
+    _write(p, 1000)
+    pager = CsvPager(p, page_size=10)
+    assert pager.head(2) == [('2024-01-01 00:00:00', 'p0'), ('2024-01-01 01:00:00', 'p1')]
+    assert pager.estimate_rows() == 1000
+
+    middle = pager.page_at(0.5)
+    assert len(middle) == 10
+    assert 450 <= int(middle[0][1][1:]) <= 550
+    last = pager.page_at(1.0)
+    assert len(last) == 10
+    assert last[-1][1] == 'p999'
+
+
+def test_pager_rejects_missing_columns(tmp_path):
+    p = tmp_path / 'bad.csv'
+    p.write_text("time,patient_id\n2024-01-01 10:00:00,1\n")
+    with pytest.raises(ValueError):
+        CsvPager(p)
@@ -0,0 +1,59 @@
+from src.analyzer import ArrivalAnalyzer, ApproximateArrivalAnalyzer
+from src.cache import ParsedCache
+from src.data_loader import DataLoader
+from src.table import ArrivalTable
+import numpy as np
+import pandas as pd
+
+
+def _arrivals(n=2000, seed=1):
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp('2024-03-01') + pd.to_timedelta(rng.integers(0, 20 * 86400, n), unit='s')
+    ids = rng.integers(0, 300, n).astype(str).astype(object)
+    ids[:5] = None
+    df = pd.DataFrame({'timestamp': ts.floor('min'), 'patient_id': ids})
+    df.loc[5:7, 'timestamp'] = pd.NaT
+    return df
+
+
+def test_table_matches_dataframe_results():
+    df = _arrivals()
+    table = ArrivalTable.from_frame(df)
+    assert table.nbytes < 8 * len(df) + 300 * 8 * 2
+    ref, an = ArrivalAnalyzer(df), ArrivalAnalyzer(table)
+    pd.testing.assert_frame_equal(an.hourly_counts(), ref.hourly_counts())
+    pd.testing.assert_frame_equal(an.daily_counts(), ref.daily_counts())
+    assert an.total_patients() == ref.total_patients()
+    assert an.busiest_hour() == ref.busiest_hour()
+    assert an.rollup('15min').counts('week').equals(ref.rollup('15min').counts('week'))
+    pandas_engine = ArrivalAnalyzer(table, engine='pandas')
+    pd.testing.assert_frame_equal(pandas_engine.hourly_counts(), ref.hourly_counts())
+    approx = ApproximateArrivalAnalyzer(table).total_patients()
+    assert abs(approx - ref.total_patients()) <= 0.05 * ref.total_patients()
+
+
+def test_concat_and_round_trip():
+    df = _arrivals(50)
+    parts = [ArrivalTable.from_frame(df.iloc[i:i + 20]) for i in range(0, 50, 20)]
+    table = ArrivalTable.concat(parts)
+    assert len(table) == 50
+    assert table.n_ids == df['patient_id'].nunique()
+    back = table.to_frame()
+    assert back['timestamp'].equals(df['timestamp'])
+    assert back['patient_id'].astype(object).where(back['patient_id'].notna(), None).tolist() == df['patient_id'].tolist()
+
+
+def test_load_table_in_chunks_and_from_cache(tmp_path):
+    df = _arrivals(500)
+    p = tmp_path / 'a.csv'
+    df.to_csv(p, index=False)
+    cache = ParsedCache(tmp_path / 'cache')
+    dl = DataLoader(p, cache=cache)
+    table = dl.load_table(chunksize=64)
+    assert dl.invalid_rows == 3
+    ref = ArrivalAnalyzer(DataLoader(p).load_parsed())
+    assert ArrivalAnalyzer(table).hourly_counts().equals(ref.hourly_counts())
+
+    cached = DataLoader(p, cache=cache).load_table()
+    assert ArrivalAnalyzer(cached).daily_counts().equals(ref.daily_counts())
+    assert ArrivalAnalyzer(cached).total_patients() == ref.total_patients()
@@ -0,0 +1,29 @@
+from src.data_loader import DataLoader
+from src.timeparse import infer_format, parse_timestamps
+import pandas as pd
+
+
+def test_iso_path_coerces_invalid_values():
+    values = ['2024-01-01 10:21:00', '2023-02-29 10:00:00', 'not a date', '2024-02-29 23:59:59']
+    ts, invalid, fmt = parse_timestamps(values)
+    assert fmt == '%Y-%m-%d %H:%M:%S'
+    assert invalid == 2
+    assert pd.Timestamp(ts[3]) == pd.Timestamp('2024-02-29 23:59:59')
+
+
+def test_parse_timestamps_infers_format_and_counts_invalid():
+    values = ['13/01/2024 10:00', '14/01/2024 11:30', None, '13/01/2024 10:00', 'oops']
+    assert infer_format(values) == '%d/%m/%Y %H:%M'
+    ts, invalid, fmt = parse_timestamps(values)
+    assert invalid == 2
+    assert fmt == '%d/%m/%Y %H:%M'
+    assert pd.Timestamp(ts[1]) == pd.Timestamp('2024-01-14 11:30')
+
+
+def test_loader_reports_unparseable_rows_with_pinned_format(tmp_path):
+    p = tmp_path / 's.csv'
+    p.write_text("timestamp,patient_id\n01/02/2024 10:00,1\nbad,2\n")
+    dl = DataLoader(p, timestamp_format='%m/%d/%Y %H:%M')
+    df = dl.parse_dates(dl.load_csv())
+    assert dl.invalid_rows == 1
+    assert df['timestamp'].iloc[0] == pd.Timestamp('2024-01-02 10:00')
@@ -0,0 +1,33 @@
+from src import database
+from src.analyzer import ArrivalAnalyzer
+from src.trends import query_series, top_periods
+import pandas as pd
+
+
+def _record(site, file_name, timestamps, ids):
+    an = ArrivalAnalyzer(pd.DataFrame({'timestamp': pd.to_datetime(timestamps), 'patient_id': ids}))
+    bh, _ = an.busiest_hour()
+    bd, _ = an.busiest_day()
+    return dict(site=site, file_name=file_name, total_patients=an.total_patients(), busiest_hour=str(bh),
+                busiest_day=bd, hourly=an.hourly_counts(), daily=an.daily_counts())
+
+
+def test_rollups_and_top_k_over_stored_series(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "h.db")
+    database.insert_analyses([
+        _record("A", "jan.csv", ['2024-01-01 10:00', '2024-01-01 10:30', '2024-01-08 09:00'], [1, 2, 1]),
+        _record("B", "jan.csv", ['2024-01-01 10:15', '2024-02-03 12:00'], [9, 9]),
+        # réanalyse du même fichier : seule la dernière version compte
+        _record("B", "jan.csv", ['2024-01-01 10:15', '2024-02-03 12:00', '2024-02-03 12:05'], [9, 9, 8]),
+    ])
+
+    days = query_series("day", start="2024-01-01", end="2024-02-01")
+    assert days.values.tolist() == [["2024-01-01", 3], ["2024-01-08", 1]]
+    weeks = query_series("week")
+    # au-delà du jour : somme des patients distincts par jour (patients-jours)
+    assert list(weeks.columns) == ["period", "patient_days"]
+    assert weeks.values.tolist() == [["2024-01-01", 3], ["2024-01-08", 1], ["2024-01-29", 2]]
+    months = query_series("month", site="A")
+    assert months.values.tolist() == [["2024-01", 3]]
+    top = top_periods(2, "hour")
+    assert top.values.tolist() == [["2024-01-01 10:00:00", 3], ["2024-02-03 12:00:00", 2]]
@@ -0,0 +1,54 @@
+from src import database
+from src.watcher import DirectoryWatcher, SEEN_FILE
+import asyncio
+import json
+import pandas as pd
+
+
+def _write(path, rows):
+    pd.DataFrame(rows, columns=['timestamp', 'patient_id']).to_csv(path, index=False)
+
+
+def test_scan_waits_until_file_is_stable(tmp_path):
+    inbox = tmp_path / 'in'
+    inbox.mkdir()
+    p = inbox / 'a.csv'
+    p.write_text('timestamp,patient_id\n2024-01-01 10:00:00,p1\n')
+    w = DirectoryWatcher(inbox, tmp_path / 'out', settle_seconds=1.0)
+    assert w.scan(now=0.0) == []
+    with open(p, 'a') as f:
+        f.write('2024-01-01 10:05:00,p2\n')
+    assert w.scan(now=0.5) == []  # encore en cours d'écriture
+    assert w.scan(now=1.0) == []
+    [(_, key)] = w.scan(now=1.6)
+    # pendant l'enregistrement du lot, le fichier ne doit pas redevenir « nouveau »
+    w._flushing[key] = {}
+    (inbox / 'notes.txt').write_text('ignoré')
+    assert w.scan(now=5.0) == [] and w.scan(now=9.0) == []
+    assert w.idle()
+
+
+def test_watcher_drains_queue_and_skips_seen_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "h.db")
+    inbox, out = tmp_path / 'in', tmp_path / 'out'
+    inbox.mkdir()
+    for i in range(7):
+        _write(inbox / f'f{i}.csv', [('2024-01-01 10:05:00', f'p{i}'), ('2024-01-01 11:10:00', 'x')])
+    (inbox / 'broken.csv').write_text("autre,colonne\n1,2\n")
+
+    def run():
+        w = DirectoryWatcher(inbox, out, site='nord', poll_interval=0.01, settle_seconds=0.0,
+                             queue_size=2, batch_size=3)
+        return asyncio.run(w.run(once=True))
+
+    assert run() == {"analyzed": 7, "failed": 1}
+    history = database.fetch_history()
+    assert len(history) == 7 and {h['site'] for h in history} == {'nord'}
+    assert (out / 'f3' / 'hourly_counts.csv').exists()
+    seen = json.loads((out / SEEN_FILE).read_text())
+    assert sorted(e['status'] for e in seen.values()) == ['failed'] + ['ok'] * 7
+
+    assert run() == {"analyzed": 0, "failed": 0}
+    _write(inbox / 'f0.csv', [('2024-01-02 08:00:00', 'p9')])
+    assert run() == {"analyzed": 1, "failed": 0}
+    assert len(database.fetch_history()) == 8